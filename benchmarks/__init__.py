@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+Pruebas de rendimiento del bot. No forman parte de la batería de tests:
+se lanzan a mano, por ejemplo `python -m benchmarks.bench_user_columns`.
+"""
@@ -0,0 +1,144 @@
+# benchmarks/bench_metrics.py
+"""
+Cuánto cuestan las métricas de src/metrics.py.
+
+Dos medidas:
+
+- Primitivas: `Counter.inc`, `Histogram.observe` y un handler vacío envuelto
+  frente al mismo handler sin envolver.
+- Por update: la aplicación real (main.build_application, con la Bot API y la IA
+  falsas del arnés de carga) procesa los mismos updates con las métricas
+  activadas y desactivadas, alternando rondas para repartir el ruido.
+
+    python -m benchmarks.bench_metrics --updates 1000 --rounds 3
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+from time import perf_counter
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
+
+import main
+from src import metrics
+from src.managers import word_game_manager
+from benchmarks.load_harness import BOT_ID, FakeTelegramRequest, UpdateFactory, fake_ai, prepare_data
+
+
+def _per_call_ns(function, number: int) -> float:
+    start = perf_counter()
+    for _ in range(number):
+        function()
+    return (perf_counter() - start) / number * 1e9
+
+
+def bench_primitives(number: int) -> dict:
+    registry: list = []
+    counter = metrics.Counter("bench_total", "bench", ("handler",), registry=registry)
+    histogram = metrics.Histogram("bench_seconds", "bench", ("handler",), registry=registry)
+
+    async def handler(update, context):
+        return None
+
+    wrapped = metrics.instrument_handler(handler)
+    loop = asyncio.new_event_loop()
+
+    async def call_many(callback):
+        start = perf_counter()
+        for _ in range(number):
+            await callback(None, None)
+        return (perf_counter() - start) / number * 1e9
+
+    results = {
+        "counter_inc_ns": _per_call_ns(lambda: counter.inc("main.handler"), number),
+        "histogram_observe_ns": _per_call_ns(lambda: histogram.observe(0.004, "main.handler"), number),
+        "handler_raw_ns": loop.run_until_complete(call_many(handler)),
+        "handler_instrumented_ns": loop.run_until_complete(call_many(wrapped)),
+    }
+    loop.close()
+    return results
+
+
+async def _run_updates(updates: int, seed: int) -> float:
+    """Procesa `updates` updates en una aplicación recién construida. Devuelve los segundos."""
+    request = FakeTelegramRequest(0)
+    builder = ApplicationBuilder().token(f"{BOT_ID}:BENCH").request(request).get_updates_request(request)
+    app = main.build_application(builder, with_jobs=False, rate_limiter=False)
+
+    done = asyncio.Event()
+    processed = 0
+
+    async def mark_end(update, context):
+        nonlocal processed
+        processed += 1
+        if processed >= updates:
+            done.set()
+
+    app.add_handler(TypeHandler(Update, mark_end), group=100)
+
+    async with app:
+        await app.start()
+        word_game_manager.set_game_state(True, "vendimia", 1)
+        factory = UpdateFactory(app.bot, main.user_manager.users_db, seed=seed)
+        batch = [factory.make() for _ in range(updates)]
+        start = perf_counter()
+        for update in batch:
+            await app.update_queue.put(update)
+        await asyncio.wait_for(done.wait(), timeout=120)
+        elapsed = perf_counter() - start
+        await app.stop()
+    return elapsed
+
+
+def bench_end_to_end(updates: int, rounds: int, users: int) -> dict:
+    fake_ai(0)
+    times = {True: [], False: []}
+    with tempfile.TemporaryDirectory(prefix="nimex-bench-metrics-") as data_dir, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        prepare_data(data_dir, users=users, events=50)
+        main.load_data()
+        for i in range(rounds * 2):
+            # Se alterna el orden (on/off, off/on...) para no favorecer a ninguno
+            enabled = (i % 2 == 0) == (i // 2 % 2 == 0)
+            metrics.enabled = enabled
+            times[enabled].append(asyncio.run(_run_updates(updates, seed=i // 2 + 1)))
+    metrics.enabled = True
+
+    on_us = statistics.median(times[True]) / updates * 1e6
+    off_us = statistics.median(times[False]) / updates * 1e6
+    return {
+        "updates": updates,
+        "rounds": rounds,
+        "enabled_us_per_update": on_us,
+        "disabled_us_per_update": off_us,
+        "overhead_us": on_us - off_us,
+        "overhead_pct": (on_us - off_us) / off_us * 100 if off_us else 0.0,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200_000, help="Llamadas por primitiva")
+    parser.add_argument("--updates", type=int, default=1000, help="Updates por ronda")
+    parser.add_argument("--rounds", type=int, default=3, help="Rondas con y sin métricas")
+    parser.add_argument("--users", type=int, default=2000)
+    args = parser.parse_args()
+
+    primitives = bench_primitives(args.number)
+    print("⏱️ Primitivas (ns por llamada)")
+    for name, value in primitives.items():
+        print(f"   {name:<26}{value:>10.0f}")
+
+    result = bench_end_to_end(args.updates, args.rounds, args.users)
+    print(f"\n📊 Por update ({result['updates']} updates x {result['rounds']} rondas, mediana)")
+    print(f"   sin métricas  {result['disabled_us_per_update']:>10.1f} µs")
+    print(f"   con métricas  {result['enabled_us_per_update']:>10.1f} µs")
+    print(f"   sobrecoste    {result['overhead_us']:>10.1f} µs ({result['overhead_pct']:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main_cli()
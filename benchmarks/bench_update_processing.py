@@ -0,0 +1,104 @@
+# benchmarks/bench_update_processing.py
+"""
+Compara el procesado secuencial de updates (lo que hacía PTB por defecto) con
+el procesador por claves a distintos niveles de concurrencia.
+
+Cada update simula el trabajo de la tubería: la mayoría son mensajes normales
+(unos milisegundos) y una parte llama a la IA (cientos de milisegundos). Los
+updates se lanzan como tareas, igual que hace PTB con `concurrent_updates`, y
+se comprueba que los de cada usuario terminan en orden de llegada.
+
+    python -m benchmarks.bench_update_processing --updates 400 --users 40 --slow 0.1
+"""
+import argparse
+import asyncio
+import random
+from time import perf_counter
+from types import SimpleNamespace
+
+from telegram.ext import SimpleUpdateProcessor
+
+from src.managers.update_processor import KeyedUpdateProcessor
+
+
+def make_updates(count: int, users: int, slow_ratio: float, seed: int = 1) -> list[tuple]:
+    """(update, es_lento) con usuarios repartidos al azar."""
+    rng = random.Random(seed)
+    updates = []
+    for update_id in range(count):
+        user_id = rng.randrange(users)
+        update = SimpleNamespace(
+            update_id=update_id,
+            effective_user=SimpleNamespace(id=user_id),
+            effective_chat=SimpleNamespace(id=-100),
+        )
+        updates.append((update, rng.random() < slow_ratio))
+    return updates
+
+
+async def run(processor, updates: list[tuple], fast_seconds: float, slow_seconds: float) -> dict:
+    finished: dict[int, list[int]] = {}
+    latencies = []
+
+    async def handle(update, slow: bool, queued_at: float):
+        await asyncio.sleep(slow_seconds if slow else fast_seconds)
+        finished.setdefault(update.effective_user.id, []).append(update.update_id)
+        latencies.append(perf_counter() - queued_at)
+
+    start = perf_counter()
+    if processor.max_concurrent_updates > 1:
+        await asyncio.gather(*(
+            processor.process_update(update, handle(update, slow, perf_counter())) for update, slow in updates
+        ))
+    else:
+        # Como PTB sin concurrencia: se espera a cada update antes de pasar al siguiente
+        for update, slow in updates:
+            await processor.process_update(update, handle(update, slow, start))
+    elapsed = perf_counter() - start
+
+    in_order = all(ids == sorted(ids) for ids in finished.values())
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "throughput": len(updates) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "in_order": in_order,
+    }
+
+
+async def main_async(args):
+    updates = make_updates(args.updates, args.users, args.slow)
+    slow_count = sum(slow for _, slow in updates)
+    print(
+        f"📨 {args.updates} updates de {args.users} usuarios, {slow_count} con IA "
+        f"({args.ai_ms} ms) y el resto {args.fast_ms} ms.\n"
+    )
+    print(f"{'procesador':<22}{'tiempo (s)':>12}{'updates/s':>12}{'p50 (ms)':>11}{'p99 (ms)':>11}{'orden':>8}")
+
+    processors = [("secuencial", SimpleUpdateProcessor(1))]
+    processors += [(f"por claves x{n}", KeyedUpdateProcessor(n)) for n in args.concurrency]
+    baseline = None
+    for name, processor in processors:
+        result = await run(processor, updates, args.fast_ms / 1000, args.ai_ms / 1000)
+        baseline = baseline or result["throughput"]
+        print(
+            f"{name:<22}{result['elapsed']:>12.2f}{result['throughput']:>12.1f}"
+            f"{result['p50_ms']:>11.0f}{result['p99_ms']:>11.0f}{'✅' if result['in_order'] else '❌':>8}"
+            f"   x{result['throughput'] / baseline:.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=300)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--slow", type=float, default=0.1, help="Proporción de updates que llaman a la IA")
+    parser.add_argument("--fast-ms", type=float, default=5)
+    parser.add_argument("--ai-ms", type=float, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
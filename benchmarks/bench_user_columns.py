@@ -0,0 +1,83 @@
+# benchmarks/bench_user_columns.py
+"""
+Compara las consultas masivas sobre users_db (recorriendo el diccionario)
+con las mismas consultas sobre la copia en columnas de NumPy.
+
+    python -m benchmarks.bench_user_columns --users 50000 --repeat 20
+"""
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from src.managers.user_columns import UserColumns
+from benchmarks.datagen import make_users
+
+
+# --- Versiones "diccionario" (como se haría sin la copia en columnas) ---
+
+def dict_inactive(users: dict, cutoff: datetime) -> list[str]:
+    return [uid for uid, data in users.items() if datetime.fromisoformat(data["last_seen"]) < cutoff]
+
+
+def dict_count_by_level(users: dict) -> dict:
+    return dict(Counter(data["level"] for data in users.values()))
+
+
+def dict_mean_xp_active(users: dict, cutoff: datetime) -> float:
+    active = [data["xp"] for data in users.values() if datetime.fromisoformat(data["last_seen"]) >= cutoff]
+    return sum(active) / len(active) if active else 0.0
+
+
+def dict_top_xp(users: dict, k: int) -> list:
+    return sorted(((uid, data["xp"]) for uid, data in users.items()), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def timed(func, repeat: int) -> float:
+    """Mejor tiempo (en milisegundos) de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    users = make_users(args.users)
+    cutoff = datetime.now() - timedelta(days=7)
+    cutoff_ts = cutoff.timestamp()
+
+    start = perf_counter()
+    table = UserColumns()
+    table.rebuild(users)
+    build_ms = (perf_counter() - start) * 1000
+
+    # Ambas versiones deben dar lo mismo antes de medir nada
+    assert sorted(dict_inactive(users, cutoff)) == sorted(table.inactive_ids(cutoff_ts))
+    assert dict_count_by_level(users) == table.count_by_level()
+    assert abs(dict_mean_xp_active(users, cutoff) - table.mean_xp(cutoff_ts)) < 1e-6
+
+    cases = [
+        ("inactivos", lambda: dict_inactive(users, cutoff), lambda: table.inactive_ids(cutoff_ts)),
+        ("cuántos inactivos", lambda: len(dict_inactive(users, cutoff)), lambda: table.count_inactive(cutoff_ts)),
+        ("usuarios por nivel", lambda: dict_count_by_level(users), table.count_by_level),
+        ("XP media activos", lambda: dict_mean_xp_active(users, cutoff), lambda: table.mean_xp(cutoff_ts)),
+        ("top 10 XP", lambda: dict_top_xp(users, 10), lambda: table.top_ids("xp", 10)),
+    ]
+
+    print(f"👥 {args.users} usuarios. Construir la tabla en columnas: {build_ms:.1f} ms\n")
+    print(f"{'consulta':<22}{'dict (ms)':>12}{'columnas (ms)':>16}{'x':>8}")
+    for name, dict_version, column_version in cases:
+        dict_ms = timed(dict_version, args.repeat)
+        column_ms = timed(column_version, args.repeat)
+        print(f"{name:<22}{dict_ms:>12.2f}{column_ms:>16.3f}{dict_ms / column_ms:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
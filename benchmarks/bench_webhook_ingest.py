@@ -0,0 +1,87 @@
+# benchmarks/bench_webhook_ingest.py
+"""
+Latencia de entrada del webhook sin Telegram: levanta el servidor en local,
+manda updates sintéticos por HTTP desde varias conexiones persistentes (como
+hace Telegram con `max_connections`) y mide cuánto tarda cada respuesta y
+cuánto tarda cada update en estar disponible en la cola de la aplicación.
+
+    python -m benchmarks.bench_webhook_ingest --updates 5000 --connections 40
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+from src.webhook_server import WebhookServer, WebhookTestClient
+
+SECRET = "bench"
+
+
+def make_update(update_id: int) -> dict:
+    user_id = 1000 + update_id % 250
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000 + update_id,
+            "chat": {"id": -100123, "type": "supergroup", "title": "Grupo"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"Usuario {user_id}"},
+            "text": f"Mensaje de prueba número {update_id}",
+        },
+    }
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+
+async def main_async(args):
+    queue: asyncio.Queue = asyncio.Queue()
+    server = WebhookServer(queue, secret_token=SECRET, host="127.0.0.1", port=0)
+    await server.start()
+
+    sent_at: dict[int, float] = {}
+    queue_delays = []
+    response_times = []
+
+    async def consumer():
+        # Hace de `Application`: saca los updates de la cola según llegan
+        for _ in range(args.updates):
+            update = await queue.get()
+            queue_delays.append(perf_counter() - sent_at[update.update_id])
+
+    async def connection(ids: range):
+        async with WebhookTestClient("127.0.0.1", server.port, secret_token=SECRET) as client:
+            for update_id in ids:
+                payload = make_update(update_id)
+                sent_at[update_id] = start = perf_counter()
+                status, _ = await client.post_update(payload)
+                response_times.append(perf_counter() - start)
+                assert status == 200
+                if update_id % args.redeliver == 0:
+                    await client.post_update(payload)  # Reenvío: no debe llegar a la cola
+
+    consuming = asyncio.create_task(consumer())
+    start = perf_counter()
+    await asyncio.gather(*(connection(range(c, args.updates, args.connections)) for c in range(args.connections)))
+    await consuming
+    elapsed = perf_counter() - start
+    await server.stop()
+
+    print(f"🌐 {args.updates} updates por {args.connections} conexiones en {elapsed:.2f} s "
+          f"({args.updates / elapsed:.0f} updates/s). Duplicados descartados: {server.stats['duplicates']}.\n")
+    print(f"{'medida':<28}{'p50 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}")
+    for name, values in (("respuesta HTTP", response_times), ("envío -> cola", queue_delays)):
+        print(f"{name:<28}{percentile(values, 0.5):>10.2f}{percentile(values, 0.99):>10.2f}{max(values) * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=40)
+    parser.add_argument("--redeliver", type=int, default=50, help="Reenvía uno de cada N updates")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
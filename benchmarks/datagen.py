@@ -0,0 +1,56 @@
+# benchmarks/datagen.py
+"""
+Generadores de datos sintéticos con el mismo formato que los almacenes de `data/`.
+Son deterministas (semilla fija) para que dos ejecuciones midan lo mismo.
+"""
+import random
+from datetime import datetime, timedelta
+
+STATUSES = ["verified"] * 8 + ["pending_presentation", "warned"]
+
+
+def make_users(count: int, seed: int = 1, now: datetime | None = None) -> dict:
+    """Genera una base de datos sintética con el mismo formato que users.json."""
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    users = {}
+    for i in range(count):
+        xp = int(rng.paretovariate(1.2) * 50)
+        users[str(100_000 + i)] = {
+            "first_name": f"Usuario {i}",
+            "username": f"usuario{i}",
+            "join_date": (now - timedelta(days=90)).isoformat(),
+            "xp": xp,
+            "points": rng.randint(0, 200),
+            "level": 1 + min(xp // 500, 20),
+            "lives": rng.randint(1, 3),
+            "last_seen": (now - timedelta(days=rng.uniform(0, 30))).isoformat(),
+            "last_xp_timestamp": 0,
+            "status": rng.choice(STATUSES),
+        }
+    return users
+
+
+def make_agenda(count: int, user_ids: list[str], days: int = 60, seed: int = 1) -> dict:
+    """
+    Genera `count` eventos con el formato de agenda.json, repartidos desde hace
+    `days // 4` días hasta dentro de `days` (así hay pasados, próximos e inactivos).
+    """
+    rng = random.Random(seed)
+    today = datetime.now()
+    agenda: dict[str, list] = {}
+    for i in range(count):
+        fecha = (today + timedelta(days=rng.randrange(-days // 4, days))).strftime("%Y-%m-%d")
+        asistentes = [
+            {"id": int(uid), "nombre": f"Usuario {uid}", "username": None}
+            for uid in rng.sample(user_ids, min(len(user_ids), rng.randrange(1, 12)))
+        ]
+        agenda.setdefault(fecha, []).append({
+            "id": f"bench-{i}",
+            "hora": f"{rng.randrange(10, 23)}:{rng.choice(['00', '30'])}",
+            "titulo": f"Quedada {i}",
+            "asistentes": asistentes,
+            "creador_id": asistentes[0]["id"] if asistentes else 0,
+            "activo": rng.random() > 0.1,
+        })
+    return agenda
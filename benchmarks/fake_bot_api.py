@@ -0,0 +1,240 @@
+# benchmarks/fake_bot_api.py
+"""
+Sustituto local (HTTP) de la parte de la Bot API de Telegram que usa el bot.
+
+Se apunta el bot a él con `TELEGRAM_BASE_URL` y todo funciona sin red:
+
+    python -m benchmarks.fake_bot_api --port 8081 --latency-ms 40 --flood-every 100
+    TELEGRAM_BASE_URL=http://127.0.0.1:8081 TELEGRAM_TOKEN=123:FAKE python main.py
+
+Qué ofrece:
+
+- `getUpdates` alimentado por un guion (`feed()` o `--updates fichero.jsonl`),
+  respetando `offset`, `limit` y la espera de long polling.
+- Latencia configurable (fija, por método y con variación aleatoria).
+- Respuestas 429 de control de flujo con `retry_after` (`flood()`).
+- Inyección de errores por método, por número de veces o por probabilidad (`fail()`).
+- Registro de todas las llamadas (`calls`, `calls_to()`).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+from dataclasses import dataclass
+from time import monotonic, time
+from urllib.parse import parse_qsl
+
+from src.webhook_server import JSONHTTPServer
+
+BOT_ID = 999_000_001
+BOT_USERNAME = "NimexChatBot"
+
+# Métodos que devuelven el mensaje enviado o editado
+_MESSAGE_METHODS = ("send", "edit", "copy", "forward")
+
+
+@dataclass
+class Call:
+    at: float
+    method: str
+    params: dict
+    status: int
+
+
+@dataclass
+class _Fault:
+    method: str | None  # None: cualquier método
+    status: int
+    description: str
+    times: int | None = None  # None: sin límite
+    probability: float = 1.0
+    every: int = 0  # Si > 0, solo una de cada `every` llamadas
+    retry_after: int | None = None
+    seen: int = 0
+
+    def matches(self, method: str, rng: random.Random) -> bool:
+        if self.method not in (None, method) or self.times == 0:
+            return False
+        self.seen += 1
+        if self.every and self.seen % self.every:
+            return False
+        if rng.random() >= self.probability:
+            return False
+        if self.times is not None:
+            self.times -= 1
+        return True
+
+
+def _decode_params(headers: dict, body: bytes) -> dict:
+    """PTB manda los parámetros como formulario (o JSON); los valores complejos van en JSON."""
+    if not body:
+        return {}
+    if headers.get("content-type", "").startswith("application/json"):
+        return json.loads(body)
+    params = {}
+    for key, value in parse_qsl(body.decode(), keep_blank_values=True):
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+class FakeBotAPI(JSONHTTPServer):
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, seed: int = 1):
+        super().__init__(host, port)
+        self.latency = latency
+        self.method_latency: dict[str, float] = {}
+        self.jitter = jitter
+        self.calls: list[Call] = []
+        self.chat_members: dict[tuple[int, int], str] = {}  # (chat_id, user_id) -> estado
+        self._rng = random.Random(seed)
+        self._faults: list[_Fault] = []
+        self._updates: list[dict] = []
+        self._new_updates = asyncio.Event()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- Guion ---
+
+    def feed(self, *updates: dict):
+        """Añade updates a la cola de getUpdates (se numeran solos si no traen update_id)."""
+        for update in updates:
+            update = dict(update)
+            update.setdefault("update_id", next(self._update_ids))
+            self._updates.append(update)
+        self._new_updates.set()
+
+    def flood(self, method: str | None = None, retry_after: int = 1, **when):
+        """Responde 429 con `retry_after` (`times`, `every` o `probability` para acotar)."""
+        self._faults.append(_Fault(method, 429, f"Too Many Requests: retry after {retry_after}",
+                                   retry_after=retry_after, **when))
+
+    def fail(self, method: str | None = None, status: int = 400,
+             description: str = "Bad Request: error inyectado", **when):
+        self._faults.append(_Fault(method, status, description, **when))
+
+    def clear_faults(self):
+        self._faults.clear()
+
+    def pending_updates(self) -> int:
+        return len(self._updates)
+
+    def calls_to(self, method: str) -> list[Call]:
+        return [call for call in self.calls if call.method == method]
+
+    # --- Respuestas ---
+
+    def _message(self, params: dict) -> dict:
+        chat_id = int(params.get("chat_id", 0))
+        return {
+            "message_id": params.get("message_id") or next(self._message_ids),
+            "date": int(time()),
+            "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+            "from": {"id": BOT_ID, "is_bot": True, "first_name": "Nimex", "username": BOT_USERNAME},
+            "text": str(params.get("text", "")),
+        }
+
+    async def _get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        if offset:
+            # Como Telegram: pedir con offset confirma (y olvida) todo lo anterior
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates and params.get("timeout"):
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout=float(params["timeout"]))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    async def _result(self, method: str, params: dict):
+        if method == "getMe":
+            return {"id": BOT_ID, "is_bot": True, "first_name": "Nimex", "username": BOT_USERNAME,
+                    "can_join_groups": True, "can_read_all_group_messages": True, "supports_inline_queries": False}
+        if method == "getUpdates":
+            return await self._get_updates(params)
+        if method == "getChatMember":
+            chat_id, user_id = int(params["chat_id"]), int(params["user_id"])
+            return {"status": self.chat_members.get((chat_id, user_id), "member"),
+                    "user": {"id": user_id, "is_bot": False, "first_name": f"Usuario {user_id}"}}
+        if method == "getChat":
+            chat_id = int(params["chat_id"])
+            return {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"}
+        if method.startswith(_MESSAGE_METHODS):
+            return self._message(params)
+        # pinChatMessage, banChatMember, answerCallbackQuery, setWebhook...
+        return True
+
+    async def route(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict]:
+        parts = path.strip("/").split("/")
+        if len(parts) != 2 or not parts[0].startswith("bot"):
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        api_method = parts[1]
+        params = _decode_params(headers, body)
+
+        delay = self.method_latency.get(api_method, self.latency)
+        if self.jitter:
+            delay += self._rng.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        for fault in self._faults:
+            if fault.matches(api_method, self._rng):
+                payload = {"ok": False, "error_code": fault.status, "description": fault.description}
+                if fault.retry_after is not None:
+                    payload["parameters"] = {"retry_after": fault.retry_after}
+                self.calls.append(Call(monotonic(), api_method, params, fault.status))
+                return fault.status, payload
+
+        result = await self._result(api_method, params)
+        self.calls.append(Call(monotonic(), api_method, params, 200))
+        return 200, {"ok": True, "result": result}
+
+
+async def serve(args):
+    api = FakeBotAPI(args.host, args.port, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    if args.flood_every:
+        api.flood(every=args.flood_every, retry_after=args.retry_after)
+    if args.error_rate:
+        api.fail(status=500, description="Internal Server Error: inyectado", probability=args.error_rate)
+    if args.updates:
+        with open(args.updates, encoding="utf-8") as f:
+            api.feed(*(json.loads(line) for line in f if line.strip()))
+    await api.start()
+    print(f"🧪 Bot API falsa en {api.base_url} ({api.pending_updates()} updates en el guion). Ctrl+C para parar.")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+        methods = {}
+        for call in api.calls:
+            methods[call.method] = methods.get(call.method, 0) + 1
+        print("📡 Llamadas recibidas:", ", ".join(f"{m}={n}" for m, n in sorted(methods.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--flood-every", type=int, default=0, help="Responder 429 a una de cada N llamadas")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0, help="Proporción de llamadas que fallan con 500")
+    parser.add_argument("--updates", help="Fichero JSONL con los updates que servirá getUpdates")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+# benchmarks/load_harness.py
+"""
+Arnés de carga: reproduce flujos de updates sintéticos a través de la aplicación
+real de `main.py` (mismos handlers, tubería, procesador por claves y managers)
+con un `Bot` que no habla con Telegram.
+
+- Los almacenes de `data/` se copian a un directorio temporal y se rellenan con
+  usuarios y eventos sintéticos hasta el tamaño pedido. Los originales no se tocan.
+- Las llamadas a la API de Telegram las contesta `FakeTelegramRequest` en memoria
+  o, con `--http`, la Bot API falsa local por HTTP (ambas con latencia
+  configurable). Las de la IA se sustituyen por esperas simuladas.
+- Se mezclan mensajes normales, menciones al bot, botones de la agenda, altas
+  de miembros, intentos del juego de la palabra y presentaciones.
+
+Para cada ritmo de entrada informa del rendimiento, la latencia p50/p99 (desde
+que el update entra en la cola hasta que termina el último handler) y el
+retraso del bucle de eventos.
+
+    python -m benchmarks.load_harness --rates 50 500 --duration 10 --users 5000
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+from collections import Counter
+from time import perf_counter, time
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
+from telegram.request import BaseRequest
+
+import main
+from src.config import settings
+from src.managers import ai_manager, word_game_manager
+from benchmarks.datagen import make_agenda, make_users
+from benchmarks.fake_bot_api import FakeBotAPI
+
+BOT_ID = 999_000_001
+BOT_USERNAME = "NimexChatBot"
+GROUP_ID = -1001234567890
+
+# Almacenes que el bot modifica: se redirigen a la copia temporal
+MUTABLE_STORES = {
+    "AGENDA_FILE": "agenda.json",
+    "USERS_FILE": "users.json",
+    "DEBATE_FILE": "debate.json",
+    "DEBATE_POOL_FILE": "debate_pool.json",
+    "WORD_GAME_FILE": "word_game.json",
+    "LEADERBOARD_FILE": "leaderboard.json",
+    "ACTIVITY_FILE": "activity.npz",
+}
+
+# Peso de cada tipo de update en el flujo
+MIX = {
+    "text": 70,
+    "guess": 8,
+    "callback": 8,
+    "mention": 5,
+    "presentation": 5,
+    "new_member": 2,
+    "command": 2,
+}
+
+CALLBACKS = ["ver_agenda", "inscribir_menu", "desinscribir_menu", "eliminar_menu"]
+COMMANDS = ["/nivel", "/ranking", "/ranking xp semana"]
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+
+# --- Bot falso ---
+
+class FakeTelegramRequest(BaseRequest):
+    """Contesta a la API de Telegram en memoria, con `latency` segundos de espera por llamada."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1_000_000)
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _result(self, endpoint: str, params: dict):
+        if endpoint == "getMe":
+            return {"id": BOT_ID, "is_bot": True, "first_name": "Nimex", "username": BOT_USERNAME,
+                    "can_join_groups": True, "can_read_all_group_messages": True, "supports_inline_queries": False}
+        if endpoint == "getUpdates":
+            return []
+        if endpoint == "getChatMember":
+            return {"status": "member", "user": {"id": int(params.get("user_id", 0)), "is_bot": False, "first_name": "X"}}
+        if endpoint.startswith(("send", "edit", "copy", "forward")):
+            chat_id = int(params.get("chat_id", GROUP_ID))
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time()),
+                "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+                "from": {"id": BOT_ID, "is_bot": True, "first_name": "Nimex", "username": BOT_USERNAME},
+                "text": str(params.get("text", "")),
+            }
+        return True
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None, write_timeout=None,
+                         connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        params = request_data.parameters if request_data else {}
+        return 200, json.dumps({"ok": True, "result": self._result(endpoint, params)}).encode()
+
+
+def fake_ai(latency: float):
+    """Sustituye las llamadas a Gemini por esperas de `latency` segundos."""
+    async def process_user_prompt(prompt: str, user_id: int):
+        await asyncio.sleep(latency)
+        return "¡Aúpa! Respuesta simulada 🍇"
+
+    async def evaluate_presentation(text: str) -> bool:
+        await asyncio.sleep(latency)
+        return len(text) > 40
+
+    ai_manager.process_user_prompt = process_user_prompt
+    ai_manager.evaluate_presentation = evaluate_presentation
+
+
+# --- Datos ---
+
+def prepare_data(data_dir: str, users: int, events: int, seed: int = 1) -> dict:
+    """Copia los almacenes a `data_dir`, los rellena hasta el tamaño pedido y redirige settings."""
+    for path in glob.glob("data/*.json"):
+        shutil.copy(path, data_dir)
+    for name, filename in MUTABLE_STORES.items():
+        setattr(settings, name, os.path.join(data_dir, filename))
+
+    try:
+        with open(settings.USERS_FILE, encoding="utf-8") as f:
+            users_db = json.load(f)
+    except FileNotFoundError:
+        users_db = {}
+    if len(users_db) < users:
+        users_db.update(make_users(users - len(users_db), seed=seed))
+    with open(settings.USERS_FILE, "w", encoding="utf-8") as f:
+        json.dump(users_db, f)
+
+    try:
+        with open(settings.AGENDA_FILE, encoding="utf-8") as f:
+            agenda = json.load(f)
+    except FileNotFoundError:
+        agenda = {}
+    existing = sum(len(day) for day in agenda.values())
+    if existing < events:
+        # Todos activos, para que los menús de la agenda tengan qué enseñar
+        for fecha, day in make_agenda(events - existing, list(users_db), days=14, seed=seed).items():
+            agenda.setdefault(fecha, []).extend(dict(event, activo=True) for event in day)
+    with open(settings.AGENDA_FILE, "w", encoding="utf-8") as f:
+        json.dump(agenda, f)
+
+    return {"users": len(users_db), "events": sum(len(day) for day in agenda.values())}
+
+
+# --- Updates sintéticos ---
+
+class UpdateFactory:
+    def __init__(self, bot, users_db: dict, seed: int = 1):
+        self.bot = bot
+        self.rng = random.Random(seed)
+        self.verified = [uid for uid, data in users_db.items() if data.get("status", "verified") == "verified"]
+        self.pending = [uid for uid, data in users_db.items() if data.get("status", "verified") != "verified"]
+        self.update_ids = itertools.count(1)
+        self.message_ids = itertools.count(1)
+        self.new_user_ids = itertools.count(7_000_000_000)
+        self.kinds, self.weights = zip(*MIX.items())
+
+    def _user(self, user_id) -> dict:
+        return {"id": int(user_id), "is_bot": False, "first_name": f"Usuario {user_id}"}
+
+    def _message(self, user: dict, text: str | None = None, **extra) -> dict:
+        message = {
+            "message_id": next(self.message_ids),
+            "date": int(time()),
+            "chat": {"id": GROUP_ID, "type": "supergroup", "title": "Grupo"},
+            "from": user,
+            **extra,
+        }
+        if text is not None:
+            message["text"] = text
+            if text.startswith("/"):
+                command = text.split()[0]
+                message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        return message
+
+    def make(self) -> Update:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "presentation" and not self.pending:
+            kind = "text"
+        user = self._user(self.rng.choice(self.pending if kind == "presentation" else self.verified))
+        update = {"update_id": next(self.update_ids)}
+
+        if kind == "text":
+            update["message"] = self._message(user, self.rng.choice(["jajaja", "¿quién se viene esta noche?", "buenas 👋"]))
+        elif kind == "guess":
+            word = word_game_manager.get_current_word() if self.rng.random() < 0.05 else "patata"
+            update["message"] = self._message(user, word or "patata")
+        elif kind == "mention":
+            update["message"] = self._message(user, f"@{BOT_USERNAME} ¿qué planes hay este finde?")
+        elif kind == "presentation":
+            update["message"] = self._message(user, "¡Hola! Soy de Logroño, me gusta el monte y salir de vinos por la Laurel.")
+        elif kind == "command":
+            update["message"] = self._message(user, self.rng.choice(COMMANDS))
+        elif kind == "new_member":
+            newcomer = self._user(next(self.new_user_ids))
+            update["message"] = self._message(newcomer, new_chat_members=[newcomer])
+        else:  # callback
+            update["callback_query"] = {
+                "id": str(update["update_id"]),
+                "from": user,
+                "chat_instance": "bench",
+                "data": self.rng.choice(CALLBACKS),
+                "message": self._message({"id": BOT_ID, "is_bot": True, "first_name": "Nimex"}, "¿Qué quieres hacer con la agenda?"),
+            }
+        return Update.de_json(update, self.bot)
+
+
+# --- Medición ---
+
+class Recorder:
+    def __init__(self):
+        self.enqueued: dict[int, float] = {}
+        self.started: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.handler_times: list[float] = []
+        self.errors = 0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def mark_start(self, update, context):
+        self.started[update.update_id] = perf_counter()
+
+    async def mark_end(self, update, context):
+        now = perf_counter()
+        self.latencies.append(now - self.enqueued.pop(update.update_id))
+        self.handler_times.append(now - self.started.pop(update.update_id))
+        if len(self.latencies) >= self.expected:
+            self.done.set()
+
+    async def on_error(self, update, context):
+        self.errors += 1
+
+
+async def monitor_loop_lag(samples: list[float], interval: float = 0.01):
+    """Cuánto se retrasa un `sleep(interval)`: mide lo que tarda el bucle en atender a todos."""
+    while True:
+        start = perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(perf_counter() - start - interval)
+
+
+async def run_phase(app, factory: UpdateFactory, recorder: Recorder, rate: float, duration: float) -> dict:
+    total = int(rate * duration)
+    recorder.__init__()
+    recorder.expected = total
+    lag: list[float] = []
+    monitor = asyncio.create_task(monitor_loop_lag(lag))
+
+    start = perf_counter()
+    for i in range(total):
+        # Ritmo constante: si vamos adelantados esperamos, si vamos tarde no
+        delay = start + i / rate - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        update = factory.make()
+        recorder.enqueued[update.update_id] = perf_counter()
+        await app.update_queue.put(update)
+
+    try:
+        await asyncio.wait_for(recorder.done.wait(), timeout=max(30.0, duration * 3))
+    except asyncio.TimeoutError:
+        pass
+    elapsed = perf_counter() - start
+    monitor.cancel()
+
+    return {
+        "rate": rate,
+        "sent": total,
+        "processed": len(recorder.latencies),
+        "throughput": len(recorder.latencies) / elapsed,
+        "p50_ms": percentile(recorder.latencies, 0.5),
+        "p99_ms": percentile(recorder.latencies, 0.99),
+        "handler_p50_ms": percentile(recorder.handler_times, 0.5),
+        "handler_p99_ms": percentile(recorder.handler_times, 0.99),
+        "lag_p50_ms": percentile(lag, 0.5),
+        "lag_p99_ms": percentile(lag, 0.99),
+        "lag_max_ms": max(lag, default=0.0) * 1000,
+        "errors": recorder.errors,
+    }
+
+
+async def main_async(args):
+    fake_ai(args.ai_ms / 1000)
+    builder = ApplicationBuilder().token(f"{BOT_ID}:HARNESS")
+    if args.http:
+        # Llamadas HTTP reales contra la Bot API falsa local (incluye el coste de httpx)
+        api = FakeBotAPI(latency=args.api_ms / 1000)
+        await api.start()
+        builder = builder.base_url(f"{api.base_url}/bot")
+    else:
+        request = FakeTelegramRequest(args.api_ms / 1000)
+        builder = builder.request(request).get_updates_request(request)
+    app = main.build_application(builder, with_jobs=False, rate_limiter=args.rate_limit)
+
+    recorder = Recorder()
+    app.add_handler(TypeHandler(Update, recorder.mark_start), group=-100)
+    app.add_handler(TypeHandler(Update, recorder.mark_end), group=100)
+    app.add_error_handler(recorder.on_error)
+
+    async with app:
+        await app.start()
+        word_game_manager.set_game_state(True, "vendimia", 1)
+        factory = UpdateFactory(app.bot, main.user_manager.users_db, seed=args.seed)
+
+        # Los mensajes de log del bot taparían la tabla: se silencian salvo con --verbose
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            results = [await run_phase(app, factory, recorder, rate, args.duration) for rate in args.rates]
+        await app.stop()
+
+    print(f"{'ritmo':>7}{'procesados':>12}{'upd/s':>8}{'p50':>8}{'p99':>9}"
+          f"{'handler p50':>13}{'p99':>8}{'lag p50':>9}{'p99':>7}{'máx':>8}{'errores':>9}")
+    for r in results:
+        print(
+            f"{r['rate']:>7.0f}{r['processed']:>7}/{r['sent']:<4}{r['throughput']:>8.0f}"
+            f"{r['p50_ms']:>8.1f}{r['p99_ms']:>9.1f}{r['handler_p50_ms']:>13.1f}{r['handler_p99_ms']:>8.1f}"
+            f"{r['lag_p50_ms']:>9.1f}{r['lag_p99_ms']:>7.1f}{r['lag_max_ms']:>8.1f}{r['errors']:>9}"
+        )
+    if args.http:
+        await api.stop()
+        calls = Counter(call.method for call in api.calls)
+    else:
+        calls = request.calls
+    print("\n📡 Llamadas a la API (falsa) de Telegram:",
+          ", ".join(f"{endpoint}={count}" for endpoint, count in calls.most_common()))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=float, nargs="+", default=[50, 500], help="Updates por segundo de cada fase")
+    parser.add_argument("--duration", type=float, default=10, help="Segundos de cada fase")
+    parser.add_argument("--users", type=int, default=2000, help="Tamaño mínimo de users.json")
+    parser.add_argument("--events", type=int, default=200, help="Tamaño mínimo de la agenda")
+    parser.add_argument("--api-ms", type=float, default=20, help="Latencia simulada de la API de Telegram")
+    parser.add_argument("--ai-ms", type=float, default=800, help="Latencia simulada de Gemini")
+    parser.add_argument("--http", action="store_true", help="Hablar por HTTP con la Bot API falsa (benchmarks/fake_bot_api.py)")
+    parser.add_argument("--rate-limit", action="store_true", help="Aplicar los límites de Telegram del despachador")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Mostrar los mensajes de log del bot")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nimex-load-") as data_dir:
+        sizes = prepare_data(data_dir, args.users, args.events, args.seed)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            main.load_data()
+        print(f"🗂️ Datos temporales en {data_dir}: {sizes['users']} usuarios, {sizes['events']} eventos.")
+        print(f"🤖 API de Telegram {args.api_ms:.0f} ms, IA {args.ai_ms:.0f} ms, "
+              f"límites de Telegram {'activados' if args.rate_limit else 'desactivados'}. Tiempos en ms.\n")
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main_cli()
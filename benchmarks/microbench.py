@@ -0,0 +1,321 @@
+# benchmarks/microbench.py
+"""
+Microbenchmarks de los caminos calientes de los managers sobre datos sintéticos.
+
+Cada caso se mide a varios tamaños (usuarios o eventos): tiempo por llamada
+(mínimo y mediana de varias repeticiones) y pico de memoria con tracemalloc
+(en una pasada aparte, para no falsear los tiempos). El resultado se guarda en
+JSON y dos ficheros se pueden comparar para valorar cualquier cambio de
+almacenamiento o de índices.
+
+    python -m benchmarks.microbench run --users 1000 10000 100000 --events 1000 50000 -o antes.json
+    python -m benchmarks.microbench run ... -o despues.json
+    python -m benchmarks.microbench compare antes.json despues.json
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Callable
+
+from src.config import settings
+from src.managers import agenda_manager, user_manager
+from benchmarks.datagen import make_agenda, make_users
+
+# Un bloque cronometrado dura al menos esto (se repite la llamada las veces necesarias)
+MIN_BLOCK_SECONDS = 0.02
+MAX_CALLS_PER_BLOCK = 10_000
+
+
+@dataclass
+class Case:
+    name: str
+    scale: str  # "users" o "events": qué tamaño se varía
+    # prepare(env) -> función sin argumentos que hace UNA llamada al código medido
+    prepare: Callable[[dict], Callable[[], object]]
+    # Algunas llamadas consumen estado (cooldowns, usuarios caducados): se rehace antes de cada bloque
+    reset: Callable[[dict], None] | None = None
+    max_calls: int = MAX_CALLS_PER_BLOCK
+
+
+# --- Datos ---
+
+def load_dataset(data_dir: str, users: int, events: int) -> dict:
+    """Escribe y carga en los managers un conjunto sintético. Devuelve el entorno de los casos."""
+    settings.USERS_FILE = os.path.join(data_dir, "users.json")
+    settings.AGENDA_FILE = os.path.join(data_dir, "agenda.json")
+    settings.LEADERBOARD_FILE = os.path.join(data_dir, "leaderboard.json")
+
+    users_db = make_users(users)
+    with open(settings.USERS_FILE, "w", encoding="utf-8") as f:
+        json.dump(users_db, f)
+    user_manager.load_users()
+    agenda_manager.agenda = defaultdict(list, make_agenda(events, list(users_db)))
+
+    user_ids = list(users_db)
+    event_ids = [event["id"] for day in agenda_manager.agenda.values() for event in day]
+    random.Random(2).shuffle(user_ids)
+    return {"user_ids": user_ids, "event_ids": event_ids, "users": users, "events": events}
+
+
+def _cycle(items: list):
+    """Iterador infinito sobre `items` (sin coste apreciable por llamada)."""
+    while True:
+        yield from items
+
+
+# --- Casos ---
+
+def _reset_xp_cooldowns(env):
+    for data in user_manager.users_db.values():
+        data["last_xp_timestamp"] = 0
+
+
+def _prepare_grant_xp(env):
+    ids = _cycle(env["user_ids"])
+    return lambda: user_manager.grant_xp_on_message(int(next(ids)))
+
+
+def _prepare_update_activity(env):
+    users = _cycle([SimpleNamespace(id=int(uid), first_name="X", username=None) for uid in env["user_ids"]])
+    return lambda: user_manager.update_user_activity(next(users))
+
+
+def _prepare_eventos_activos(env):
+    return agenda_manager.obtener_eventos_activos
+
+
+def _prepare_apuntar(env):
+    rng = random.Random(3)
+    event_ids = env["event_ids"]
+    user_ids = env["user_ids"]
+
+    def call():
+        uid = rng.choice(user_ids)
+        info = {"id": int(uid), "first_name": "X", "nombre": "X", "username": None}
+        return agenda_manager.apuntar_a_evento_por_id(rng.choice(event_ids), info)
+    return call
+
+
+def _prepare_random_verified(env):
+    return lambda: user_manager.get_random_verified_users(3)
+
+
+class _SilentBot:
+    async def send_message(self, chat_id, text):
+        pass
+
+    async def kick_chat_member(self, chat_id, user_id):
+        pass
+
+    async def unban_chat_member(self, chat_id, user_id):
+        pass
+
+
+def _expire_some_users(env):
+    """Deja caducado a un 5% de los usuarios (con vidas de sobra para que no los expulse)."""
+    old = (datetime.now() - timedelta(days=settings.INACTIVITY_DAYS + 1)).isoformat()
+    for uid in env["user_ids"][: max(1, len(env["user_ids"]) // 20)]:
+        data = user_manager.users_db[uid]
+        data["lives"] = 3
+        data["last_seen"] = old
+    user_manager._rebuild_last_seen_index()
+
+
+def _prepare_inactivity(env):
+    settings.GROUP_CHAT_ID = settings.GROUP_CHAT_ID or -100
+    context = SimpleNamespace(bot=_SilentBot())
+    loop = env["loop"]
+    return lambda: loop.run_until_complete(user_manager.check_inactivity_job(context))
+
+
+CASES = [
+    Case("grant_xp_on_message", "users", _prepare_grant_xp, reset=_reset_xp_cooldowns),
+    Case("update_user_activity", "users", _prepare_update_activity),
+    Case("get_random_verified_users", "users", _prepare_random_verified),
+    Case("check_inactivity_job", "users", _prepare_inactivity, reset=_expire_some_users, max_calls=1),
+    Case("save_users", "users", lambda env: user_manager.save_users),
+    Case("obtener_eventos_activos", "events", _prepare_eventos_activos),
+    Case("apuntar_a_evento_por_id", "events", _prepare_apuntar),
+    Case("guardar_agenda", "events", lambda env: agenda_manager.guardar_agenda),
+]
+
+
+# --- Medición ---
+
+def _calibrate(call, max_calls: int) -> int:
+    """Cuántas llamadas caben en un bloque de MIN_BLOCK_SECONDS."""
+    number = 1
+    while number < max_calls:
+        start = perf_counter()
+        for _ in range(number):
+            call()
+        if perf_counter() - start >= MIN_BLOCK_SECONDS:
+            break
+        number *= 2
+    return min(number, max_calls)
+
+
+def measure(case: Case, env: dict, repeat: int) -> dict:
+    call = case.prepare(env)
+    if case.reset:
+        case.reset(env)
+    number = _calibrate(call, case.max_calls)
+
+    per_call = []
+    for _ in range(repeat):
+        if case.reset:
+            case.reset(env)
+        gc.collect()
+        start = perf_counter()
+        for _ in range(number):
+            call()
+        per_call.append((perf_counter() - start) / number)
+
+    # Memoria: una llamada con tracemalloc activo
+    if case.reset:
+        case.reset(env)
+    gc.collect()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": case.name,
+        "scale": case.scale,
+        "size": env[case.scale],
+        "calls_per_block": number,
+        "repeat": repeat,
+        "min_us": min(per_call) * 1e6,
+        "median_us": statistics.median(per_call) * 1e6,
+        "peak_kb": peak / 1024,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    selected = [case for case in CASES if not args.only or case.name in args.only]
+    results = []
+    loop = asyncio.new_event_loop()
+    # (usuarios, eventos) de cada conjunto: se varía una dimensión y la otra queda en su mínimo
+    datasets = [(users, min(args.events)) for users in args.users]
+    datasets += [(min(args.users), events) for events in args.events if (min(args.users), events) not in datasets]
+
+    with tempfile.TemporaryDirectory(prefix="nimex-microbench-") as data_dir:
+        for users, events in datasets:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                env = load_dataset(data_dir, users, events)
+            env["loop"] = loop
+            for case in selected:
+                # Cada caso solo se mide en los conjuntos que varían su dimensión
+                if case.scale == "users" and events != min(args.events):
+                    continue
+                if case.scale == "events" and users != min(args.users):
+                    continue
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    result = measure(case, env, args.repeat)
+                results.append(result)
+                print(f"⏱️ {case.name:<28}{case.scale:>7}={result['size']:<8}"
+                      f"{result['median_us']:>12.1f} µs{result['peak_kb']:>12.1f} KB")
+    loop.close()
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+# --- Comparación ---
+
+def compare(old: dict, new: dict, threshold: float) -> list[dict]:
+    """Empareja los resultados por (caso, tamaño) y calcula la variación del tiempo y la memoria."""
+    old_by_key = {(r["name"], r["size"]): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        before = old_by_key.get((r["name"], r["size"]))
+        if before is None:
+            continue
+        ratio = r["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        rows.append({
+            "name": r["name"],
+            "size": r["size"],
+            "before_us": before["median_us"],
+            "after_us": r["median_us"],
+            "ratio": ratio,
+            "peak_before_kb": before["peak_kb"],
+            "peak_after_kb": r["peak_kb"],
+            "verdict": "peor" if ratio > 1 + threshold else "mejor" if ratio < 1 - threshold else "igual",
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Ejecuta los microbenchmarks")
+    run_parser.add_argument("--users", type=int, nargs="+", default=[1000, 10_000])
+    run_parser.add_argument("--events", type=int, nargs="+", default=[1000])
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--only", nargs="+", choices=[case.name for case in CASES])
+    run_parser.add_argument("-o", "--output", help="Fichero JSON de resultados")
+
+    compare_parser = sub.add_parser("compare", help="Compara dos ficheros de resultados")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Variación a partir de la que se marca (0.10 = 10%%)")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"\n💾 Resultados guardados en {args.output}")
+        return
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+    rows = compare(before, after, args.threshold)
+    print(f"📊 {before['meta'].get('commit')} -> {after['meta'].get('commit')}\n")
+    print(f"{'caso':<28}{'tamaño':>9}{'antes (µs)':>13}{'después (µs)':>14}{'x':>8}{'pico KB':>18}")
+    for row in rows:
+        mark = {"peor": "🔴", "mejor": "🟢", "igual": "⚪"}[row["verdict"]]
+        print(f"{row['name']:<28}{row['size']:>9}{row['before_us']:>13.1f}{row['after_us']:>14.1f}"
+              f"{row['ratio']:>8.2f}{row['peak_before_kb']:>9.0f}->{row['peak_after_kb']:<7.0f} {mark}")
+    if any(row["verdict"] == "peor" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
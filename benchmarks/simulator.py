@@ -0,0 +1,505 @@
+# benchmarks/simulator.py
+"""
+Simulador con reloj virtual de todo lo que mueve la JobQueue.
+
+Los bucles aleatorios (incitación al debate y juego de la palabra), las tareas
+diarias (inactividad, debate del día y su desanclado) y los temporizadores de
+verificación (aviso y expulsión) solo se podían observar en tiempo real. Aquí
+se ejecutan tal cual, pero sobre una cola de jobs y un reloj virtuales: el
+tiempo salta de un evento al siguiente y meses de grupo pasan en segundos.
+
+La población es sintética y determinista (misma semilla, mismo resultado):
+
+- Los miembros iniciales escriben según su ritmo diario (con miembros dormidos
+  que acabarán perdiendo vidas) y un reparto por horas realista. Cada mensaje
+  pasa por la tubería real (`pipeline.handle_message`).
+- Cada día entran miembros nuevos: unos saludan y se presentan (antes o después
+  del aviso), otros saludan y desaparecen, y otros ni siquiera escriben.
+- La IA contesta al instante (se cuentan las llamadas) y los guardados de los
+  almacenes se cuentan sin tocar el disco.
+
+Al final informa del volumen de mensajes, las llamadas a la API por método, las
+escrituras por almacén y el tamaño máximo de la cola de jobs:
+
+    python -m benchmarks.simulator --days 180 --users 2000 --joins-per-day 4 --messages-per-day 0.5
+    python -m benchmarks.simulator --days 90 -o antes.json
+"""
+import argparse
+import asyncio
+import contextlib
+import heapq
+import itertools
+import json
+import os
+import random
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Callable
+from unittest import mock
+
+import numpy as np
+from telegram import Chat, Message, Update, User
+
+import main as bot_main
+from src.config import settings
+from src.handlers import general_handlers, pipeline
+from src.managers import (
+    activity_manager, agenda_manager, ai_manager, debate_manager, leaderboard_manager,
+    user_manager, word_game_manager,
+)
+from benchmarks.datagen import make_users
+from benchmarks.load_harness import MUTABLE_STORES
+from benchmarks.microbench import _git_commit
+
+START = datetime(2025, 1, 6)  # Un lunes cualquiera: el resultado no depende del día en que se lance
+HOUR = 3600
+DAY = 24 * HOUR
+CHAT_ID = -100_123
+
+# Peso de cada hora del día (0-23 h) en los mensajes del grupo
+HOURLY_WEIGHTS = np.array([3, 2, 1, 1, 1, 1, 2, 4, 6, 7, 8, 9, 10, 9, 8, 8, 9, 10, 12, 14, 15, 13, 9, 5], dtype=float)
+HOURLY_WEIGHTS /= HOURLY_WEIGHTS.sum()
+
+PRESENTATION_TEXT = "Hola, soy nuevo por aquí: me gusta el monte, la cocina y los juegos de mesa."
+GREETING_TEXT = "¡Hola a todos!"
+CHATTER = ["jajaja", "¿alguien se apunta a algo este finde?", "buenos días", "qué calor hace hoy",
+           "yo voto que sí", "no lo tengo tan claro", "mañana no puedo", "¡vamos!"]
+TOPIC_WORDS = ["teletrabajo", "redes sociales", "viajar solo", "la siesta", "el fútbol", "la tortilla con cebolla",
+               "las series", "madrugar", "el verano", "los gatos", "vivir en el campo", "la música en directo",
+               "los videojuegos", "aprender idiomas", "cocinar", "las bodas", "el gimnasio", "los podcasts"]
+
+
+# --- Reloj virtual ---
+
+class VirtualClock:
+    def __init__(self, start: datetime = START):
+        self.timestamp = start.timestamp()
+
+    def time(self) -> float:
+        return self.timestamp
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp)
+
+
+clock = VirtualClock()
+
+
+class VirtualDatetime(datetime):
+    """`datetime` cuyo `now()` es la hora del reloj virtual."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.fromtimestamp(clock.timestamp, tz)
+
+
+class VirtualDate(date):
+    @classmethod
+    def today(cls):
+        return cls.fromtimestamp(clock.timestamp)
+
+
+# --- Cola de jobs ---
+
+@dataclass(order=True)
+class SimJob:
+    due: float
+    seq: int
+    callback: Callable = field(compare=False)
+    name: str = field(compare=False)
+    data: Any = field(compare=False, default=None)
+    chat_id: int | None = field(compare=False, default=None)
+    user_id: int | None = field(compare=False, default=None)
+    interval: float | None = field(compare=False, default=None)
+    removed: bool = field(compare=False, default=False)
+
+    def schedule_removal(self):
+        self.removed = True
+
+
+class SimJobQueue:
+    """La parte de `telegram.ext.JobQueue` que usa el bot, sobre el reloj virtual."""
+
+    def __init__(self):
+        self._heap: list[SimJob] = []
+        self._seq = itertools.count()
+        self.peak_size = 0
+        self.runs: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def __len__(self):
+        return sum(not job.removed for job in self._heap)
+
+    @staticmethod
+    def _due(when) -> float:
+        if isinstance(when, datetime):
+            return when.timestamp()
+        if isinstance(when, timedelta):
+            return clock.timestamp + when.total_seconds()
+        return clock.timestamp + float(when)
+
+    def _add(self, callback, due: float, name: str | None, **kwargs) -> SimJob:
+        job = SimJob(due, next(self._seq), callback, name or callback.__name__, **kwargs)
+        heapq.heappush(self._heap, job)
+        self.peak_size = max(self.peak_size, len(self))
+        return job
+
+    def run_once(self, callback, when, data=None, name=None, chat_id=None, user_id=None, job_kwargs=None):
+        return self._add(callback, self._due(when), name, data=data, chat_id=chat_id, user_id=user_id)
+
+    def run_repeating(self, callback, interval, first=None, last=None, data=None, name=None,
+                      chat_id=None, user_id=None, job_kwargs=None):
+        interval = interval.total_seconds() if isinstance(interval, timedelta) else float(interval)
+        due = self._due(interval if first is None else first)
+        return self._add(callback, due, name, data=data, chat_id=chat_id, user_id=user_id, interval=interval)
+
+    def run_daily(self, callback, time, days=tuple(range(7)), data=None, name=None,
+                  chat_id=None, user_id=None, job_kwargs=None):
+        now = clock.now()
+        first = datetime.combine(now.date(), time)
+        if first <= now:
+            first += timedelta(days=1)
+        return self._add(callback, first.timestamp(), name, data=data, chat_id=chat_id, user_id=user_id,
+                         interval=DAY)
+
+    def get_jobs_by_name(self, name: str) -> tuple[SimJob, ...]:
+        return tuple(job for job in self._heap if job.name == name and not job.removed)
+
+    def next_due(self) -> float | None:
+        while self._heap and self._heap[0].removed:
+            heapq.heappop(self._heap)
+        return self._heap[0].due if self._heap else None
+
+    async def run_next(self, context_factory):
+        """Ejecuta el siguiente job (el reloj ya está en su hora) y reprograma los periódicos."""
+        job = heapq.heappop(self._heap)
+        # Por callback y no por nombre (hay uno por usuario en verificación); con el módulo, que hay dos save_job
+        name = f"{job.callback.__module__.rsplit('.', 1)[-1]}.{job.callback.__name__}"
+        self.runs[name] += 1
+        try:
+            await job.callback(context_factory(job))
+        except Exception as e:
+            # Como PTB: el fallo de un job no para la cola
+            self.errors[name] += 1
+            print(f"🚨 Error en el job {name}: {e}")
+        if job.interval and not job.removed:
+            job.due += job.interval
+            job.seq = next(self._seq)
+            heapq.heappush(self._heap, job)
+
+
+# --- Telegram falso ---
+
+class SimBot:
+    """Cuenta cada método de la API al que se llama y contesta al instante."""
+    username = "NimexChatBot"
+    defaults = None  # Lo consulta Message.reply_text
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1)
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        async def call(*args, **kwargs):
+            self.calls[method] += 1
+            return SimpleNamespace(message_id=next(self._message_ids))
+        return call
+
+
+@dataclass
+class Member:
+    user: User
+    rate: float  # Mensajes al día de media
+    spoke: bool = False
+
+
+# --- Simulación ---
+
+class Simulator:
+    def __init__(self, days: int, users: int, joins_per_day: float, messages_per_day: float = 1.5,
+                 dormant: float = 0.2, present_rate: float = 0.7, guess_rate: float = 0.05, seed: int = 1):
+        self.days = days
+        self.users = users
+        self.joins_per_day = joins_per_day
+        self.messages_per_day = messages_per_day
+        self.dormant = dormant
+        self.present_rate = present_rate
+        self.guess_rate = guess_rate
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.bot = SimBot()
+        self.job_queue = SimJobQueue()
+        self.chat = Chat(CHAT_ID, Chat.SUPERGROUP, title="Grupo simulado")
+        self.members: dict[int, Member] = {}
+        self.stats: Counter = Counter()
+        self.store_writes: Counter = Counter()
+        self.ai_calls: Counter = Counter()
+        self._events: list[tuple] = []  # Eventos de la población: (hora, orden, corrutina, argumentos)
+        self._seq = itertools.count()
+        self._update_ids = itertools.count(1)
+        self._text_updates: dict[tuple[int, str], Update] = {}
+        self._new_user_ids = itertools.count(900_000)
+
+    # --- Parches ---
+
+    def _counting_save(self, store: str, module=None):
+        """Sustituto de un guardado: cuenta la escritura (si había cambios) y no toca el disco."""
+        def save(*args, **kwargs):
+            if module is not None:
+                if not module._dirty:
+                    return
+                module._dirty = False
+            self.store_writes[store] += 1
+        return save
+
+    async def _generate_text(self, prompt: str) -> str:
+        self.ai_calls["generate_text"] += 1
+        rng = random.Random(self.ai_calls["generate_text"])
+        return "\n".join(f"¿Mejor {a} o {b}?" for a, b in (rng.sample(TOPIC_WORDS, 2) for _ in range(5)))
+
+    async def _evaluate_presentation(self, text: str) -> bool:
+        self.ai_calls["evaluate_presentation"] += 1
+        return text == PRESENTATION_TEXT
+
+    def _patches(self, data_dir: str) -> list:
+        patches = [mock.patch.object(settings, name, os.path.join(data_dir, filename))
+                   for name, filename in MUTABLE_STORES.items()]
+        patches += [
+            mock.patch.object(settings, "GROUP_CHAT_ID", CHAT_ID),
+            # Reloj virtual
+            mock.patch.object(user_manager, "datetime", VirtualDatetime),
+            mock.patch.object(user_manager, "time", clock.time),
+            mock.patch.object(activity_manager, "datetime", VirtualDatetime),
+            mock.patch.object(activity_manager, "time", clock.time),
+            mock.patch.object(debate_manager, "datetime", VirtualDatetime),
+            mock.patch.object(word_game_manager, "datetime", VirtualDatetime),
+            mock.patch.object(leaderboard_manager, "date", VirtualDate),
+            # IA instantánea
+            mock.patch.object(debate_manager, "generate_text", self._generate_text),
+            mock.patch.object(ai_manager, "generate_text", self._generate_text),
+            mock.patch.object(ai_manager, "evaluate_presentation", self._evaluate_presentation),
+            # Guardados contados
+            mock.patch.object(user_manager, "save_users", self._counting_save("users")),
+            mock.patch.object(agenda_manager, "guardar_agenda", self._counting_save("agenda")),
+            mock.patch.object(debate_manager, "save_debate_data", self._counting_save("debate")),
+            mock.patch.object(debate_manager, "save_topic_pool", self._counting_save("debate_pool")),
+            mock.patch.object(word_game_manager, "save_word_game_data", self._counting_save("word_game")),
+            mock.patch.object(leaderboard_manager, "save", self._counting_save("leaderboard", leaderboard_manager)),
+            mock.patch.object(activity_manager, "save", self._counting_save("activity", activity_manager)),
+        ]
+        return patches
+
+    # --- Datos ---
+
+    def _draw_rate(self) -> float:
+        # Lognormal con media `messages_per_day`: pocos hablan mucho y muchos hablan poco
+        return float(self.rng.lognormal(np.log(self.messages_per_day) - 0.5, 1.0))
+
+    def _load(self, data_dir: str):
+        users_db = make_users(self.users, seed=self.seed, now=clock.now())
+        for uid, data in users_db.items():
+            data["status"] = "verified"  # Los miembros de partida ya pasaron la verificación
+            user = User(int(uid), data["first_name"], False, username=data["username"])
+            rate = 0.0 if self.rng.random() < self.dormant else self._draw_rate()
+            self.members[user.id] = Member(user, rate, spoke=True)
+        with open(settings.USERS_FILE, "w", encoding="utf-8") as f:
+            json.dump(users_db, f)
+
+        user_manager.load_users()
+        agenda_manager.cargar_agenda()
+        debate_manager.load_debate_data()
+        debate_manager.load_topic_pool()
+        word_game_manager.load_word_game_data()
+        activity_manager.reset()  # Ya con el reloj virtual
+
+    # --- Eventos de la población ---
+
+    def _at(self, timestamp: float, handler, *args):
+        heapq.heappush(self._events, (timestamp, next(self._seq), handler, args))
+
+    def _context(self, job: SimJob | None = None):
+        return SimpleNamespace(bot=self.bot, job_queue=self.job_queue, job=job, user_data={}, chat_data={})
+
+    def _update(self, user: User, **message_kwargs) -> Update:
+        message = Message(next(self._update_ids), datetime.fromtimestamp(clock.timestamp, timezone.utc),
+                          self.chat, from_user=user, **message_kwargs)
+        message.set_bot(self.bot)
+        return Update(message.message_id, message=message)
+
+    def _text_update(self, user: User, text: str) -> Update:
+        # Construir un Message de PTB cuesta más que procesarlo: se reutiliza por (usuario, texto).
+        # La tubería no mira ni la fecha ni el id del mensaje.
+        key = (user.id, text)
+        update = self._text_updates.get(key)
+        if update is None:
+            update = self._text_updates[key] = self._update(user, text=text)
+        return update
+
+    async def _hour_tick(self):
+        members = list(self.members.values())
+        rates = np.fromiter((member.rate for member in members), dtype=float, count=len(members))
+        counts = self.rng.poisson(rates * HOURLY_WEIGHTS[clock.now().hour])
+        for index in np.flatnonzero(counts):
+            for offset in self.rng.uniform(0, HOUR, counts[index]):
+                self._at(clock.timestamp + offset, self._message, members[index].user.id, None)
+        self._at(clock.timestamp + HOUR, self._hour_tick)
+
+    async def _day_tick(self):
+        for offset in self.rng.uniform(0, DAY, self.rng.poisson(self.joins_per_day)):
+            self._at(clock.timestamp + offset, self._join)
+        self._at(clock.timestamp + DAY, self._day_tick)
+
+    async def _message(self, user_id: int, text: str | None):
+        member = self.members.get(user_id)
+        if member is None:
+            return
+        if member.spoke and str(user_id) not in user_manager.users_db:
+            # Expulsado (por inactividad o por no presentarse): deja de escribir
+            del self.members[user_id]
+            return
+        member.spoke = True
+        if text is None:
+            if word_game_manager.is_game_active() and self.rng.random() < self.guess_rate:
+                text = word_game_manager.get_current_word()
+            else:
+                text = CHATTER[self.rng.integers(len(CHATTER))]
+        self.stats["messages_in"] += 1
+        await pipeline.handle_message(self._text_update(member.user, text), self._context())
+
+    async def _join(self):
+        user_id = next(self._new_user_ids)
+        user = User(user_id, f"Nuevo {user_id}", False)
+        presents = self.rng.random() < self.present_rate
+        self.members[user_id] = Member(user, self._draw_rate() if presents else 0.0)
+        self.stats["joins"] += 1
+        await general_handlers.saludar_nuevo_miembro(self._update(user, new_chat_members=(user,)), self._context())
+
+        # Unos saludan y se presentan (algunos ya avisados), otros saludan y se van, otros ni saludan
+        deadline = (settings.PRESENTATION_TIMEOUT_MINUTES + settings.PRESENTATION_WARNING_GRACE_MINUTES) * 60
+        if presents or self.rng.random() < 0.5:
+            self._at(clock.timestamp + self.rng.uniform(30, 300), self._message, user_id, GREETING_TEXT)
+        if presents:
+            self._at(clock.timestamp + self.rng.uniform(300, deadline * 0.9), self._message, user_id, PRESENTATION_TEXT)
+
+    # --- Bucle principal ---
+
+    async def _run(self):
+        # Lo mismo que hace main.py al arrancar
+        bot_main.schedule_jobs(self.job_queue)
+        await debate_manager.check_and_run_startup_debate(self.bot, settings.GROUP_CHAT_ID)
+        debate_manager.schedule_next_incitement(self.job_queue)
+        word_game_manager.schedule_next_word_game(self.job_queue)
+
+        self._at(clock.timestamp, self._hour_tick)
+        self._at(clock.timestamp, self._day_tick)
+        end = clock.timestamp + self.days * DAY
+        while True:
+            job_due = self.job_queue.next_due()
+            event_due = self._events[0][0] if self._events else None
+            if job_due is not None and (event_due is None or job_due <= event_due):
+                if job_due > end:
+                    break
+                clock.timestamp = job_due
+                await self.job_queue.run_next(self._context)
+            elif event_due is not None and event_due <= end:
+                clock.timestamp, _, handler, args = heapq.heappop(self._events)
+                await handler(*args)
+            else:
+                break
+
+    def run(self, verbose: bool = False) -> dict:
+        random.seed(self.seed)
+        clock.timestamp = START.timestamp()
+        started = perf_counter()
+        with tempfile.TemporaryDirectory(prefix="nimex-sim-") as data_dir, contextlib.ExitStack() as stack:
+            for patch in self._patches(data_dir):
+                stack.enter_context(patch)
+            if not verbose:
+                stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+            self._load(data_dir)
+            asyncio.run(self._run())
+        return self.report(perf_counter() - started)
+
+    def report(self, wall_seconds: float) -> dict:
+        calls = self.bot.calls
+        return {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "days": self.days, "users": self.users, "joins_per_day": self.joins_per_day,
+                "messages_per_day": self.messages_per_day, "seed": self.seed,
+            },
+            "wall_seconds": round(wall_seconds, 3),
+            "population": {
+                "initial": self.users,
+                "joined": self.stats["joins"],
+                "final": len(user_manager.users_db),
+                "kicked_inactive": calls["kick_chat_member"],
+                "banned_no_presentation": calls["ban_chat_member"],
+            },
+            "messages": {"inbound": self.stats["messages_in"], "outbound": calls["send_message"]},
+            "api_calls": dict(sorted(calls.items())),
+            "store_writes": dict(sorted(self.store_writes.items())),
+            "ai_calls": dict(sorted(self.ai_calls.items())),
+            "job_queue": {
+                "peak_size": self.job_queue.peak_size,
+                "runs": dict(sorted(self.job_queue.runs.items())),
+                "errors": dict(sorted(self.job_queue.errors.items())),
+            },
+        }
+
+
+def print_report(report: dict):
+    days = report["meta"]["days"]
+    print(f"🕰️ {days} días simulados en {report['wall_seconds']:.2f} s "
+          f"({days / report['wall_seconds']:.0f} días/s).\n")
+    population = report["population"]
+    print(f"👥 Miembros: {population['initial']} -> {population['final']} "
+          f"(+{population['joined']} altas, {population['kicked_inactive']} expulsados por inactividad, "
+          f"{population['banned_no_presentation']} por no presentarse)")
+    messages = report["messages"]
+    print(f"💬 Mensajes: {messages['inbound']} recibidos ({messages['inbound'] / days:.0f}/día), "
+          f"{messages['outbound']} enviados ({messages['outbound'] / days:.1f}/día)")
+    print(f"🗂️ Cola de jobs: pico de {report['job_queue']['peak_size']} jobs pendientes\n")
+    for title, values in (("Llamadas a la API", report["api_calls"]), ("Escrituras por almacén", report["store_writes"]),
+                          ("Llamadas a la IA", report["ai_calls"]), ("Ejecuciones por job", report["job_queue"]["runs"])):
+        print(f"{title}:")
+        for name, count in values.items():
+            print(f"  {name:<32}{count:>10}{count / days:>10.1f}/día")
+    if report["job_queue"]["errors"]:
+        print(f"🚨 Jobs con errores: {report['job_queue']['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--joins-per-day", type=float, default=3)
+    parser.add_argument("--messages-per-day", type=float, default=1.5,
+                        help="Media de mensajes al día por miembro activo (es lo que más pesa en el tiempo real)")
+    parser.add_argument("--dormant", type=float, default=0.2, help="Proporción de miembros que no escriben nunca")
+    parser.add_argument("--present-rate", type=float, default=0.7, help="Proporción de altas que se presentan")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Muestra la salida de los managers")
+    parser.add_argument("-o", "--output", help="Fichero JSON con el informe")
+    args = parser.parse_args()
+
+    simulator = Simulator(args.days, args.users, args.joins_per_day, args.messages_per_day,
+                          dormant=args.dormant, present_rate=args.present_rate, seed=args.seed)
+    report = simulator.run(verbose=args.verbose)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Informe guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 # main.py
 import asyncio
 import datetime
+import logging
+import signal
 from telegram import Update
 from telegram.ext import (
+    Application,
     ApplicationBuilder,
     CommandHandler,
     MessageHandler,
@@ -13,56 +16,40 @@ from telegram.ext import (
 
 # Importamos desde nuestra nueva estructura en 'src'
 from src.config import settings
-from src.managers import agenda_manager, user_manager, debate_manager, word_game_manager
-from src.handlers import general_handlers, agenda_handlers, group_handlers, debate_handlers, level_handlers, word_game_handlers
-
-async def track_activity_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """
-    Manejador principal que se ejecuta en cada mensaje.
-    Actualiza la actividad del usuario y le otorga XP.
-    """
-    if not update.effective_user or update.effective_user.is_bot:
-        return
-
-    user = update.effective_user
-    chat_id = update.effective_chat.id
-
-    # Actualizamos la última vez que se vio al usuario
-    user_manager.update_user_activity(user)
-
-    # Otorgamos XP y comprobamos si sube de nivel
-    level_up_info = user_manager.grant_xp_on_message(user.id)
-    if level_up_info:
-        await level_handlers.announce_level_up(context, chat_id, level_up_info)
+from src.managers import agenda_manager, user_manager, debate_manager, word_game_manager, docs_manager, presentation_classifier, outbound_dispatcher, leaderboard_manager, activity_manager, catchup_manager, update_processor
+from src import webhook_server, metrics, loop_monitor, tracing, log
+from src.handlers import general_handlers, agenda_handlers, group_handlers, debate_handlers, level_handlers, ranking_handlers, stats_handlers, diagnostics_handlers, pipeline
 
+logger = logging.getLogger("main")
 
 # --- Funciones del Debate Diario (ahora actúan como wrappers) ---
+@outbound_dispatcher.background_job
 async def send_daily_debate(context: ContextTypes.DEFAULT_TYPE):
     """Job diario que llama al manager para enviar y anclar el debate."""
-    print("⏰ Ejecutando tarea programada: Enviar debate diario.")
+    logger.info("⏰ Ejecutando tarea programada: Enviar debate diario.")
     await debate_manager.send_and_pin_debate(context.bot, settings.GROUP_CHAT_ID)
 
+@outbound_dispatcher.background_job
 async def unpin_daily_debate(context: ContextTypes.DEFAULT_TYPE):
     """Job diario que llama al manager para desanclar el debate anterior."""
-    print("⏰ Ejecutando tarea programada: Desanclar debate anterior.")
+    logger.info("⏰ Ejecutando tarea programada: Desanclar debate anterior.")
     await debate_manager.unpin_previous_debate(context.bot, settings.GROUP_CHAT_ID)
 
 
-async def main() -> None:
-    """
-    Función principal que configura y ejecuta el bot de forma asíncrona.
-    """
-    # Carga de datos
+def load_data():
+    """Carga en memoria todos los almacenes de datos."""
     agenda_manager.cargar_agenda()
     user_manager.load_users()
     debate_manager.load_debate_data()
+    debate_manager.load_topic_pool()
     word_game_manager.load_word_game_data()
+    docs_manager.build_index()
+    presentation_classifier.load_model()
+    activity_manager.load()
 
-    app = ApplicationBuilder().token(settings.TELEGRAM_TOKEN).build()
 
-    # --- Programación de Tareas con JobQueue (Nativo de PTB) ---
-    job_queue = app.job_queue
-    
+def schedule_jobs(job_queue):
+    """Tareas periódicas (nativas de PTB con JobQueue)."""
     # Tarea de inactividad (04:00)
     job_queue.run_daily(user_manager.check_inactivity_job, time=datetime.time(hour=4, minute=0, second=0))
     
@@ -71,67 +58,171 @@ async def main() -> None:
     job_queue.run_daily(send_daily_debate, time=datetime.time(hour=0, minute=0, second=0))
     job_queue.run_daily(unpin_daily_debate, time=datetime.time(hour=23, minute=59, second=0))
 
+    # Relleno de la reserva de temas de debate (solo actúa en horas tranquilas)
+    job_queue.run_repeating(debate_manager.refill_topic_pool_job, interval=3600, first=60)
+
+    # Guardado periódico de los contadores de las clasificaciones semanal/mensual
+    job_queue.run_repeating(leaderboard_manager.save_job, interval=600, first=600)
+    job_queue.run_repeating(activity_manager.save_job, interval=600, first=600)
+
 
-    # --- Registrar Handlers ---
+def register_handlers(app: Application):
+    # --- Comandos y botones ---
     app.add_handler(CommandHandler("start", general_handlers.start))
     app.add_handler(CommandHandler("agenda", agenda_handlers.agenda_menu))
     app.add_handler(CommandHandler("get_group_id", group_handlers.get_group_id_command))
     app.add_handler(CommandHandler("debate", debate_handlers.force_debate_command))
     app.add_handler(CommandHandler("nivel", level_handlers.level_command)) # <-- NUEVO HANDLER
+    app.add_handler(CommandHandler("ranking", ranking_handlers.ranking_command))
+    app.add_handler(CommandHandler("stats", stats_handlers.stats_command))
+    app.add_handler(CommandHandler("lag", diagnostics_handlers.lag_command))
+    app.add_handler(CommandHandler("profile", diagnostics_handlers.profile_command))
     app.add_handler(CallbackQueryHandler(agenda_handlers.main_agenda_callback_handler))
 
     # --- Handlers de Mensajes ---
 
-    # 0. Verificación de nuevos usuarios (Alta prioridad)
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & filters.ChatType.GROUPS, general_handlers.check_presentation), group=0)
+    # 1. Tubería única para todo el texto (verificación, menciones, juego, XP y agenda).
+    #    Va en su propio grupo para que también procese los comandos (actividad y menciones).
+    app.add_handler(MessageHandler(filters.TEXT, pipeline.handle_message), group=1)
 
-    # 1. Menciones al bot
-    app.add_handler(MessageHandler(filters.TEXT & filters.ChatType.GROUPS, general_handlers.handle_mention), group=1)
+    # 2. Bienvenida a nuevos miembros
+    app.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, general_handlers.saludar_nuevo_miembro), group=2)
 
-    # 2. Juego de palabra (adivinanzas)
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & filters.ChatType.GROUPS, word_game_handlers.handle_guess), group=2)
-    
-    # 3. Tracking de actividad (XP) - Ahora incluye comandos (filters.TEXT)
-    app.add_handler(MessageHandler(filters.TEXT, track_activity_handler), group=3)
 
-    # 4. Otros manejadores de texto y bienvenida
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, agenda_handlers.manejar_mensajes_de_texto), group=4)
-    app.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, general_handlers.saludar_nuevo_miembro), group=4)
+def build_application(builder: ApplicationBuilder | None = None, with_jobs: bool = True,
+                      rate_limiter: bool = True) -> Application:
+    """
+    Construye la aplicación con todos sus handlers. `main()` la usa tal cual; el arnés
+    de carga (benchmarks/load_harness.py) le pasa un builder con un `Bot` falso.
+    """
+    if builder is None:
+        builder = ApplicationBuilder().token(settings.TELEGRAM_TOKEN)
+        if settings.TELEGRAM_BASE_URL:
+            builder = builder.base_url(f"{settings.TELEGRAM_BASE_URL}/bot").base_file_url(
+                f"{settings.TELEGRAM_BASE_URL}/file/bot"
+            )
+
+    # Todas las llamadas salientes pasan por el despachador (límites de Telegram + prioridades).
+    if rate_limiter:
+        builder = builder.rate_limiter(outbound_dispatcher.dispatcher)
+    # Los updates se procesan en paralelo, pero los de un mismo usuario van en orden.
+    processor = update_processor.KeyedUpdateProcessor(settings.MAX_CONCURRENT_UPDATES, settings.MAX_PENDING_UPDATES)
+    # La JobQueue mide cada job, también los que se programan sobre la marcha
+    app = builder.concurrent_updates(processor).job_queue(metrics.make_job_queue()).build()
+
+    if with_jobs:
+        schedule_jobs(app.job_queue)
+    register_handlers(app)
+
+    # Un span por handler en la traza de cada update (antes que las métricas, que miran el callback final)
+    if tracing.enabled:
+        tracing.trace_handlers(app)
+    if metrics.enabled:
+        metrics.instrument_handlers(app)
+        metrics.UPDATES_IN_FLIGHT.set_function(lambda: processor.current_concurrent_updates)
+        if app.job_queue is not None:
+            metrics.JOB_QUEUE_SIZE.set_function(lambda: len(app.job_queue.jobs()))
+    return app
+
+
+async def main() -> None:
+    """
+    Función principal que configura y ejecuta el bot de forma asíncrona.
+    """
+    load_data()
+    app = build_application()
+
+    webhook_mode = settings.BOT_MODE == "webhook"
+    server = webhook_server.WebhookServer(
+        app.update_queue,
+        app.bot,
+        secret_token=settings.WEBHOOK_SECRET,
+        host=settings.HTTP_HOST,
+        port=settings.HTTP_PORT,
+        path=settings.WEBHOOK_PATH if webhook_mode else None,
+    )
+
+    metrics_server = (
+        webhook_server.MetricsServer(settings.METRICS_HOST, settings.METRICS_PORT) if settings.METRICS_ENABLED else None
+    )
+
+    logger.info("🤖 Bot modular arrancado en modo %s. Escuchando menciones y con tareas de debate programadas.", settings.BOT_MODE)
+
+    # Mantenemos el bot corriendo hasta que se reciba una señal de parada.
+    # Ctrl+C (SIGINT) y `docker stop` (SIGTERM) solo activan el Event: así la
+    # parada pasa siempre por el mismo camino y se guarda todo antes de salir.
+    stop_signal = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_signal.set)
+        except NotImplementedError:  # Windows
+            pass
 
-    print("🤖 Bot modular arrancado. Escuchando menciones y con tareas de debate programadas.")
-    
     try:
         async with app:
-            await app.start()
-            
-            # --- Comprobación de Debate al Inicio ---
-            # Si el bot se ha reiniciado y no hay debate hoy, lo lanza.
-            await debate_manager.check_and_run_startup_debate(app.bot, settings.GROUP_CHAT_ID)
-            
-            # --- Programar Incitación al Debate (Loop aleatorio) ---
-            debate_manager.schedule_next_incitement(app.job_queue)
-
-            # --- Programar Juego de la Palabra (Loop aleatorio) ---
-            word_game_manager.schedule_next_word_game(app.job_queue)
-            
-            # drop_pending_updates=True ignora mensajes acumulados mientras el bot estaba apagado
-            await app.updater.start_polling(drop_pending_updates=True)
-            
-            # Mantenemos el bot corriendo hasta que se reciba una señal de parada
-            # Usamos un Event para esperar limpiamente en lugar de sleep loop
-            stop_signal = asyncio.Event()
-            await stop_signal.wait()
-            
-    except (KeyboardInterrupt, SystemExit):
-        print("\n🔌 Deteniendo el bot...")
-        if app.updater.running:
-            await app.updater.stop()
-        if app.running:
-            await app.stop()
-
+            try:
+                await app.start()
+                # Vigilante del bucle de eventos (retrasos y código bloqueante, comando /lag)
+                if settings.LOOP_MONITOR_ENABLED:
+                    loop_monitor.monitor.start()
+
+                # --- Comprobación de Debate al Inicio ---
+                # Si el bot se ha reiniciado y no hay debate hoy, lo lanza.
+                await debate_manager.check_and_run_startup_debate(app.bot, settings.GROUP_CHAT_ID)
+
+                # --- Programar Incitación al Debate (Loop aleatorio) ---
+                debate_manager.schedule_next_incitement(app.job_queue)
+
+                # --- Programar Juego de la Palabra (Loop aleatorio) ---
+                word_game_manager.schedule_next_word_game(app.job_queue)
+
+                # Servidor HTTP: /health siempre y, en modo webhook, la entrada de updates
+                await server.start()
+                if metrics_server is not None:
+                    await metrics_server.start()
+
+                # Recuperamos en bloque lo que se escribió con el bot apagado (XP y actividad)
+                # y solo entonces pasamos a recibir updates con normalidad, sin descartar nada.
+                # getUpdates no funciona con un webhook puesto, así que lo quitamos antes.
+                if webhook_mode:
+                    await app.bot.delete_webhook(drop_pending_updates=False)
+                await catchup_manager.catch_up(app.bot)
+                if webhook_mode:
+                    await app.bot.set_webhook(
+                        settings.WEBHOOK_URL,
+                        secret_token=settings.WEBHOOK_SECRET,
+                        allowed_updates=Update.ALL_TYPES,
+                    )
+                    logger.info("🪝 Webhook registrado en %s", settings.WEBHOOK_URL)
+                else:
+                    await app.updater.start_polling(drop_pending_updates=False)
+                server.ready = True
+
+                await stop_signal.wait()
+            finally:
+                logger.info("🔌 Deteniendo el bot...")
+                # En modo webhook no lo borramos: Telegram guarda lo que llegue hasta que volvamos
+                await server.stop()
+                if metrics_server is not None:
+                    await metrics_server.stop()
+                loop_monitor.monitor.stop()
+                if app.updater.running:
+                    await app.updater.stop()
+                if app.running:
+                    await app.stop()
+    finally:
+        # Lo que solo se guarda cada pocos minutos se vuelca aquí, con el bot ya parado
+        leaderboard_manager.save()
+        activity_manager.save()
+        tracing.exporter.flush()
 
 if __name__ == "__main__":
+    log.setup()
     try:
         asyncio.run(main())
     except (KeyboardInterrupt, SystemExit):
-        print("🔌 Bot detenido.")
+        logger.info("🔌 Bot detenido.")
+    finally:
+        # Vacía la cola del logging antes de salir
+        log.shutdown()
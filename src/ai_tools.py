@@ -1,9 +1,8 @@
 # src/ai_tools.py
-from src.managers import agenda_manager
+from src.managers import agenda_manager, docs_manager
 from datetime import datetime
 import requests
 import json
-import os
 
 # --- Implementación de la nueva herramienta del tiempo ---
 
@@ -43,24 +42,30 @@ def get_weather(ciudad: str):
 
 def read_documentation_file(filename: str):
     """
-    Lee el contenido de un archivo de documentación.
+    Devuelve el contenido de un archivo de documentación.
+    Se sirve desde el índice en memoria, sin leer del disco en cada llamada.
     """
     try:
-        # Construimos la ruta completa al archivo en el directorio de documentos
-        docs_dir = os.path.join(os.path.dirname(__file__), '..', 'docs')
-        file_path = os.path.join(docs_dir, filename)
-
-        # Verificamos que el archivo exista para evitar errores
-        if not os.path.exists(file_path):
+        content = docs_manager.get_file_content(filename)
+        if content is None:
             return json.dumps({"error": f"El archivo '{filename}' no existe."})
-
-        # Leemos y devolvemos el contenido del archivo
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-            
+        return content
     except Exception as e:
         return json.dumps({"error": f"Hubo un problema al leer el archivo: {str(e)}"})
 
+def buscar_en_documentacion(consulta: str, max_resultados: int = 3):
+    """
+    Busca en la documentación y devuelve solo las secciones más relevantes.
+    """
+    try:
+        max_resultados = max(1, min(int(max_resultados), 5))
+        resultados = docs_manager.search(consulta, top_k=max_resultados)
+        if not resultados:
+            return json.dumps({"error": f"No he encontrado nada en la documentación sobre '{consulta}'."}, ensure_ascii=False)
+        return json.dumps(resultados, ensure_ascii=False)
+    except Exception as e:
+        return json.dumps({"error": f"Hubo un problema al buscar en la documentación: {str(e)}"})
+
 # --- Definición de herramientas para Gemini ---
 
 ALL_TOOLS = [
@@ -139,6 +144,24 @@ ALL_TOOLS = [
             "required": ["ciudad"]
         }
     },
+    {
+        "name": "buscar_en_documentacion",
+        "description": "Busca en la documentación del bot (normas de convivencia, manual de usuario y documentación técnica) y devuelve solo las secciones relevantes. Úsala antes que 'read_documentation_file'.",
+        "parameters": {
+            "type": "OBJECT",
+            "properties": {
+                "consulta": {
+                    "type": "STRING",
+                    "description": "Lo que se quiere buscar, por ejemplo, 'sistema de vidas' o 'cómo crear un evento'."
+                },
+                "max_resultados": {
+                    "type": "INTEGER",
+                    "description": "Opcional. Número máximo de secciones a devolver (1-5). Por defecto, 3."
+                }
+            },
+            "required": ["consulta"]
+        }
+    },
     {
         "name": "read_documentation_file",
         "description": "Lee el contenido de un archivo de documentación, como las normas de convivencia.",
@@ -163,4 +186,5 @@ AVAILABLE_TOOLS = {
     "obtener_eventos_activos": agenda_manager.obtener_eventos_activos,
     "get_weather": get_weather,
     "read_documentation_file": read_documentation_file,
+    "buscar_en_documentacion": buscar_en_documentacion,
 }
@@ -0,0 +1,239 @@
+# src/config/content.py
+"""
+Registro de contenido editable: plantillas, listas de palabras y mensajes.
+
+Todo el texto que antes estaba escrito a fuego en los módulos se carga desde
+`data/` una sola vez, se valida (las plantillas se precompilan y se comprueban
+sus huecos) y se guarda en memoria. Si un archivo cambia en disco, se recarga
+en caliente: la nueva versión se construye aparte y sustituye a la anterior de
+golpe, así que nunca se lee contenido a medio cargar. Si la nueva versión no es
+válida, se sigue usando la anterior.
+"""
+import json
+import logging
+import os
+from string import Formatter
+from time import monotonic
+
+from src import metrics
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántos segundos, como mucho, se comprueba si algún archivo ha cambiado
+CHECK_INTERVAL_SECONDS = 5
+
+_formatter = Formatter()
+
+
+class CompiledTemplate:
+    """Plantilla `str.format` troceada de antemano en literales y huecos."""
+
+    def __init__(self, source: str, allowed_fields: set[str]):
+        self.source = source
+        self.parts = []
+        self.fields = set()
+        for literal, field, spec, conversion in _formatter.parse(source):
+            if field is not None:
+                if field not in allowed_fields:
+                    raise ValueError(f"hueco desconocido '{{{field}}}' (permitidos: {sorted(allowed_fields)})")
+                if conversion:
+                    raise ValueError(f"conversión no soportada en '{{{field}!{conversion}}}'")
+                self.fields.add(field)
+            self.parts.append((literal, field, spec or ""))
+
+    def render(self, **values) -> str:
+        """Rellena la plantilla. Equivale a `source.format(**values)`, pero sin volver a parsearla."""
+        out = []
+        for literal, field, spec in self.parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                out.append(format(value, spec) if spec else str(value))
+        return "".join(out)
+
+    def format(self, **values) -> str:
+        return self.render(**values)
+
+    def __repr__(self):
+        return f"CompiledTemplate({self.source!r})"
+
+
+# --- Validadores ---
+
+def parse_string_list(raw) -> list[str]:
+    """Lista no vacía de textos no vacíos."""
+    if not isinstance(raw, list):
+        raise ValueError("se esperaba una lista")
+    items = [item.strip() for item in raw if isinstance(item, str) and item.strip()]
+    if not items:
+        raise ValueError("la lista está vacía")
+    return items
+
+
+def template_parser(allowed_fields: set[str], required_fields: set[str]):
+    """Crea un validador que precompila una lista de plantillas y descarta las incorrectas."""
+    def parse(raw) -> list[CompiledTemplate]:
+        templates = []
+        for source in parse_string_list(raw):
+            try:
+                template = CompiledTemplate(source, allowed_fields)
+            except ValueError as e:
+                logger.warning("⚠️ Plantilla descartada (%s): %s", e, source)
+                continue
+            missing = required_fields - template.fields
+            if missing:
+                logger.warning("⚠️ Plantilla descartada (faltan %s): %s", sorted(missing), source)
+                continue
+            templates.append(template)
+        if not templates:
+            raise ValueError("ninguna plantilla es válida")
+        return templates
+    return parse
+
+
+def parse_level_names(raw) -> dict[int, str]:
+    """Diccionario nivel -> nombre, con el nivel 1 obligatorio."""
+    if not isinstance(raw, dict):
+        raise ValueError("se esperaba un diccionario")
+    names = {int(level): str(name) for level, name in raw.items()}
+    if 1 not in names or any(level < 1 for level in names):
+        raise ValueError("los niveles deben empezar en 1")
+    return dict(sorted(names.items()))
+
+
+# --- Registro ---
+
+# nombre -> {"setting", "parser", "default", "value", "mtime", "listeners"}
+_entries: dict[str, dict] = {}
+_last_check = 0.0
+
+
+def register(name: str, setting: str, parser, default):
+    """
+    Registra un contenido. `setting` es el nombre del atributo de `settings`
+    con la ruta del archivo, para que las rutas se puedan cambiar en los tests.
+    """
+    _entries[name] = {
+        "setting": setting,
+        "parser": parser,
+        "default": parser(default),
+        "value": None,
+        "mtime": None,
+        "listeners": [],
+    }
+    _load(name)
+
+
+def on_reload(name: str, callback):
+    """Registra una función a la que se llama con el nuevo valor tras cada recarga."""
+    _entries[name]["listeners"].append(callback)
+
+
+def _path(entry: dict) -> str:
+    return getattr(settings, entry["setting"])
+
+
+def _load(name: str) -> bool:
+    """(Re)carga un contenido desde disco. Devuelve True si el valor ha cambiado."""
+    entry = _entries[name]
+    path = _path(entry)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+
+    if mtime is not None and mtime == entry["mtime"]:
+        return False
+
+    if mtime is None:
+        if entry["value"] is not None:
+            return False
+        new_value = entry["default"]
+        logger.warning("⚠️ No se encontró %s. Se usará el contenido por defecto de '%s'.", path, name)
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                new_value = entry["parser"](json.load(f))
+        except (OSError, ValueError) as e:
+            # JSONDecodeError también es ValueError: nos quedamos con la versión anterior
+            logger.error("🚨 Contenido '%s' inválido en %s: %s. Se mantiene la versión anterior.", name, path, e)
+            if entry["value"] is None:
+                entry["value"] = entry["default"]
+            return False
+
+    entry["value"] = new_value
+    entry["mtime"] = mtime
+    for callback in entry["listeners"]:
+        callback(new_value)
+    return True
+
+
+def check_for_changes(force: bool = False):
+    """Recarga los archivos que hayan cambiado (como mucho una vez cada CHECK_INTERVAL_SECONDS)."""
+    global _last_check
+    now = monotonic()
+    if not force and now - _last_check < CHECK_INTERVAL_SECONDS:
+        return
+    _last_check = now
+    for name in _entries:
+        if _load(name):
+            metrics.CACHE_REQUESTS.inc("content", "miss")
+            logger.info("🔄 Contenido '%s' recargado desde %s", name, _path(_entries[name]))
+
+
+def get(name: str):
+    """Devuelve el contenido en memoria, recargándolo antes si su archivo ha cambiado."""
+    check_for_changes()
+    metrics.CACHE_REQUESTS.inc("content", "hit")
+    return _entries[name]["value"]
+
+
+def reload_all():
+    """Fuerza la comprobación de todos los archivos (útil al arrancar y en los tests)."""
+    for entry in _entries.values():
+        entry["mtime"] = None
+        entry["value"] = None
+    check_for_changes(force=True)
+
+
+# --- Contenido conocido ---
+
+register(
+    "incitement_templates",
+    "DEBATE_TEMPLATES_FILE",
+    template_parser({"mentions", "topic"}, {"mentions", "topic"}),
+    default=[
+        "¡Hola {mentions}! ¿Qué opináis de esto: *{topic}*?",
+        "¡Aúpa {mentions}! Queremos saber vuestra opinión sobre: *{topic}*",
+        "¿Qué nos decís {mentions}? El tema está calentito: *{topic}*",
+    ],
+)
+
+register(
+    "level_up_messages",
+    "LEVEL_UP_MESSAGES_FILE",
+    template_parser({"user_name", "level_num", "level_name"}, {"user_name", "level_num", "level_name"}),
+    default=["¡Aúpa ahí! @{user_name} ha subido al Nivel {level_num}: **{level_name}**! 🎉"],
+)
+
+register(
+    "word_game_words",
+    "WORD_GAME_WORDS_FILE",
+    parse_string_list,
+    default=["rioja", "vino", "cuadrilla"],
+)
+
+register(
+    "debate_backup_topics",
+    "DEBATE_BACKUP_TOPICS_FILE",
+    parse_string_list,
+    default=["¿Playa o montaña?", "¿Dulce o salado?"],
+)
+
+register(
+    "level_names",
+    "LEVEL_NAMES_FILE",
+    parse_level_names,
+    default={"1": "Turista en la Laurel"},
+)
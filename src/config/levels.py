@@ -2,6 +2,11 @@
 """
 Configuración del sistema de niveles "La Senda del Riojano".
 """
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from src.config import content
 
 # --- Parámetros de Progresión ---
 XP_PER_MESSAGE = 20  # Puntos de experiencia ganados por mensaje (con cooldown)
@@ -20,64 +25,87 @@ def calculate_xp_for_level(level: int) -> int:
     return int(BASE_XP * (level ** EXPONENT))
 
 # --- Definición de Niveles y sus Nombres ---
-# El bot buscará el siguiente nivel en esta lista. Los saltos son intencionados.
-LEVEL_NAMES = {
-    1: "Turista en la Laurel",
-    2: "Probando un 'Roto'",
-    3: "Cliente Frecuente (¡Ya pide servilleta!)",
-    5: "De Cuadrilla por San Juan",
-    7: "Conoce los 'Modernos'",
-    10: "Vendimiador Novato",
-    15: "Experto en 'Claretes'",
-    20: "Bodeguero",
-    25: "Ha visto a Ezcaray en fiestas",
-    30: "Riojano de Pura Cepa",
-    40: "¡Disfrutando del 'Vino, y se fue'!",
-    50: "¡RESERVA ESPECIAL! 🍷",
-    60: "San Mateo (¡El Cohete!)"
-}
-
-# --- Generación de la Estructura de Datos de Niveles ---
-# Creamos un diccionario completo con el número de nivel, nombre y la XP requerida.
-LEVEL_THRESHOLDS = {
-    level: {
-        "name": name,
-        "xp_required": calculate_xp_for_level(level)
+# Los nombres viven en data/level_names.json (registro de contenido) y se recargan en caliente.
+# El bot buscará el siguiente nivel en esa lista. Los saltos son intencionados.
+LEVEL_NAMES = {}
+LEVEL_THRESHOLDS = {}
+
+# Tablas precalculadas (ordenadas por nivel) para buscar con bisect en el camino caliente.
+# Se sustituyen de golpe como una sola tupla: (niveles, xp_requerida, nombres)
+_LEVEL_TABLE: tuple[tuple[int, ...], tuple[int, ...], tuple[str, ...]] = ((), (), ())
+
+def _build_level_tables(level_names: dict[int, str]):
+    """
+    Genera la estructura de datos de niveles a partir de los nombres.
+    Se llama al arrancar, cada vez que cambia el archivo de nombres y al cambiar la curva de XP.
+    """
+    global LEVEL_NAMES, LEVEL_THRESHOLDS, _LEVEL_TABLE
+    # Creamos un diccionario completo con el número de nivel, nombre y la XP requerida.
+    thresholds = {
+        level: {
+            "name": name,
+            "xp_required": calculate_xp_for_level(level)
+        }
+        for level, name in level_names.items()
+    }
+
+    # Añadimos un nivel "máximo" para manejar la progresión más allá del último nivel definido.
+    # Buscamos el último nivel definido para usarlo como base.
+    last_defined_level = max(level_names.keys())
+    thresholds[last_defined_level + 1] = {
+        "name": level_names[last_defined_level], # Repite el último nombre o uno genérico
+        "xp_required": float('inf') # Un valor infinito para que no se pueda superar
     }
-    for level, name in LEVEL_NAMES.items()
-}
 
-# Añadimos un nivel "máximo" para manejar la progresión más allá del último nivel definido.
-# Buscamos el último nivel definido para usarlo como base.
-last_defined_level = max(LEVEL_NAMES.keys())
-LEVEL_THRESHOLDS[last_defined_level + 1] = {
-    "name": LEVEL_NAMES[last_defined_level], # Repite el último nombre o uno genérico
-    "xp_required": float('inf') # Un valor infinito para que no se pueda superar
-}
+    ordered = sorted(level_names)
+    table = (
+        tuple(ordered),
+        tuple(calculate_xp_for_level(level) for level in ordered),
+        tuple(level_names[level] for level in ordered),
+    )
+
+    # Sustituimos todas las tablas a la vez para no mezclar versiones
+    LEVEL_NAMES, LEVEL_THRESHOLDS, _LEVEL_TABLE = dict(level_names), thresholds, table
+
+def _refresh_level_tables():
+    """Comprueba (de forma barata) si los nombres de nivel han cambiado en disco."""
+    content.get("level_names")
+
+_build_level_tables(content.get("level_names"))
+content.on_reload("level_names", _build_level_tables)
+
+def set_xp_curve(base_xp: int, exponent: float):
+    """
+    Cambia la curva de XP y recalcula las tablas. No toca a los usuarios:
+    para recolocarlos a todos de una vez, usa `user_manager.apply_xp_curve`.
+    """
+    global BASE_XP, EXPONENT
+    if base_xp <= 0 or exponent <= 0:
+        raise ValueError("BASE_XP y EXPONENT deben ser positivos")
+    BASE_XP, EXPONENT = base_xp, exponent
+    _build_level_tables(LEVEL_NAMES)
 
 def get_level_for_xp(xp: int) -> tuple[int, str]:
     """Devuelve el nivel y el nombre correspondientes a una cantidad de XP."""
-    current_level_num = 1
-    current_level_name = LEVEL_NAMES[1]
-
-    # Iteramos sobre los niveles ordenados para encontrar en cuál encaja la XP.
-    for level_num, data in sorted(LEVEL_THRESHOLDS.items()):
-        if xp >= data["xp_required"]:
-            current_level_num = level_num
-            current_level_name = data["name"]
-        else:
-            break # Si no superamos el umbral de XP, nos quedamos en el nivel anterior.
-            
-    return current_level_num, current_level_name
+    _refresh_level_tables()
+    level_nums, level_xp, level_names = _LEVEL_TABLE
+    # Último nivel cuyo umbral no supera la XP (el nivel 1 siempre empieza en 0)
+    index = max(bisect_right(level_xp, xp) - 1, 0)
+    return level_nums[index], level_names[index]
 
 def get_next_level_xp(level: int) -> int | None:
     """Devuelve la XP necesaria para el siguiente nivel definido."""
-    # Encuentra el siguiente nivel en la secuencia ordenada de claves.
-    sorted_levels = sorted(LEVEL_NAMES.keys())
-    try:
-        current_index = sorted_levels.index(level)
-        next_level_num = sorted_levels[current_index + 1]
-        return LEVEL_THRESHOLDS[next_level_num]["xp_required"]
-    except (ValueError, IndexError):
+    _refresh_level_tables()
+    level_nums, level_xp, _ = _LEVEL_TABLE
+    index = bisect_left(level_nums, level)
+    if index + 1 >= len(level_nums) or level_nums[index] != level:
         # Si el nivel actual no está o es el último, no hay siguiente nivel.
         return None
+    return level_xp[index + 1]
+
+def get_levels_for_xp_array(xp_values: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de `get_level_for_xp`: devuelve el número de nivel de cada XP."""
+    _refresh_level_tables()
+    level_nums, level_xp, _ = _LEVEL_TABLE
+    indexes = np.searchsorted(np.asarray(level_xp), xp_values, side="right") - 1
+    return np.asarray(level_nums)[np.maximum(indexes, 0)]
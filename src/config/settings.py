@@ -7,20 +7,102 @@ load_dotenv()
 
 # --- Claves y Tokens ---
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+# Servidor de la Bot API. Vacío = el oficial; en benchmarks y tests, la API falsa local
+# (benchmarks/fake_bot_api.py), p. ej. "http://127.0.0.1:8081"
+TELEGRAM_BASE_URL = os.getenv("TELEGRAM_BASE_URL", "").rstrip("/")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # --- Rutas ---
 AGENDA_FILE = "data/agenda.json"
 USERS_FILE = "data/users.json"
 DEBATE_FILE = "data/debate.json"
+DEBATE_POOL_FILE = "data/debate_pool.json"
 DEBATE_TEMPLATES_FILE = "data/welcome_debate_message.json"
 WORD_GAME_FILE = "data/word_game.json"
+WORD_GAME_WORDS_FILE = "data/word_game_words.json"
+DEBATE_BACKUP_TOPICS_FILE = "data/debate_backup_topics.json"
+LEVEL_UP_MESSAGES_FILE = "data/level_up_messages.json"
+LEVEL_NAMES_FILE = "data/level_names.json"
+PRESENTATION_MODEL_FILE = "data/presentation_model.json"
+PRESENTATION_SAMPLES_FILE = "data/presentation_samples.json"
+LEADERBOARD_FILE = "data/leaderboard.json"
+ACTIVITY_FILE = "data/activity.npz"
+DOCS_DIR = "docs"
+DOCS_FILES = ["normas_convivencia.md", "manual_de_usuario.md", "documentacion_tecnica.md"]
 
 # --- Configuración del Módulo de Usuarios ---
 GROUP_CHAT_ID = int(os.getenv("GROUP_CHAT_ID", 0))
 INACTIVITY_DAYS = int(os.getenv("INACTIVITY_DAYS", 30))
 PRESENTATION_TIMEOUT_MINUTES = int(os.getenv("PRESENTATION_TIMEOUT_MINUTES", 10))
 PRESENTATION_WARNING_GRACE_MINUTES = int(os.getenv("PRESENTATION_WARNING_GRACE_MINUTES", 5))
+# Las evaluaciones de presentaciones que llegan juntas se agrupan en una sola llamada a la IA
+PRESENTATION_BATCH_WINDOW_SECONDS = float(os.getenv("PRESENTATION_BATCH_WINDOW_SECONDS", 1.5))
+PRESENTATION_BATCH_MAX_ITEMS = int(os.getenv("PRESENTATION_BATCH_MAX_ITEMS", 10))
+
+# --- Configuración de la Actividad ---
+# Días de historial por hora que se guardan de cada usuario
+ACTIVITY_USER_DAYS = int(os.getenv("ACTIVITY_USER_DAYS", 28))
+
+# Máximo de updates pendientes que se recuperan en bloque al arrancar
+CATCHUP_MAX_UPDATES = int(os.getenv("CATCHUP_MAX_UPDATES", 20000))
+
+# --- Recepción de Updates ---
+# "polling" (por defecto) o "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+# URL pública a la que Telegram mandará los updates (solo en modo webhook)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+# Secreto que Telegram envía en cada petición para que sepamos que es él
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+# Servidor HTTP interno (webhook y /health para el healthcheck)
+HTTP_HOST = os.getenv("HTTP_HOST", "0.0.0.0")
+HTTP_PORT = int(os.getenv("HTTP_PORT", 8080))
+# Métricas de Prometheus en GET /metrics (latencias de handlers, jobs, IA, Telegram y almacenes)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Se sirven en un puerto aparte y, por defecto, solo en local: no van por el servidor público
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9090))
+# Vigilante del bucle de eventos: latido cada LOOP_LAG_INTERVAL_MS y, si se retrasa más de
+# LOOP_STALL_THRESHOLD_MS, se apunta qué línea lo está bloqueando (comando /lag)
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", 100))
+LOOP_STALL_THRESHOLD_MS = int(os.getenv("LOOP_STALL_THRESHOLD_MS", 200))
+# Perfilado bajo demanda (/profile): dónde se guardan los resultados, duración por defecto
+# y máxima (segundos), líneas de los resúmenes y frecuencia del modo por muestreo
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_DEFAULT_SECONDS = int(os.getenv("PROFILE_DEFAULT_SECONDS", 30))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 300))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 30))
+PROFILE_SAMPLE_INTERVAL_MS = int(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+# Trazas de cada update (handlers, IA, herramientas, almacenes y Bot API). Se exporta una
+# fracción TRACING_SAMPLE_RATE y todas las que tardan más de TRACING_SLOW_MS (0 = ninguna).
+# Exportador "jsonl" (TRACING_FILE, rota al pasar de TRACING_FILE_MAX_MB) u "otlp" (HTTP JSON)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", 0.01))
+TRACING_SLOW_MS = int(os.getenv("TRACING_SLOW_MS", 2000))
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "jsonl").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "data/traces.jsonl")
+TRACING_FILE_MAX_MB = int(os.getenv("TRACING_FILE_MAX_MB", 50))
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+
+# --- Logging ---
+# Nivel general, formato ("json" para producción, "text" para leerlo en consola) y niveles por
+# módulo separados por comas (p. ej. "src.managers.user_manager=DEBUG,telegram=WARNING")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "httpx=WARNING,apscheduler=WARNING")
+
+# --- Procesado de Updates ---
+# Updates que se ejecutan a la vez (los de un mismo usuario siempre van en orden)
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", 32))
+# Updates admitidos en total, contando los que esperan detrás de otro del mismo usuario
+MAX_PENDING_UPDATES = int(os.getenv("MAX_PENDING_UPDATES", 256))
+
+# --- Configuración del Debate ---
+# Temas que intentamos tener siempre pregenerados
+DEBATE_POOL_TARGET_SIZE = int(os.getenv("DEBATE_POOL_TARGET_SIZE", 7))
+# Franja horaria tranquila en la que se rellena la reserva (formato "inicio-fin")
+DEBATE_POOL_IDLE_HOURS = tuple(int(h) for h in os.getenv("DEBATE_POOL_IDLE_HOURS", "2-7").split("-"))
 
 # --- Configuración del Juego de la Palabra ---
 WORD_GAME_POINTS = int(os.getenv("WORD_GAME_POINTS", 50))
@@ -1,10 +1,13 @@
 # src/handlers/debate_handlers.py
+import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ChatMemberStatus
 from src.managers import debate_manager
 from src.config import settings
 
+logger = logging.getLogger(__name__)
+
 async def force_debate_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Handler for the /debate command. Forces a new debate.
@@ -25,7 +28,7 @@ async def force_debate_command(update: Update, context: ContextTypes.DEFAULT_TYP
             await update.message.reply_text("⚠️ Solo los administradores pueden usar este comando.")
             return
     except Exception as e:
-        print(f"Error al verificar el estado del miembro del chat: {e}")
+        logger.warning("Error al verificar el estado del miembro del chat: %s", e)
         await update.message.reply_text("No pude verificar si eres administrador. Inténtalo de nuevo.")
         return
 
@@ -0,0 +1,112 @@
+# src/handlers/diagnostics_handlers.py
+import html
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.config import settings
+from src.managers import group_manager
+from src import loop_monitor, profiler
+
+logger = logging.getLogger(__name__)
+
+
+def build_lag_text() -> str:
+    """Resumen del vigilante del bucle: percentiles del retraso y los peores bloqueos."""
+    if not loop_monitor.monitor.running:
+        return "💤 El vigilante del bucle de eventos está desactivado (LOOP_MONITOR_ENABLED)."
+
+    stats = loop_monitor.monitor.stats()
+    lines = [
+        "🫀 <b>Bucle de eventos</b>\n",
+        f"⏱️ Retraso p50 / p90 / p99 / máx.: {stats['p50_ms']:.1f} / {stats['p90_ms']:.1f} / "
+        f"{stats['p99_ms']:.1f} / {stats['max_ms']:.0f} ms ({stats['samples']} latidos)",
+        f"🧱 Bloqueos de más de {stats['threshold_ms']:.0f} ms: {stats['stalls']}",
+    ]
+    if stats["offenders"]:
+        lines.append("\n🔎 <b>Culpables</b> (veces, total / máx.)")
+        for offender in stats["offenders"]:
+            lines.append(
+                f"• <code>{html.escape(offender['site'])}</code>: {offender['count']}, "
+                f"{offender['total_ms']:.0f} / {offender['max_ms']:.0f} ms"
+            )
+        worst = stats["offenders"][0]["stack"]
+        if worst:
+            lines.append("\n📚 <b>Pila del peor</b>\n<pre>" + html.escape("\n".join(worst)) + "</pre>")
+    return "\n".join(lines)
+
+
+async def lag_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handler para el comando /lag. Solo para administradores del grupo principal.
+    """
+    user_id = update.effective_user.id
+    if not await group_manager.is_group_admin(context.bot, settings.GROUP_CHAT_ID, user_id):
+        await update.message.reply_text("⚠️ Solo los administradores pueden usar este comando.")
+        return
+
+    await update.message.reply_text(build_lag_text(), parse_mode="HTML")
+
+
+PROFILE_USAGE = (
+    "Uso: <code>/profile [cpu|sample|mem] [segundos]</code>\n"
+    "• <b>cpu</b>: cProfile (exacto, frena un poco el bot)\n"
+    "• <b>sample</b>: muestreo de la pila (casi gratis, vale con carga)\n"
+    "• <b>mem</b>: memoria reservada durante la ventana (tracemalloc)"
+)
+
+
+def build_profile_text(result: dict) -> str:
+    """Resumen corto de un perfilado para mandar por privado."""
+    lines = [f"🔬 <b>Perfilado {result['mode']}</b> ({result['seconds']:g} s)\n"]
+    lines += [f"• <code>{html.escape(line)}</code>" for line in result["summary"]] or ["(sin datos)"]
+    lines.append("\n📁 " + ", ".join(f"<code>{html.escape(path)}</code>" for path in result["files"]))
+    return "\n".join(lines)
+
+
+async def _profile_and_report(bot, user_id: int, message, mode: str, seconds: float):
+    try:
+        result = await profiler.run(mode, seconds)
+        text = build_profile_text(result)
+    except Exception as e:
+        logger.error("❌ Error durante el perfilado: %s", e)
+        text = f"❌ El perfilado ha fallado: {html.escape(str(e))}"
+
+    try:
+        await bot.send_message(chat_id=user_id, text=text, parse_mode="HTML")
+    except Exception as e:
+        logger.warning("⚠️ No se pudo mandar el resumen del perfilado por privado: %s", e)
+        await message.reply_text(
+            f"⚠️ No te he podido escribir por privado (¿has abierto un chat conmigo?). "
+            f"Los resultados están en {settings.PROFILE_DIR}."
+        )
+
+
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handler para el comando /profile. Solo para administradores del grupo principal.
+    Perfila el bot en marcha durante unos segundos y manda el resumen por privado.
+    """
+    user_id = update.effective_user.id
+    if not await group_manager.is_group_admin(context.bot, settings.GROUP_CHAT_ID, user_id):
+        await update.message.reply_text("⚠️ Solo los administradores pueden usar este comando.")
+        return
+
+    args = context.args or []
+    mode = args[0].lower() if args else "cpu"
+    try:
+        seconds = float(args[1]) if len(args) > 1 else settings.PROFILE_DEFAULT_SECONDS
+    except ValueError:
+        seconds = 0
+    if mode not in profiler.MODES or not 0 < seconds <= settings.PROFILE_MAX_SECONDS:
+        await update.message.reply_text(
+            PROFILE_USAGE + f"\n\nMáximo {settings.PROFILE_MAX_SECONDS} s.", parse_mode="HTML"
+        )
+        return
+    if not profiler.claim(mode):
+        await update.message.reply_text(f"⏳ Ya hay un perfilado en marcha ({profiler.active}).")
+        return
+
+    await update.message.reply_text(f"🔬 Perfilando ({mode}) durante {seconds:g} s. Te mando el resumen por privado.")
+    # En segundo plano: el handler no se queda ocupando el procesador de updates
+    context.application.create_task(_profile_and_report(context.bot, user_id, update.message, mode, seconds))
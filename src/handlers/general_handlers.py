@@ -4,6 +4,7 @@ from telegram.ext import ContextTypes
 
 # Importamos los managers que vamos a usar en este archivo
 from src.managers import ai_manager, user_manager, verification_manager
+from src.managers.update_processor import record_locks
 from src.config import settings
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -19,6 +20,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     await update.message.reply_text(saludo, parse_mode="MarkdownV2")
 
+    # Si nos escribe por privado, ya podemos volver a mandarle DMs
+    if update.effective_chat and update.effective_chat.type == "private":
+        user_manager.mark_dm_reachable(user.id)
+
 async def saludar_nuevo_miembro(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Da la bienvenida a los nuevos miembros e inicia el proceso de verificación."""
     for nuevo_miembro in update.message.new_chat_members:
@@ -57,15 +62,23 @@ async def check_presentation(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if not message_text:
         return
 
-    # Usamos la IA para evaluar si es una presentación válida
+    # Se evalúan todos los mensajes, aunque haya otro en marcha del mismo usuario:
+    # el siguiente puede ser la presentación buena. Si dos salen válidas, el
+    # cerrojo de abajo hace que solo la primera cuente.
     es_valido = await ai_manager.evaluate_presentation(message_text)
 
     if es_valido:
-        # 1. Marcar como verificado
-        user_manager.set_user_status(user.id, "verified")
-        
-        # 2. Cancelar jobs de advertencia/baneo
-        verification_manager.cancel_verification_jobs(context, user.id)
+        # Mientras la IA pensaba, el job de expulsión ha podido actuar: lo comprobamos
+        # con el mismo cerrojo que usa él antes de dar por buena la presentación
+        async with record_locks.hold(("user", user.id)):
+            if str(user.id) not in user_manager.users_db or user_manager.is_verified(user.id):
+                return
+
+            # 1. Marcar como verificado
+            user_manager.set_user_status(user.id, "verified")
+
+            # 2. Cancelar jobs de advertencia/baneo
+            verification_manager.cancel_verification_jobs(context, user.id)
         
         # 3. Felicitar
         await update.message.reply_text(
@@ -81,7 +94,6 @@ async def handle_mention(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Se activa cuando alguien menciona al bot en un grupo.
     """
-    print("DEBUG: handle_mention function called.") # Temporary debug print
     # Nos aseguramos de que el mensaje no sea nulo
     if not update.message or not update.message.text:
         return
@@ -2,28 +2,23 @@
 import random
 from telegram import Update
 from telegram.ext import ContextTypes
-from src.managers import user_manager
-
-# --- Mensajes de Anuncio de Subida de Nivel ---
-LEVEL_UP_MESSAGES = [
-    "¡Atención, cuadrilla! @{user_name} ha hablado tanto de vinos que acaba de subir al Nivel {level_num}: **{level_name}**! ¡Invítate a unos chatos, que te lo has ganado! 🍇",
-    "¡Aúpa ahí! @{user_name} se ha ganado el ascenso al Nivel {level_num}: **{level_name}**. ¡Ya eres una leyenda de la Laurel! 🎉",
-    "¡Qué hermosura! @{user_name} ha alcanzado el Nivel {level_num}: **{level_name}**. ¡Tu sabiduría riojana es legendaria! 🍷",
-    "¡La virgen! @{user_name} no para y ya es Nivel {level_num}: **{level_name}**. ¡Siguiente parada, la Calle San Juan! 🍄",
-    "¡Dale, majo/a! @{user_name} acaba de llegar al Nivel {level_num}: **{level_name}**. ¡Te estás convirtiendo en un/a riojano/a de pro! 🚀"
-]
+from src.managers import user_manager, outbound_dispatcher
+from src.config import content
 
 async def announce_level_up(context: ContextTypes.DEFAULT_TYPE, chat_id: int, level_up_info: dict):
     """
     Envía un mensaje público al grupo para anunciar una subida de nivel.
     """
-    message_template = random.choice(LEVEL_UP_MESSAGES)
-    message = message_template.format(
+    # Los mensajes viven en data/level_up_messages.json y se recargan en caliente
+    message_template = random.choice(content.get("level_up_messages"))
+    message = message_template.render(
         user_name=level_up_info["user_name"],
         level_num=level_up_info["level_num"],
         level_name=level_up_info["level_name"]
     )
-    await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown')
+    # El anuncio no responde a nadie: que no adelante a las respuestas interactivas
+    with outbound_dispatcher.background():
+        await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown')
 
 async def level_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -0,0 +1,112 @@
+# src/handlers/pipeline.py
+"""
+Tubería única para los mensajes de texto.
+
+Antes cada mensaje pasaba por cinco grupos de handlers independientes
+(presentación, mención, juego, actividad y agenda) y cada uno volvía a
+comprobar el estado del usuario. Aquí se resuelve el estado una sola vez
+por update y solo se ejecutan las etapas que aplican:
+
+    presentación -> mención -> juego -> actividad -> alta de evento
+
+El caso común (mensaje normal de un usuario verificado, sin juego activo ni
+mención) se queda en una búsqueda en users_db más la actualización de XP.
+Cada etapa mide su tiempo; `get_stage_timings()` devuelve el resumen.
+"""
+import logging
+from time import perf_counter
+
+from telegram import Update
+from telegram.ext import ContextTypes, filters
+
+from src.managers import user_manager, activity_manager, word_game_manager
+from src.handlers import general_handlers, word_game_handlers, level_handlers, agenda_handlers
+from src import log
+
+logger = logging.getLogger(__name__)
+
+GROUP_TYPES = ("group", "supergroup")
+
+# etapa -> {"calls": n, "total": segundos, "max": segundos}
+stage_timings: dict[str, dict] = {}
+
+
+def _record_timing(stage: str, elapsed: float):
+    stats = stage_timings.get(stage)
+    if stats is None:
+        stats = stage_timings[stage] = {"calls": 0, "total": 0.0, "max": 0.0}
+    stats["calls"] += 1
+    stats["total"] += elapsed
+    if elapsed > stats["max"]:
+        stats["max"] = elapsed
+
+
+def get_stage_timings() -> dict[str, dict]:
+    """Llamadas, media y máximo (en milisegundos) de cada etapa."""
+    return {
+        stage: {
+            "calls": stats["calls"],
+            "avg_ms": stats["total"] / stats["calls"] * 1000,
+            "max_ms": stats["max"] * 1000,
+        }
+        for stage, stats in stage_timings.items()
+    }
+
+
+async def _run_stage(stage: str, handler, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Ejecuta una etapa midiendo su tiempo. Un fallo no impide que sigan las demás."""
+    start = perf_counter()
+    try:
+        await handler(update, context)
+    except Exception as e:
+        logger.error("🚨 Error en la etapa '%s' de la tubería de mensajes: %s", stage, e, extra=log.every(10))
+    finally:
+        _record_timing(stage, perf_counter() - start)
+
+
+async def track_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Actualiza la actividad del usuario, le da XP y anuncia si sube de nivel."""
+    user = update.effective_user
+    chat = update.effective_chat
+
+    level_up_info = user_manager.record_message(user)
+
+    # Series de actividad (solo cuenta lo que se habla en grupos)
+    if chat.type in GROUP_TYPES:
+        activity_manager.record_message(user.id)
+
+    if level_up_info:
+        await level_handlers.announce_level_up(context, chat.id, level_up_info)
+
+
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Punto de entrada de todos los mensajes de texto (comandos incluidos)."""
+    message = update.message
+    user = update.effective_user
+    if message is None or not message.text or user is None or user.is_bot:
+        return
+
+    start = perf_counter()
+    text = message.text
+    in_group = update.effective_chat.type in GROUP_TYPES
+    is_command = filters.COMMAND.check_update(update)
+
+    # Estado del usuario: una sola búsqueda (los desconocidos cuentan como verificados)
+    user_data = user_manager.users_db.get(str(user.id))
+    status = user_data.get("status", "verified") if user_data else "verified"
+    _record_timing("ingest", perf_counter() - start)
+
+    if in_group and not is_command and status != "verified":
+        await _run_stage("presentation", general_handlers.check_presentation, update, context)
+
+    bot_username = context.bot.username
+    if in_group and bot_username and f"@{bot_username}" in text:
+        await _run_stage("mention", general_handlers.handle_mention, update, context)
+
+    if in_group and not is_command and word_game_manager.is_game_active():
+        await _run_stage("word_game", word_game_handlers.handle_guess, update, context)
+
+    await _run_stage("activity", track_activity, update, context)
+
+    if not is_command and context.user_data.get("estado"):
+        await _run_stage("agenda", agenda_handlers.manejar_mensajes_de_texto, update, context)
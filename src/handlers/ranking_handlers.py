@@ -0,0 +1,65 @@
+# src/handlers/ranking_handlers.py
+import html
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.managers import user_manager, leaderboard_manager
+
+TOP_K = 10
+
+# Palabras que acepta el comando -> nombre interno
+METRIC_ALIASES = {"xp": "xp", "experiencia": "xp", "puntos": "points", "points": "points"}
+WINDOW_ALIASES = {"total": "total", "semana": "semana", "semanal": "semana", "mes": "mes", "mensual": "mes"}
+
+METRIC_LABELS = {"xp": "XP", "points": "puntos"}
+WINDOW_LABELS = {"total": "de siempre", "semana": "de los últimos 7 días", "mes": "de los últimos 30 días"}
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+def _display_name(user_id: str) -> str:
+    data = user_manager.users_db.get(user_id, {})
+    return html.escape(data.get("first_name") or data.get("username") or "Usuario")
+
+
+def parse_ranking_args(args: list[str]) -> tuple[str, str]:
+    """Interpreta '/ranking [xp|puntos] [semana|mes|total]' en cualquier orden."""
+    metric, window = "xp", "total"
+    for arg in args:
+        arg = arg.lower()
+        if arg in METRIC_ALIASES:
+            metric = METRIC_ALIASES[arg]
+        elif arg in WINDOW_ALIASES:
+            window = WINDOW_ALIASES[arg]
+    return metric, window
+
+
+def build_ranking_text(metric: str, window: str, user_id: int | None) -> str:
+    label = METRIC_LABELS[metric]
+    lines = [f"🏆 <b>Ranking de {label} {WINDOW_LABELS[window]}</b>\n"]
+
+    top = leaderboard_manager.top(metric, window, TOP_K)
+    if not top:
+        return lines[0] + "\nTodavía no hay nadie en la clasificación. ¡A darle a la lengua!"
+
+    for position, (uid, score) in enumerate(top, start=1):
+        prefix = MEDALS.get(position, f"{position}.")
+        lines.append(f"{prefix} {_display_name(uid)} — {score} {label}")
+
+    if user_id is not None:
+        my_rank = leaderboard_manager.rank(metric, user_id, window)
+        total = leaderboard_manager.size(metric, window)
+        if my_rank is None:
+            lines.append(f"\nTú aún no puntúas aquí.")
+        elif my_rank[0] > TOP_K:
+            lines.append(f"\nTú vas el {my_rank[0]}º de {total} con {my_rank[1]} {label}.")
+    return "\n".join(lines)
+
+
+async def ranking_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handler para el comando /ranking. Muestra el top y la posición del usuario.
+    Uso: /ranking [xp|puntos] [semana|mes|total]
+    """
+    metric, window = parse_ranking_args(context.args or [])
+    user_id = update.effective_user.id if update.effective_user else None
+    await update.message.reply_text(build_ranking_text(metric, window, user_id), parse_mode="HTML")
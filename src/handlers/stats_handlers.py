@@ -0,0 +1,67 @@
+# src/handlers/stats_handlers.py
+import html
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.config import settings
+from src.managers import activity_manager, group_manager, user_manager
+from src.handlers import pipeline
+
+
+def _name(user_id: str) -> str:
+    data = user_manager.users_db.get(user_id, {})
+    return html.escape(data.get("first_name") or data.get("username") or user_id)
+
+
+def build_stats_text() -> str:
+    """Compone el resumen de actividad y población del grupo."""
+    population = user_manager.get_population_stats()
+    by_status = population["by_status"]
+
+    lines = [
+        "📊 <b>Estadísticas del grupo</b>\n",
+        f"👥 Miembros registrados: {population['total']} "
+        f"(✅ {by_status.get('verified', 0)} verificados, ⏳ {by_status.get('pending_presentation', 0) + by_status.get('warned', 0)} pendientes)",
+        f"💤 Inactivos (más de {settings.INACTIVITY_DAYS} días): {population['inactive']}",
+        f"✨ XP media de los activos: {population['mean_xp_active']:.0f}",
+        "",
+        f"💬 Mensajes última hora: {activity_manager.messages_last_minutes(60)}",
+        f"💬 Mensajes últimas 24 h: {activity_manager.messages_in_last(24)}",
+        f"💬 Mensajes últimos 7 días: {activity_manager.messages_in_last(7 * 24)}",
+    ]
+
+    busiest = activity_manager.busiest_hours(3)
+    if busiest:
+        lines.append("⏰ Horas con más movimiento: " + ", ".join(f"{h:02d}:00" for h in busiest))
+
+    top = activity_manager.top_active_users(5)
+    if top:
+        lines.append("\n🔥 <b>Más activos esta semana</b>")
+        lines += [f"• {_name(uid)}: {count} mensajes" for uid, count in top]
+
+    drifting = activity_manager.drifting_users(5)
+    if drifting:
+        lines.append("\n📉 <b>Se están alejando</b>")
+        lines += [f"• {_name(uid)}: {before} → {now} mensajes/semana" for uid, before, now in drifting]
+
+    timings = pipeline.get_stage_timings()
+    if timings:
+        lines.append("\n⚙️ <b>Tubería de mensajes</b> (media / máx.)")
+        lines += [
+            f"• {stage}: {t['avg_ms']:.1f} / {t['max_ms']:.0f} ms ({t['calls']} llamadas)"
+            for stage, t in timings.items()
+        ]
+
+    return "\n".join(lines)
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handler para el comando /stats. Solo para administradores del grupo principal.
+    """
+    user_id = update.effective_user.id
+    if not await group_manager.is_group_admin(context.bot, settings.GROUP_CHAT_ID, user_id):
+        await update.message.reply_text("⚠️ Solo los administradores pueden usar este comando.")
+        return
+
+    await update.message.reply_text(build_stats_text(), parse_mode="HTML")
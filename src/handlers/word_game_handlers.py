@@ -1,4 +1,5 @@
 # src/handlers/word_game_handlers.py
+import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
@@ -6,6 +7,8 @@ from src.config import settings
 from src.managers import user_manager
 from src.managers import word_game_manager
 
+logger = logging.getLogger(__name__)
+
 async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.message.text:
         return
@@ -19,20 +22,19 @@ async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     message_text = update.message.text
 
-    if not word_game_manager.is_correct_guess(message_text):
+    # Comprobar y cerrar la ronda es un solo paso: con updates en paralelo solo gana el primero
+    word = word_game_manager.claim_win(message_text)
+    if word is None:
         return
 
     user = update.effective_user
     user_manager.update_user_activity(user)
     total_points = user_manager.add_points(user.id, settings.WORD_GAME_POINTS)
 
-    word = word_game_manager.get_current_word() or ""
-    word_game_manager.finish_round()
-
     try:
         await update.message.reply_text(
             f"✅ ¡{user.first_name} ha acertado la palabra '{word}'!\n"
             f"Gana {settings.WORD_GAME_POINTS} puntos. Total: {total_points}"
         )
     except Exception as e:
-        print(f"🚨 Error anunciando ganador del juego: {e}")
+        logger.error("🚨 Error anunciando ganador del juego: %s", e)
@@ -0,0 +1,158 @@
+# src/log.py
+"""
+Logging sin bloquear el bucle de eventos.
+
+Cada módulo tiene su `logger = logging.getLogger(__name__)`. `setup()` (lo llama
+main.py al arrancar) monta esto:
+
+- Un `QueueHandler` en el logger raíz. Registrar algo solo mete el registro en
+  una cola; un `QueueListener` en su propio hilo lo formatea y escribe en la
+  salida estándar. Ninguna escritura a stdout pasa por el bucle.
+- Salida JSON (una línea por registro, con los campos extra que se pasen) o
+  texto legible (LOG_FORMAT).
+- Nivel general (LOG_LEVEL) y por módulo (LOG_LEVELS, p. ej.
+  "src.managers.user_manager=DEBUG,telegram=WARNING").
+- Para eventos muy frecuentes, límites por mensaje: `extra=log.every(60)` deja
+  pasar uno por minuto y cuenta los omitidos; `extra=log.sample(0.01)` deja
+  pasar un 1 %.
+
+Sin `setup()` (pruebas, benchmarks) se usa la configuración por defecto de
+Python: solo se ven los avisos y errores.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from time import monotonic
+
+from src.config import settings
+
+# Atributos que trae cualquier LogRecord: el resto son campos extra del registro
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+# Campos de control de los límites, que no se escriben
+_CONTROL_ATTRS = {"rate_limit", "sample_rate"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def every(seconds: float) -> dict:
+    """`extra` para dejar pasar como mucho un registro de ese mensaje cada `seconds`."""
+    return {"rate_limit": seconds}
+
+
+def sample(rate: float) -> dict:
+    """`extra` para dejar pasar solo una fracción `rate` de los registros de ese mensaje."""
+    return {"sample_rate": rate}
+
+
+class HighFrequencyFilter(logging.Filter):
+    """Aplica `every()` y `sample()`. Va en el QueueHandler: lo descartado ni se encola."""
+
+    def __init__(self):
+        super().__init__()
+        # (logger, plantilla) -> [último registro que pasó, omitidos desde entonces]
+        self._state: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is not None and random.random() >= rate:
+            return False
+        interval = getattr(record, "rate_limit", None)
+        if interval is None:
+            return True
+
+        now = monotonic()
+        state = self._state.setdefault((record.name, str(record.msg)), [float("-inf"), 0])
+        if now - state[0] < interval:
+            state[1] += 1
+            return False
+        if state[1]:
+            record.suppressed = state[1]
+        state[0], state[1] = now, 0
+        return True
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS and k not in _CONTROL_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            text += " " + " ".join(f"{k}={v}" for k, v in extra.items())
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Aquí solo se resuelve el mensaje; el formato (JSON, hora) lo pone el hilo del listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Se resuelven ya el mensaje y la excepción: los argumentos podrían cambiar antes de escribirse
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> dict[str, int]:
+    """Convierte `modulo=NIVEL,otro=NIVEL` en {nombre del logger: nivel}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def setup(level: str | None = None, fmt: str | None = None, levels: str | None = None, stream=None):
+    """Configura el logging de todo el proceso. Se puede llamar más de una vez."""
+    global _listener
+    shutdown()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if (fmt or settings.LOG_FORMAT) == "json" else TextFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(HighFrequencyFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+    for name, module_level in parse_levels(settings.LOG_LEVELS if levels is None else levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown():
+    """Escribe lo que quede en la cola y para el hilo del listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,173 @@
+# src/loop_monitor.py
+"""
+Vigilante del bucle de eventos: detecta cuándo algo lo bloquea y dónde.
+
+Dentro de los handlers async hay código bloqueante (los `json.dump` de los
+guardados, el `requests.get` de `get_weather`, bucles de formateo...). Mientras
+se ejecuta, el bot entero deja de atender. Aquí:
+
+- Un latido en el propio bucle (`asyncio.sleep(interval)`) mide cuánto se
+  retrasa cada vuelta: es el retraso (lag) que sufre cualquier otro update.
+- Un hilo vigilante comprueba que el latido llegue a tiempo. Si se retrasa más
+  del umbral, el bucle está bloqueado justo en ese momento: se toma la pila del
+  hilo del bucle (`sys._current_frames`) y se apunta la línea de nuestro código
+  más interna, que es la que ha hecho la llamada bloqueante.
+
+Los percentiles y los peores sitios se ven con /lag (solo administradores) y en
+/metrics (`nimex_event_loop_lag_seconds`, `nimex_event_loop_stalls_total`).
+"""
+import asyncio
+import os
+import sys
+import threading
+import traceback
+from collections import deque
+from time import perf_counter
+
+from src import metrics
+from src.config import settings
+
+# Raíz del proyecto: solo las líneas de aquí dentro cuentan como culpables
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Latidos que se guardan para los percentiles (con 100 ms, los últimos ~10 minutos)
+WINDOW = 6000
+# Marcos de la pila que se guardan de cada culpable
+STACK_DEPTH = 8
+
+
+def is_project_frame(filename: str) -> bool:
+    return (filename.startswith(PROJECT_ROOT) and "site-packages" not in filename
+            and os.path.abspath(filename) != os.path.abspath(__file__))
+
+
+def short_frame(frame: traceback.FrameSummary) -> str:
+    """`ruta:línea (función)`, relativa al proyecto (de las librerías, solo el nombre del archivo)."""
+    if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename:
+        path = os.path.relpath(frame.filename, PROJECT_ROOT)
+    else:
+        path = os.path.basename(frame.filename)
+    return f"{path}:{frame.lineno} ({frame.name})"
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    return ordered[int((len(ordered) - 1) * p)] if ordered else 0.0
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, window: int = WINDOW):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: deque[float] = deque(maxlen=window)
+        self.stalls = 0
+        # sitio -> {"count", "total", "max", "stack"}
+        self.offenders: dict[str, dict] = {}
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop_thread_id: int | None = None
+        # Cuándo debería llegar el próximo latido (lo escribe el bucle, lo lee el vigilante)
+        self._next_beat = 0.0
+        # Muestra tomada por el vigilante para el latido que se está retrasando: (latido, sitio, pila)
+        self._pending: tuple[float, str, list[str]] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Arranca el latido y el hilo vigilante. Hay que llamarlo desde el bucle a vigilar."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._next_beat = perf_counter() + self.interval
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = perf_counter() + self.interval
+            self._next_beat = expected
+            await asyncio.sleep(self.interval)
+            self._record(max(0.0, perf_counter() - expected), expected)
+
+    def _record(self, lag: float, beat: float):
+        self.lags.append(lag)
+        metrics.LOOP_LAG_SECONDS.observe(lag)
+        if lag < self.threshold:
+            return
+
+        pending = self._pending
+        self._pending = None
+        if pending is not None and pending[0] == beat:
+            _, site, stack = pending
+        else:
+            # El vigilante no llegó a tiempo (bloqueo justo por encima del umbral)
+            site, stack = "desconocido", []
+        self.stalls += 1
+        offender = self.offenders.setdefault(site, {"count": 0, "total": 0.0, "max": 0.0, "stack": stack})
+        offender["count"] += 1
+        offender["total"] += lag
+        if lag >= offender["max"]:
+            offender["max"] = lag
+            offender["stack"] = stack
+        metrics.LOOP_STALLS.inc(site)
+
+    def _watchdog(self):
+        poll = min(self.interval, self.threshold) / 2
+        sampled_beat = None
+        while not self._stop.wait(poll):
+            beat = self._next_beat
+            if beat != sampled_beat and perf_counter() - beat >= self.threshold:
+                sampled_beat = beat
+                self._pending = (beat, *self._sample())
+
+    def _sample(self) -> tuple[str, list[str]]:
+        """Pila actual del hilo del bucle: (línea culpable, últimos marcos)."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "desconocido", []
+        frames = traceback.extract_stack(frame)
+        stack = [short_frame(f) for f in frames[-STACK_DEPTH:]]
+        for f in reversed(frames):
+            if is_project_frame(f.filename):
+                return short_frame(f), stack
+        return stack[-1] if stack else "desconocido", stack
+
+    def stats(self, top: int = 5) -> dict:
+        """Percentiles del lag (ms), bloqueos y los `top` sitios que más tiempo han bloqueado."""
+        ordered = sorted(self.lags)
+        offenders = sorted(self.offenders.items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+        return {
+            "samples": len(ordered),
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p90_ms": _percentile(ordered, 0.90) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+            "stalls": self.stalls,
+            "threshold_ms": self.threshold * 1000,
+            "offenders": [
+                {"site": site, "count": data["count"], "total_ms": data["total"] * 1000,
+                 "max_ms": data["max"] * 1000, "stack": data["stack"]}
+                for site, data in offenders
+            ],
+        }
+
+    def reset(self):
+        self.lags.clear()
+        self.stalls = 0
+        self.offenders.clear()
+
+
+# Instancia única; main.py la arranca junto a la aplicación
+monitor = LoopMonitor(settings.LOOP_LAG_INTERVAL_MS / 1000, settings.LOOP_STALL_THRESHOLD_MS / 1000)
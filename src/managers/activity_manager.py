@@ -0,0 +1,272 @@
+# src/managers/activity_manager.py
+"""
+Series temporales de actividad del grupo y de cada usuario.
+
+En lugar de guardar los mensajes, se cuentan en búferes circulares de tamaño
+fijo (arrays de NumPy) que se sobrescriben solos con el paso del tiempo:
+
+- Grupo: mensajes por minuto (último día), por hora (últimos 90 días) y por
+  día (últimos 2 años). Cada mensaje suma en las tres resoluciones, así que
+  lo antiguo se conserva solo con el grano grueso.
+- Usuarios: mensajes por hora de los últimos `ACTIVITY_USER_DAYS` días, en
+  una matriz (una fila por usuario) que se limpia de golpe al cambiar de hora.
+
+Todo se guarda comprimido en `settings.ACTIVITY_FILE` (.npz).
+"""
+import logging
+import os
+import random
+from datetime import datetime
+from time import time
+
+import numpy as np
+
+from src import tracing
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+
+class RingSeries:
+    """Contador circular: `slots` casillas de `slot_seconds` segundos cada una."""
+
+    def __init__(self, slots: int, slot_seconds: int, dtype=np.uint32):
+        self.slot_seconds = slot_seconds
+        self.counts = np.zeros(slots, dtype=dtype)
+        self.last_slot = int(time() // slot_seconds)
+
+    def _advance(self, slot: int):
+        """Vacía las casillas que han quedado atrás desde la última escritura."""
+        gap = slot - self.last_slot
+        if gap <= 0:
+            return
+        size = len(self.counts)
+        if gap >= size:
+            self.counts[:] = 0
+        else:
+            stale = np.arange(self.last_slot + 1, slot + 1) % size
+            self.counts[stale] = 0
+        self.last_slot = slot
+
+    def add(self, timestamp: float, amount: int = 1):
+        slot = int(timestamp // self.slot_seconds)
+        self._advance(slot)
+        if slot > self.last_slot - len(self.counts):  # Ignoramos lo demasiado antiguo
+            self.counts[slot % len(self.counts)] += amount
+
+    def values(self, now: float | None = None) -> np.ndarray:
+        """Serie ordenada de la casilla más antigua a la actual."""
+        self._advance(int((time() if now is None else now) // self.slot_seconds))
+        start = (self.last_slot + 1) % len(self.counts)
+        return np.roll(self.counts, -start)
+
+
+class UserHourlyMatrix:
+    """Mensajes por hora de cada usuario: una fila por usuario, una columna por hora del búfer."""
+
+    def __init__(self, hours: int):
+        self.hours = hours
+        self.rows: dict[str, int] = {}
+        self.counts = np.zeros((64, hours), dtype=np.uint16)
+        self.last_hour = int(time() // HOUR)
+
+    def _advance(self, hour: int):
+        gap = hour - self.last_hour
+        if gap <= 0:
+            return
+        if gap >= self.hours:
+            self.counts[:] = 0
+        else:
+            stale = np.arange(self.last_hour + 1, hour + 1) % self.hours
+            self.counts[:, stale] = 0
+        self.last_hour = hour
+
+    def _row(self, user_id: str) -> int:
+        row = self.rows.get(user_id)
+        if row is None:
+            row = len(self.rows)
+            if row == len(self.counts):
+                grown = np.zeros((len(self.counts) * 2, self.hours), dtype=self.counts.dtype)
+                grown[:row] = self.counts
+                self.counts = grown
+            self.rows[user_id] = row
+        return row
+
+    def add(self, user_id: str, timestamp: float, amount: int = 1):
+        hour = int(timestamp // HOUR)
+        self._advance(hour)
+        row = self._row(user_id)
+        column = hour % self.hours
+        # Saturamos en vez de desbordar el uint16
+        self.counts[row, column] = min(int(self.counts[row, column]) + amount, np.iinfo(self.counts.dtype).max)
+
+    def matrix(self, now: float | None = None) -> np.ndarray:
+        """Matriz (usuarios x horas) ordenada de la hora más antigua a la actual."""
+        self._advance(int((time() if now is None else now) // HOUR))
+        start = (self.last_hour + 1) % self.hours
+        return np.roll(self.counts[:len(self.rows)], -start, axis=1)
+
+    def user_ids(self) -> list[str]:
+        ids = [None] * len(self.rows)
+        for user_id, row in self.rows.items():
+            ids[row] = user_id
+        return ids
+
+
+# --- Estado del módulo ---
+
+group_minutes = RingSeries(24 * 60, MINUTE, dtype=np.uint16)
+group_hours = RingSeries(90 * 24, HOUR)
+group_days = RingSeries(730, DAY)
+user_hours = UserHourlyMatrix(settings.ACTIVITY_USER_DAYS * 24)
+_dirty = False
+
+
+def reset():
+    """Vacía todas las series (útil en los tests)."""
+    global group_minutes, group_hours, group_days, user_hours, _dirty
+    group_minutes = RingSeries(24 * 60, MINUTE, dtype=np.uint16)
+    group_hours = RingSeries(90 * 24, HOUR)
+    group_days = RingSeries(730, DAY)
+    user_hours = UserHourlyMatrix(settings.ACTIVITY_USER_DAYS * 24)
+    _dirty = False
+
+
+def record_message(user_id: int | str, timestamp: float | None = None):
+    """Apunta un mensaje en las series del grupo y del usuario. Coste O(1)."""
+    global _dirty
+    timestamp = time() if timestamp is None else timestamp
+    group_minutes.add(timestamp)
+    group_hours.add(timestamp)
+    group_days.add(timestamp)
+    user_hours.add(str(user_id), timestamp)
+    _dirty = True
+
+
+# --- Persistencia ---
+
+def save():
+    """Guarda todas las series en un único .npz comprimido (solo si hay cambios)."""
+    global _dirty
+    if not _dirty:
+        return
+    tmp_path = settings.ACTIVITY_FILE + ".tmp.npz"
+    with tracing.store_flush("activity"):
+        np.savez_compressed(
+            tmp_path,
+            group_minutes=group_minutes.counts, group_minutes_last=group_minutes.last_slot,
+            group_hours=group_hours.counts, group_hours_last=group_hours.last_slot,
+            group_days=group_days.counts, group_days_last=group_days.last_slot,
+            user_hours=user_hours.counts[:len(user_hours.rows)], user_hours_last=user_hours.last_hour,
+            user_ids=np.array(user_hours.user_ids(), dtype=np.int64),
+        )
+        os.replace(tmp_path, settings.ACTIVITY_FILE)
+    _dirty = False
+
+
+async def save_job(context):
+    """Job periódico que persiste las series de actividad."""
+    save()
+
+
+def load():
+    """Carga las series desde disco. Si el tamaño configurado ha cambiado, se empieza de cero."""
+    reset()
+    try:
+        data = np.load(settings.ACTIVITY_FILE)
+    except (FileNotFoundError, OSError, ValueError):
+        logger.info("ℹ️ No hay histórico de actividad en %s. Empezamos de cero.", settings.ACTIVITY_FILE)
+        return
+
+    with data:
+        for series, name in ((group_minutes, "group_minutes"), (group_hours, "group_hours"), (group_days, "group_days")):
+            if data[name].shape == series.counts.shape:
+                series.counts = data[name].astype(series.counts.dtype)
+                series.last_slot = int(data[f"{name}_last"])
+        stored = data["user_hours"]
+        if stored.shape[1:] == (user_hours.hours,):
+            ids = [str(uid) for uid in data["user_ids"]]
+            user_hours.counts = np.zeros((max(64, len(ids) * 2), user_hours.hours), dtype=np.uint16)
+            user_hours.counts[:len(ids)] = stored
+            user_hours.rows = {uid: row for row, uid in enumerate(ids)}
+            user_hours.last_hour = int(data["user_hours_last"])
+    logger.info("📈 Histórico de actividad cargado (%s usuarios).", len(user_hours.rows))
+
+
+# --- Consultas ---
+
+def messages_in_last(hours: int) -> int:
+    """Mensajes del grupo en las últimas `hours` horas (desde la serie horaria)."""
+    return int(group_hours.values()[-hours:].sum())
+
+
+def messages_last_minutes(minutes: int) -> int:
+    return int(group_minutes.values()[-minutes:].sum())
+
+
+def hourly_profile(days: int = 14) -> np.ndarray:
+    """Media de mensajes para cada hora del día (0-23, hora local) en los últimos `days` días."""
+    now = time()
+    counts = group_hours.values(now)[-days * 24:]
+    # Hora local de cada casilla, de la más antigua a la actual
+    current_hour = datetime.fromtimestamp(now).hour
+    hours_of_day = (current_hour - np.arange(len(counts))[::-1]) % 24
+    totals = np.bincount(hours_of_day, weights=counts, minlength=24)
+    return totals / max(days, 1)
+
+
+def busiest_hours(k: int = 3, days: int = 14) -> list[int]:
+    profile = hourly_profile(days)
+    if not profile.any():
+        return []
+    return [int(h) for h in np.argsort(-profile, kind="stable")[:k]]
+
+
+def top_active_users(k: int = 5, hours: int = 7 * 24) -> list[tuple[str, int]]:
+    """Usuarios con más mensajes en las últimas `hours` horas."""
+    if not user_hours.rows:
+        return []
+    totals = user_hours.matrix()[:, -hours:].sum(axis=1)
+    ids = user_hours.user_ids()
+    order = np.argsort(-totals, kind="stable")[:k]
+    return [(ids[row], int(totals[row])) for row in order if totals[row] > 0]
+
+
+def drifting_users(k: int = 5, window_days: int = 7) -> list[tuple[str, int, int]]:
+    """
+    Usuarios que más han bajado su actividad: compara los últimos `window_days` días
+    con los `window_days` anteriores. Devuelve (id, antes, ahora).
+    """
+    if not user_hours.rows:
+        return []
+    window = window_days * 24
+    matrix = user_hours.matrix()
+    if matrix.shape[1] < 2 * window:
+        window = matrix.shape[1] // 2
+    recent = matrix[:, -window:].sum(axis=1).astype(np.int64)
+    previous = matrix[:, -2 * window:-window].sum(axis=1).astype(np.int64)
+    drop = previous - recent
+    ids = user_hours.user_ids()
+    order = np.argsort(-drop, kind="stable")[:k]
+    return [(ids[row], int(previous[row]), int(recent[row])) for row in order if drop[row] > 0]
+
+
+def pick_delay(min_seconds: int, max_seconds: int, step: int = 300) -> int:
+    """
+    Elige un retraso entre `min_seconds` y `max_seconds` favoreciendo las horas en las
+    que el grupo suele estar más activo. Sin histórico, equivale a un retraso uniforme.
+    """
+    candidates = np.arange(min_seconds, max_seconds + 1, step)
+    profile = hourly_profile()
+    if not profile.any() or len(candidates) == 0:
+        return random.randint(min_seconds, max_seconds)
+
+    now = datetime.now()
+    target_hours = (now.hour + (now.minute * 60 + candidates) // HOUR) % 24
+    # Suavizado: ninguna hora queda del todo descartada
+    weights = profile[target_hours] + profile.mean() * 0.1 + 1e-9
+    return int(random.choices(candidates.tolist(), weights=weights.tolist())[0])
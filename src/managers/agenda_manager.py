@@ -1,5 +1,6 @@
 # src/managers/agenda_manager.py
 import json
+import logging
 import os
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -9,9 +10,12 @@ import uuid
 locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
 
 # Importamos la ruta del archivo desde nuestra configuración centralizada
+from src import tracing
 from src.config import settings
 from src.managers import user_manager
 
+logger = logging.getLogger(__name__)
+
 # El estado de la agenda (la variable) vive y se gestiona únicamente aquí
 agenda = defaultdict(list)
 
@@ -26,16 +30,16 @@ def cargar_agenda():
             data = json.load(f)
             for fecha, eventos in data.items():
                 agenda[fecha] = eventos
-            print(f"✅ Agenda cargada desde {settings.AGENDA_FILE}")
+            logger.info("✅ Agenda cargada desde %s", settings.AGENDA_FILE)
     except (FileNotFoundError, json.JSONDecodeError):
-        print(f"❌ No se encontró {settings.AGENDA_FILE} o está dañado. Se usará una agenda vacía.")
+        logger.warning("❌ No se encontró %s o está dañado. Se usará una agenda vacía.", settings.AGENDA_FILE)
         agenda = defaultdict(list)
 
 def guardar_agenda():
     """Guarda el estado actual de la agenda en el archivo JSON."""
-    with open(settings.AGENDA_FILE, "w", encoding="utf-8") as f:
+    with tracing.store_flush("agenda"), open(settings.AGENDA_FILE, "w", encoding="utf-8") as f:
         json.dump(agenda, f, indent=2, ensure_ascii=False)
-    print("💾 Agenda guardada.")
+    logger.debug("💾 Agenda guardada.")
 
 # --- API interna para manipular la agenda ---
 
@@ -60,9 +64,19 @@ def desactivar_evento(fecha: str, idx: int):
         return agenda[fecha][idx]
     return None
 
+def _evento(fecha: str, idx: int) -> dict | None:
+    """Evento en esa posición, o None si el botón que lo pedía se ha quedado viejo."""
+    eventos = agenda.get(fecha, [])
+    return eventos[idx] if 0 <= idx < len(eventos) else None
+
+# Nota: estas funciones no tienen ningún `await` entre leer y escribir, así que con
+# los updates en paralelo siguen siendo atómicas dentro del bucle de eventos.
+
 def inscribir_usuario(fecha: str, idx: int, user_info: dict):
     """Inscribe un usuario a un evento, evitando duplicados."""
-    evento = agenda[fecha][idx]
+    evento = _evento(fecha, idx)
+    if evento is None:
+        return False
     if not any(a.get("id") == user_info["id"] for a in evento["asistentes"]):
         evento["asistentes"].append(user_info)
         guardar_agenda()
@@ -76,7 +90,9 @@ def inscribir_usuario(fecha: str, idx: int, user_info: dict):
 
 def desinscribir_usuario(fecha: str, idx: int, user_id: int):
     """Da de baja a un usuario de un evento."""
-    evento = agenda[fecha][idx]
+    evento = _evento(fecha, idx)
+    if evento is None:
+        return False
     asistentes_antes = len(evento["asistentes"])
     evento["asistentes"] = [a for a in evento["asistentes"] if a.get("id") != user_id]
     if len(evento["asistentes"]) < asistentes_antes:
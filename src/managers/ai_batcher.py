@@ -0,0 +1,92 @@
+# src/managers/ai_batcher.py
+"""
+Micro-batcher para llamadas a la IA.
+
+Agrupa las peticiones que llegan en una ventana corta de tiempo (o hasta un
+máximo de elementos) y las resuelve con una sola llamada. Cada llamador
+espera su propio resultado como si hubiera hecho la llamada individual.
+Si la llamada por lotes falla, se reintenta elemento a elemento.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Acumula elementos durante `window_seconds` y los procesa en bloque."""
+
+    def __init__(
+        self,
+        process_batch: Callable[[list], Awaitable[list]],
+        process_single: Callable[[Any], Awaitable[Any]],
+        max_items: int = 10,
+        window_seconds: float = 1.0,
+        name: str = "lote",
+    ):
+        self.process_batch = process_batch
+        self.process_single = process_single
+        self.max_items = max(1, max_items)
+        self.window_seconds = window_seconds
+        self.name = name
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"items": 0, "batches": 0, "fallbacks": 0}
+
+    async def submit(self, item: Any) -> Any:
+        """Encola un elemento y espera a que su lote se resuelva."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.stats["items"] += 1
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Saca los elementos pendientes y lanza su procesamiento en segundo plano."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_items], self._pending[self.max_items:]
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        # Si quedaron elementos fuera del lote, les damos su propia ventana
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window_seconds, self._flush)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        self.stats["batches"] += 1
+        try:
+            if len(items) == 1:
+                results = [await self.process_single(items[0])]
+            else:
+                results = await self.process_batch(items)
+                if len(results) != len(items):
+                    raise ValueError(f"se esperaban {len(items)} resultados y llegaron {len(results)}")
+        except Exception as e:
+            logger.warning("⚠️ Falló el %s de %s elementos (%s). Reintentando uno a uno.", self.name, len(items), e)
+            self.stats["fallbacks"] += 1
+            results = await asyncio.gather(
+                *(self.process_single(item) for item in items), return_exceptions=True
+            )
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
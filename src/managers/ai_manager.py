@@ -1,9 +1,16 @@
 # src/managers/ai_manager.py
+import logging
+from src import metrics, tracing
 from src.config import settings
 from src.ai_tools import ALL_TOOLS, AVAILABLE_TOOLS
+from src.managers import presentation_classifier
+from src.managers.ai_batcher import MicroBatcher
 import google.generativeai as genai
 from datetime import datetime
-import traceback
+import json
+import re
+
+logger = logging.getLogger(__name__)
 
 # Creamos el modelo de Gemini con su configuración y personalidad
 model = genai.GenerativeModel(
@@ -81,7 +88,9 @@ async def process_user_prompt(prompt: str, user_id: int):
         contextual_prompt = f"El usuario con ID {user_id} pide lo siguiente: {prompt}"
         
         # Enviamos el primer mensaje
-        response = await chat.send_message_async(contextual_prompt)
+        round_trip = 1
+        with metrics.AI_SECONDS.time("mention"), tracing.span("ai.gemini", round=round_trip):
+            response = await chat.send_message_async(contextual_prompt)
 
         # Bucle de llamada a funciones
         while True:
@@ -102,25 +111,28 @@ async def process_user_prompt(prompt: str, user_id: int):
             
             if function_name in AVAILABLE_TOOLS:
                 function_to_call = AVAILABLE_TOOLS[function_name]
-                print(f"🤖 Ejecutando herramienta: {function_name}({function_args})")
+                logger.info("🤖 Ejecutando herramienta: %s(%s)", function_name, function_args)
                 
-                function_response_data = function_to_call(**function_args)
+                with tracing.span(f"tool {function_name}"):
+                    function_response_data = function_to_call(**function_args)
                 
                 # Enviamos el resultado de vuelta a Gemini para que continúe
-                response = await chat.send_message_async(
-                    {
-                        "function_response": {
-                            "name": function_name,
-                            "response": { "result": function_response_data }
+                round_trip += 1
+                with metrics.AI_SECONDS.time("mention"), tracing.span("ai.gemini", round=round_trip, tool=function_name):
+                    response = await chat.send_message_async(
+                        {
+                            "function_response": {
+                                "name": function_name,
+                                "response": { "result": function_response_data }
+                            }
                         }
-                    }
-                )
+                    )
             else:
                 return "Lo siento, majo, la IA ha intentado usar una herramienta que no conozco."
 
     except Exception as e:
-        print("🚨 ¡Leñe\ Error en el flujo de IA. El traceback completo es:")
-        traceback.print_exc()
+        metrics.AI_ERRORS.inc("mention")
+        logger.exception("🚨 ¡Leñe! Error en el flujo de IA")
         return f"¡Ay va\ Ha habido un problemilla técnico al procesar tu petición. Detalles: {e}"
 
 async def generate_text(prompt: str) -> str:
@@ -135,27 +147,16 @@ async def generate_text(prompt: str) -> str:
         # o el mismo modelo pero sin el system_instruction complejo si es posible.
         # Por simplicidad, aquí usamos el mismo modelo pero en un chat "vacío".
         chat = model.start_chat()
-        response = await chat.send_message_async(prompt)
+        with metrics.AI_SECONDS.time("generate_text"):
+            response = await chat.send_message_async(prompt)
         return response.text
     except Exception as e:
-        print(f"🚨 Error al generar texto simple: {e}")
-        traceback.print_exc()
+        metrics.AI_ERRORS.inc("generate_text")
+        logger.exception("🚨 Error al generar texto simple: %s", e)
         return "¡Ay va! No he podido generar el texto. Algo ha fallado."
 
-async def evaluate_presentation(text: str) -> bool:
-    """
-    Evalúa si un texto es una presentación personal coherente.
-    Devuelve True si lo es, False si no.
-    """
-    if not settings.GEMINI_API_KEY:
-        print("⚠️ Gemini API Key no configurada, permitiendo entrada por defecto.")
-        return True # Si no hay IA, mejor dejar pasar que echar a todos
-
-    # Fallback por longitud: Si escribe algo razonablemente largo, le damos el beneficio de la duda
-    if len(text.strip()) > 25:
-        print(f"✅ Validación por longitud ({len(text)} caracteres): {text[:20]}...")
-        return True
-
+async def _evaluate_presentation_single(text: str) -> bool:
+    """Pregunta a la IA por un único texto de presentación."""
     try:
         prompt = (
             f"Actúa como un moderador amable. Un nuevo usuario ha entrado en un grupo de amigos de La Rioja y debe presentarse. "
@@ -165,15 +166,85 @@ async def evaluate_presentation(text: str) -> bool:
             f"Responde ÚNICAMENTE con 'SÍ' o 'NO'."
         )
 
-        response = await model.generate_content_async(prompt)
+        with metrics.AI_SECONDS.time("presentation"):
+            response = await model.generate_content_async(prompt)
         result = response.text.strip().upper()
         
         # Somos flexibles: si la IA responde con una frase que contiene SI, lo aceptamos
         es_valido = "SÍ" in result or "SI" in result
-        print(f"🧐 Evaluación de presentación: '{text}' -> {result} (Válido: {es_valido})")
-        
+        logger.info("🧐 Evaluación de presentación: '%s' -> %s (Válido: %s)", text, result, es_valido)
         return es_valido
         
     except Exception as e:
-        print(f"🚨 Error al evaluar presentación: {e}. Permitiendo acceso por seguridad.")
-        return True # Ante la duda o error, no expulsamos
\ No newline at end of file
+        metrics.AI_ERRORS.inc("presentation")
+        logger.error("🚨 Error al evaluar presentación: %s. Permitiendo acceso por seguridad.", e)
+        return True # Ante la duda o error, no expulsamos
+
+async def _evaluate_presentations_batch(texts: list[str]) -> list[bool]:
+    """
+    Pregunta a la IA por varios textos en una sola llamada.
+    Si la respuesta no se puede interpretar, lanza una excepción para que el
+    batcher reintente uno a uno.
+    """
+    listado = "\n".join(f"{i}. {json.dumps(t, ensure_ascii=False)}" for i, t in enumerate(texts, start=1))
+    prompt = (
+        f"Actúa como un moderador amable. Varios usuarios nuevos han entrado en un grupo de amigos de La Rioja y deben presentarse. "
+        f"Estos son sus mensajes, numerados:\n{listado}\n\n"
+        f"Para cada mensaje, decide si parece un saludo, una presentación o un intento de interactuar con el grupo. "
+        f"Incluso un 'Hola a todos, soy nuevo' o 'Aúpa, ¿qué tal?' es suficiente.\n"
+        f"Responde ÚNICAMENTE con un array JSON de {len(texts)} elementos, en el mismo orden, con 'SÍ' o 'NO'. "
+        f'Por ejemplo: ["SÍ", "NO"]'
+    )
+
+    with metrics.AI_SECONDS.time("presentation_batch"):
+        response = await model.generate_content_async(prompt)
+    match = re.search(r"\[.*\]", response.text, re.DOTALL)
+    if not match:
+        raise ValueError(f"respuesta sin array JSON: {response.text[:80]!r}")
+
+    answers = json.loads(match.group(0))
+    if len(answers) != len(texts):
+        raise ValueError(f"se esperaban {len(texts)} respuestas y llegaron {len(answers)}")
+
+    results = []
+    for text, answer in zip(texts, answers):
+        answer = str(answer).strip().upper()
+        es_valido = "SÍ" in answer or "SI" in answer
+        logger.info("🧐 Evaluación de presentación (lote): '%s' -> %s (Válido: %s)", text, answer, es_valido)
+        results.append(es_valido)
+    return results
+
+# Las evaluaciones que llegan casi a la vez (p. ej., una oleada de altas) se agrupan en una sola llamada
+presentation_batcher = MicroBatcher(
+    process_batch=_evaluate_presentations_batch,
+    process_single=_evaluate_presentation_single,
+    max_items=settings.PRESENTATION_BATCH_MAX_ITEMS,
+    window_seconds=settings.PRESENTATION_BATCH_WINDOW_SECONDS,
+    name="lote de presentaciones",
+)
+
+async def evaluate_presentation(text: str) -> bool:
+    """
+    Evalúa si un texto es una presentación personal coherente.
+    Devuelve True si lo es, False si no.
+    """
+    if not settings.GEMINI_API_KEY:
+        logger.warning("⚠️ Gemini API Key no configurada, permitiendo entrada por defecto.")
+        return True # Si no hay IA, mejor dejar pasar que echar a todos
+
+    # Fallback por longitud: Si escribe algo razonablemente largo, le damos el beneficio de la duda
+    if len(text.strip()) > 25:
+        logger.info("✅ Validación por longitud (%s caracteres): %s...", len(text), text[:20])
+        return True
+
+    # Clasificador local: los casos claros se deciden sin llamar a la IA
+    decision, local_proba = presentation_classifier.classify(text)
+    presentation_classifier.record_local_decision(decision)
+    if decision is not None:
+        es_valido = decision == presentation_classifier.ACCEPT
+        logger.info("⚡ Evaluación local de presentación: '%s' -> %s (p=%.2f)", text, decision, local_proba)
+        return es_valido
+
+    es_valido = await presentation_batcher.submit(text)
+    presentation_classifier.record_llm_outcome(local_proba, es_valido)
+    return es_valido
@@ -0,0 +1,77 @@
+# src/managers/catchup_manager.py
+"""
+Recuperación de los mensajes recibidos mientras el bot estaba apagado.
+
+Antes se arrancaba con `drop_pending_updates=True` y todo lo escrito durante
+la caída se perdía (y con ello XP, actividad y, a la larga, vidas). Ahora, al
+arrancar y antes de empezar el polling normal, se descarga la cola pendiente
+en páginas grandes de `getUpdates` y solo se acumula por usuario: mensajes,
+fechas y XP. Al final se aplica todo de golpe con un único guardado y sin
+anuncios de subida de nivel.
+
+El resto de tipos de update pendientes (comandos, botones, altas...) se
+descartan, igual que hacía `drop_pending_updates`.
+"""
+import logging
+from telegram import Bot, Update
+
+from src.config import settings
+from src.managers import activity_manager, user_manager
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100  # Máximo que admite getUpdates
+
+
+def _accumulate(batch: dict, update: Update) -> bool:
+    """Suma un update al lote si es un mensaje de texto de una persona. Devuelve True si se ha usado."""
+    message = update.message
+    if message is None or message.text is None:
+        return False
+    user = message.from_user
+    if user is None or user.is_bot:
+        return False
+
+    timestamp = message.date.timestamp()
+    entry = batch.setdefault(str(user.id), {"user": user, "timestamps": []})
+    entry["timestamps"].append(timestamp)
+    if message.chat.type in ("group", "supergroup"):
+        activity_manager.record_message(user.id, timestamp)
+    return True
+
+
+async def catch_up(bot: Bot, max_updates: int | None = None) -> dict:
+    """
+    Descarga y procesa en bloque los updates pendientes. Después de llamarla, la cola
+    de Telegram queda confirmada y el polling puede arrancar sin descartar nada.
+    """
+    max_updates = settings.CATCHUP_MAX_UPDATES if max_updates is None else max_updates
+    batch: dict[str, dict] = {}
+    offset = None
+    pending: list[Update] = []
+    fetched = used = 0
+
+    try:
+        while True:
+            # Pedir con `offset` confirma a Telegram todo lo anterior: solo entonces
+            # contamos la página previa, para no duplicarla si algo falla a medias
+            updates = await bot.get_updates(offset=offset, limit=PAGE_SIZE, timeout=0)
+            used += sum(_accumulate(batch, update) for update in pending)
+            pending = []
+            if not updates or fetched >= max_updates:
+                break
+            fetched += len(updates)
+            pending = updates
+            offset = updates[-1].update_id + 1
+    except Exception as e:
+        # Lo que no se haya confirmado llegará por el polling normal
+        logger.error("🚨 Error recuperando mensajes pendientes: %s", e)
+
+    summary = user_manager.apply_activity_batch(batch)
+    summary.update({"updates": fetched, "used": used})
+    logger.info(
+        "📥 Recuperación al arrancar: %s updates pendientes, %s mensajes de %s usuarios, "
+        "%s XP repartida, %s subidas de nivel.",
+        fetched, used, summary['users'], summary['xp'], summary['level_ups'],
+    )
+    return summary
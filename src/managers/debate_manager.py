@@ -1,13 +1,19 @@
 # src/managers/debate_manager.py
 import json
+import logging
 import os
 import random
+import re
 from datetime import datetime
 from telegram import Bot
 from telegram.ext import ContextTypes
-from src.config import settings
+from src import metrics, tracing
+from src.config import settings, content
 from src.managers.ai_manager import generate_text
-from src.managers import user_manager
+from src.managers import user_manager, outbound_dispatcher, activity_manager
+from src.managers.topic_similarity import TopicIndex, normalize
+
+logger = logging.getLogger(__name__)
 
 DEBATE_PROMPT = """
 Eres un dinamizador de comunidades para un grupo de amigos y ocio en Telegram.
@@ -25,21 +31,28 @@ Ejemplos de inspiración:
 Devuelve *únicamente* la pregunta generada, sin saludos ni texto introductorio.
 """
 
-BACKUP_TOPICS = [
-    "¿La tortilla de patata: con o sin cebolla?",
-    "¿Pizza con piña: sí o no?",
-    "¿Eres más de perros o de gatos?",
-    "¿Playa o montaña?",
-    "¿Qué superpoder elegirías: volar o ser invisible?",
-    "¿Nesquik o Cola Cao?",
-    "¿Madrugar o trasnochar?",
-    "¿Cine en casa o ir al cine?",
-    "¿Invierno o verano?",
-    "¿Dulce o salado?"
-]
+DEBATE_POOL_PROMPT = """
+Eres un dinamizador de comunidades para un grupo de amigos y ocio en Telegram.
+Tu objetivo es generar conversación de forma divertida.
+
+Genera {count} preguntas de debate cortas, entretenidas y ligeramente polémicas (pero nunca ofensivas),
+distintas entre sí. Deben ser sobre temas cotidianos, cultura pop o dilemas absurdos.
+
+Devuelve *únicamente* las preguntas, una por línea, sin numerar, sin saludos ni texto introductorio.
+"""
+
 
 debate_data = {}
 
+# Reserva de temas pregenerados y temas ya usados (para no repetir)
+topic_pool = {"pool": [], "history": []}
+_topic_index = TopicIndex()
+
+# Máximo de temas usados que recordamos
+TOPIC_HISTORY_LIMIT = 365
+# Temas que pedimos a la IA en cada tanda de relleno
+TOPICS_PER_REFILL_CALL = 5
+
 def load_debate_data():
     """Carga los datos del debate desde el archivo JSON."""
     global debate_data
@@ -47,44 +60,161 @@ def load_debate_data():
         os.makedirs(os.path.dirname(settings.DEBATE_FILE), exist_ok=True)
         with open(settings.DEBATE_FILE, "r", encoding="utf-8") as f:
             debate_data = json.load(f)
-        print(f"✅ Datos del debate cargados desde {settings.DEBATE_FILE}")
+        logger.info("✅ Datos del debate cargados desde %s", settings.DEBATE_FILE)
     except (FileNotFoundError, json.JSONDecodeError):
-        print(f"❌ No se encontró {settings.DEBATE_FILE} o está dañado. Se usarán datos vacíos.")
+        logger.warning("❌ No se encontró %s o está dañado. Se usarán datos vacíos.", settings.DEBATE_FILE)
         debate_data = {}
 
 def save_debate_data():
     """Guarda el estado actual de los datos del debate en el archivo JSON."""
-    with open(settings.DEBATE_FILE, "w", encoding="utf-8") as f:
+    with tracing.store_flush("debate"), open(settings.DEBATE_FILE, "w", encoding="utf-8") as f:
         json.dump(debate_data, f, indent=2, ensure_ascii=False)
-    print("💾 Datos del debate guardados.")
+    logger.debug("💾 Datos del debate guardados.")
 
-def load_incitement_templates():
-    """Carga las plantillas de mensajes de incitación desde el archivo JSON."""
+def load_topic_pool():
+    """Carga la reserva de temas y el histórico, y reconstruye el índice de similitud."""
+    global topic_pool, _topic_index
     try:
-        with open(settings.DEBATE_TEMPLATES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"⚠️ Error cargando plantillas de debate desde {settings.DEBATE_TEMPLATES_FILE}: {e}")
-        # Fallback por si falla la carga del archivo
-        return [
-            "¡Hola {mentions}! ¿Qué opináis de esto: *{topic}*?",
-            "¡Aúpa {mentions}! Queremos saber vuestra opinión sobre: *{topic}*",
-            "¿Qué nos decís {mentions}? El tema está calentito: *{topic}*"
-        ]
+        with open(settings.DEBATE_POOL_FILE, "r", encoding="utf-8") as f:
+            topic_pool = json.load(f)
+        topic_pool.setdefault("pool", [])
+        topic_pool.setdefault("history", [])
+        logger.info("✅ Reserva de temas cargada: %s disponibles.", len(topic_pool['pool']))
+    except (FileNotFoundError, json.JSONDecodeError):
+        logger.info("ℹ️ No se encontró %s. La reserva de temas empieza vacía.", settings.DEBATE_POOL_FILE)
+        topic_pool = {"pool": [], "history": []}
+
+    # El tema del día también cuenta como usado
+    current_topic = debate_data.get("current_topic")
+    if current_topic and current_topic not in topic_pool["history"]:
+        topic_pool["history"].append(current_topic)
+
+    _topic_index = TopicIndex()
+    for topic in topic_pool["history"] + topic_pool["pool"]:
+        _topic_index.add(topic)
+
+def save_topic_pool():
+    """Guarda la reserva de temas y el histórico en el archivo JSON."""
+    os.makedirs(os.path.dirname(settings.DEBATE_POOL_FILE), exist_ok=True)
+    with tracing.store_flush("debate_pool"), open(settings.DEBATE_POOL_FILE, "w", encoding="utf-8") as f:
+        json.dump(topic_pool, f, indent=2, ensure_ascii=False)
+    logger.debug("💾 Reserva de temas guardada.")
+
+def clean_topic(topic: str) -> str:
+    """Quita viñetas, numeración y asteriscos que a veces añade la IA."""
+    return re.sub(r"^\s*(?:[-•]|\d+[.)])\s*", "", topic).replace('*', '').strip()
+
+def add_topic_to_pool(topic: str) -> bool:
+    """Añade un tema a la reserva si no se parece a ninguno ya usado o reservado."""
+    topic = clean_topic(topic)
+    if len(topic) < 5:
+        return False
+    similar, score = _topic_index.find_similar(topic)
+    if similar is not None:
+        logger.debug("♻️ Tema descartado por parecido (%.0f%%) a '%s': %s", score * 100, similar, topic)
+        return False
+    topic_pool["pool"].append(topic)
+    _topic_index.add(topic)
+    return True
+
+def _mark_topic_used(topic: str):
+    """Apunta un tema en el histórico para no volver a proponerlo."""
+    history = topic_pool["history"]
+    history.append(topic)
+    _topic_index.add(topic)
+    trimmed = history[:-TOPIC_HISTORY_LIMIT]
+    if trimmed:
+        del history[:-TOPIC_HISTORY_LIMIT]
+        # Lo que sale del histórico deja de estar bloqueado (salvo que siga en la reserva o repetido)
+        still_used = {normalize(t) for t in history + topic_pool["pool"]}
+        for old_topic in trimmed:
+            if normalize(old_topic) not in still_used:
+                _topic_index.remove(old_topic)
+    save_topic_pool()
+
+async def refill_topic_pool(target_size: int | None = None, max_calls: int = 3) -> int:
+    """
+    Pide temas nuevos a la IA hasta llenar la reserva.
+    Devuelve cuántos temas se han añadido.
+    """
+    target_size = target_size or settings.DEBATE_POOL_TARGET_SIZE
+    added = 0
+    for _ in range(max_calls):
+        missing = target_size - len(topic_pool["pool"])
+        if missing <= 0:
+            break
+        response = await generate_text(DEBATE_POOL_PROMPT.format(count=min(missing, TOPICS_PER_REFILL_CALL)))
+        if not response or "¡Ay va!" in response:
+            logger.warning("⚠️ La IA no ha podido generar temas para la reserva.")
+            break
+        for line in response.splitlines():
+            if add_topic_to_pool(line):
+                added += 1
+    if added:
+        save_topic_pool()
+    logger.info("🧺 Reserva de temas rellenada: +%s (total %s).", added, len(topic_pool['pool']))
+    return added
+
+def is_idle_hour(hour: int) -> bool:
+    """Indica si una hora cae dentro de la franja tranquila configurada (p. ej., 2-7)."""
+    start, end = settings.DEBATE_POOL_IDLE_HOURS
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+async def refill_topic_pool_job(context: ContextTypes.DEFAULT_TYPE):
+    """Job periódico: rellena la reserva solo en horas tranquilas y si hace falta."""
+    if not is_idle_hour(datetime.now().hour):
+        return
+    if len(topic_pool["pool"]) >= settings.DEBATE_POOL_TARGET_SIZE:
+        return
+    await refill_topic_pool()
+
+async def take_debate_topic() -> str:
+    """
+    Devuelve el tema para el debate de hoy.
+    Primero la reserva; si está vacía, generación en vivo y, en último caso, los temas de respaldo.
+    """
+    while topic_pool["pool"]:
+        topic = topic_pool["pool"].pop(0)
+        if topic not in topic_pool["history"]:
+            metrics.CACHE_REQUESTS.inc("debate_topics", "hit")
+            logger.info("🧺 Tema sacado de la reserva (%s restantes): %s", len(topic_pool['pool']), topic)
+            _mark_topic_used(topic)
+            return topic
+
+    metrics.CACHE_REQUESTS.inc("debate_topics", "miss")
+    logger.info("🧺 La reserva de temas está vacía. Generando en vivo...")
+    topic = await generate_debate_topic()
+    backup_topics = get_backup_topics()
+    if topic in backup_topics or _topic_index.is_near_duplicate(topic):
+        unused = [t for t in backup_topics if not _topic_index.is_near_duplicate(t)]
+        if unused:
+            topic = random.choice(unused)
+    _mark_topic_used(topic)
+    return topic
+
+def load_incitement_templates():
+    """Devuelve las plantillas (ya precompiladas) de mensajes de incitación."""
+    return content.get("incitement_templates")
+
+def get_backup_topics() -> list[str]:
+    """Devuelve los temas de respaldo para cuando la IA no responde."""
+    return content.get("debate_backup_topics")
 
 async def generate_debate_topic() -> str:
     """Genera una nueva pregunta de debate usando el AIManager, con fallback."""
-    print("🧠 Generando nuevo tema de debate...")
+    logger.info("🧠 Generando nuevo tema de debate...")
     topic = await generate_text(DEBATE_PROMPT)
     
     # Comprobar errores conocidos o respuestas vacías del manager de IA
     if not topic or "¡Ay va!" in topic or "Error" in topic or len(topic) < 5:
-        print(f"⚠️ Fallo en la IA o respuesta inválida ('{topic}'). Usando tema de respaldo.")
-        topic = random.choice(BACKUP_TOPICS)
+        logger.warning("⚠️ Fallo en la IA o respuesta inválida ('%s'). Usando tema de respaldo.", topic)
+        topic = random.choice(get_backup_topics())
     
     # Limpiamos el topic por si la IA devuelve saltos de línea o asteriscos de markdown
     topic = topic.strip().replace('*', '')
-    print(f"✨ Tema de debate generado: {topic}")
+    logger.info("✨ Tema de debate generado: %s", topic)
     return topic
 
 def get_last_debate_message_id() -> int | None:
@@ -109,9 +239,9 @@ async def send_and_pin_debate(bot: Bot, chat_id: int):
     """
     Orquesta la generación, envío y anclaje de un nuevo debate.
     """
-    print("🚀 Iniciando ciclo de envío de debate...")
+    logger.info("🚀 Iniciando ciclo de envío de debate...")
     try:
-        topic = await generate_debate_topic()
+        topic = await take_debate_topic()
         message = await bot.send_message(
             chat_id=chat_id,
             text=f"🤔 DEBATE DEL DÍA 🤔\n\n{topic}"
@@ -121,15 +251,15 @@ async def send_and_pin_debate(bot: Bot, chat_id: int):
             message_id=message.message_id
         )
         set_last_debate_info(message.message_id, topic)
-        print(f"✅ Debate enviado y anclado. ID: {message.message_id}")
+        logger.info("✅ Debate enviado y anclado. ID: %s", message.message_id)
         return f"¡Nuevo debate iniciado!\n\n{topic}"
     except Exception as e:
-        print(f"🚨 Error al enviar y anclar el debate: {e}")
+        logger.error("🚨 Error al enviar y anclar el debate: %s", e)
         return "❌ Uups! Hubo un error al intentar iniciar el debate."
 
 async def unpin_previous_debate(bot: Bot, chat_id: int):
     """Desancla el debate del día anterior."""
-    print("🧹 Limpiando debate anterior...")
+    logger.info("🧹 Limpiando debate anterior...")
     last_message_id = get_last_debate_message_id()
     if last_message_id:
         try:
@@ -138,11 +268,11 @@ async def unpin_previous_debate(bot: Bot, chat_id: int):
                 message_id=last_message_id
             )
             set_last_debate_info(None) # Limpiamos ID
-            print(f"✅ Debate desanclado. ID: {last_message_id}")
+            logger.info("✅ Debate desanclado. ID: %s", last_message_id)
         except Exception as e:
-            print(f"ℹ️ No se pudo desanclar el debate. Quizás fue borrado. ID: {last_message_id}. Error: {e}")
+            logger.info("ℹ️ No se pudo desanclar el debate. Quizás fue borrado. ID: %s. Error: %s", last_message_id, e)
     else:
-        print("ℹ️ No había debate anterior para desanclar.")
+        logger.info("ℹ️ No había debate anterior para desanclar.")
 
 async def check_and_run_startup_debate(bot: Bot, chat_id: int):
     """
@@ -152,26 +282,27 @@ async def check_and_run_startup_debate(bot: Bot, chat_id: int):
     today_str = datetime.now().strftime("%Y-%m-%d")
     last_date = debate_data.get("last_debate_date")
     
-    print(f"🔎 Comprobando debate de arranque. Hoy: {today_str}, Último: {last_date}")
+    logger.info("🔎 Comprobando debate de arranque. Hoy: %s, Último: %s", today_str, last_date)
     
     if last_date != today_str:
-        print("⚠️ No hay debate registrado para hoy. Generando uno ahora...")
+        logger.warning("⚠️ No hay debate registrado para hoy. Generando uno ahora...")
         # Desanclar el anterior por si acaso quedó colgado
         await unpin_previous_debate(bot, chat_id)
         # Generar uno nuevo
         await send_and_pin_debate(bot, chat_id)
     else:
-        print("✅ Ya existe un debate generado para hoy. No se requiere acción.")
+        logger.info("✅ Ya existe un debate generado para hoy. No se requiere acción.")
 
 # --- Funciones de Incitación a la Participación ---
 
 def schedule_next_incitement(job_queue):
     """Programa la siguiente incitación al debate en un intervalo aleatorio (1-3h)."""
-    # 1 a 3 horas en segundos = 3600 a 10800
-    delay = random.randint(3600, 10800)
-    print(f"🎲 Próxima incitación al debate programada en {delay/60:.1f} minutos.")
+    # 1 a 3 horas en segundos = 3600 a 10800, tirando hacia las horas con más gente
+    delay = activity_manager.pick_delay(3600, 10800)
+    logger.info("🎲 Próxima incitación al debate programada en %.1f minutos.", delay/60)
     job_queue.run_once(incite_participation_job, delay)
 
+@outbound_dispatcher.background_job
 async def incite_participation_job(context: ContextTypes.DEFAULT_TYPE):
     """Job que se ejecuta para incitar a la participación."""
     chat_id = settings.GROUP_CHAT_ID
@@ -182,14 +313,14 @@ async def incite_participation_job(context: ContextTypes.DEFAULT_TYPE):
     topic = debate_data.get("current_topic")
     
     if last_date != today_str or not topic:
-        print("ℹ️ No se incita al debate porque no hay uno activo (o falta el tema) para hoy.")
+        logger.info("ℹ️ No se incita al debate porque no hay uno activo (o falta el tema) para hoy.")
         schedule_next_incitement(context.job_queue)
         return
 
     # 2. Seleccionar usuarios aleatorios (3)
     users = user_manager.get_random_verified_users(3)
     if not users:
-        print("ℹ️ No hay usuarios verificados suficientes para mencionar.")
+        logger.info("ℹ️ No hay usuarios verificados suficientes para mencionar.")
         schedule_next_incitement(context.job_queue)
         return
 
@@ -201,18 +332,19 @@ async def incite_participation_job(context: ContextTypes.DEFAULT_TYPE):
     
     mentions_str = ", ".join(mentions)
     
-    # Cargamos las plantillas desde el archivo JSON
+    # Plantillas precompiladas desde el registro de contenido (en memoria)
     mensajes_incitacion = load_incitement_templates()
     
     # Elegimos una plantilla y rellenamos los huecos
     template = random.choice(mensajes_incitacion)
-    text = template.format(mentions=mentions_str, topic=topic)
+    text = template.render(mentions=mentions_str, topic=topic)
 
     try:
         await context.bot.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
-        print("📢 Incitación al debate enviada.")
+        logger.info("📢 Incitación al debate enviada.")
+        user_manager.mark_mentioned([u["id"] for u in users])
     except Exception as e:
-        print(f"🚨 Error enviando incitación: {e}")
+        logger.error("🚨 Error enviando incitación: %s", e)
 
     # 4. Programar la siguiente
     schedule_next_incitement(context.job_queue)
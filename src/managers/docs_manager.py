@@ -0,0 +1,208 @@
+# src/managers/docs_manager.py
+"""
+Índice de búsqueda sobre la documentación de `docs/`.
+
+Los archivos markdown se trocean por encabezados y cada sección se puntúa con
+BM25, de modo que la IA recibe solo los fragmentos relevantes en lugar del
+archivo completo. El índice vive en memoria y se reconstruye si cambia el
+`mtime` de algún archivo.
+"""
+import logging
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from time import monotonic
+
+from src import metrics
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Parámetros de BM25 ---
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Cada cuántos segundos, como mucho, comprobamos el mtime de los archivos
+MTIME_CHECK_INTERVAL_SECONDS = 30
+
+# Palabras vacías en español que no aportan nada al ranking
+STOPWORDS = {
+    "a", "al", "algo", "como", "con", "cual", "cuales", "de", "del", "el", "en",
+    "es", "esa", "ese", "eso", "esta", "este", "esto", "hay", "la", "las", "le",
+    "les", "lo", "los", "me", "mi", "mas", "muy", "no", "o", "os", "para", "pero",
+    "por", "que", "se", "si", "sin", "sobre", "su", "sus", "te", "tu", "un", "una",
+    "uno", "unos", "unas", "y", "ya", "yo",
+}
+
+# Encabezados markdown (`## Título`) o líneas completas en negrita (`*1\. Título*`)
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+BOLD_HEADING_RE = re.compile(r"^\*(?!\s)([^*]+)\*\s*\S{0,3}\s*$")
+TOKEN_RE = re.compile(r"[a-z0-9ñ]+")
+
+# Estado del índice (se sustituye entero en cada reconstrucción)
+_index = {
+    "sections": [],      # [{"file", "title", "content", "length", "tf"}]
+    "doc_freq": {},      # término -> nº de secciones que lo contienen
+    "avg_length": 0.0,
+    "files": {},         # nombre de archivo -> texto completo
+    "mtimes": {},        # nombre de archivo -> mtime
+}
+_last_mtime_check = 0.0
+
+
+def _strip_accents(text: str) -> str:
+    """Quita tildes conservando la ñ para que 'está' y 'esta' coincidan."""
+    text = text.replace("ñ", "\0")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.replace("\0", "ñ")
+
+
+def tokenize(text: str) -> list[str]:
+    """Normaliza un texto y lo divide en términos útiles para la búsqueda."""
+    text = _strip_accents(text.lower())
+    return [t for t in TOKEN_RE.findall(text) if t not in STOPWORDS and len(t) > 1]
+
+
+def split_sections(filename: str, text: str) -> list[dict]:
+    """Divide un markdown en secciones, una por encabezado."""
+    sections = []
+    title = os.path.splitext(filename)[0]
+    lines = []
+
+    def flush():
+        content = "\n".join(lines).strip()
+        if content:
+            sections.append({"file": filename, "title": title, "content": content})
+
+    in_code_block = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code_block = not in_code_block
+        match = None
+        if not in_code_block:
+            match = HEADING_RE.match(line) or BOLD_HEADING_RE.match(line.strip())
+        if match:
+            flush()
+            title = match.group(match.lastindex).replace("\\", "").strip()
+            lines = [line]
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+def _current_mtimes() -> dict:
+    mtimes = {}
+    for filename in settings.DOCS_FILES:
+        path = os.path.join(settings.DOCS_DIR, filename)
+        try:
+            mtimes[filename] = os.stat(path).st_mtime
+        except OSError:
+            continue
+    return mtimes
+
+
+def build_index():
+    """Lee todos los archivos de documentación y construye el índice BM25."""
+    global _index, _last_mtime_check
+    mtimes = _current_mtimes()
+    files = {}
+    sections = []
+
+    for filename in mtimes:
+        path = os.path.join(settings.DOCS_DIR, filename)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                files[filename] = f.read()
+        except OSError as e:
+            logger.warning("⚠️ No se pudo leer %s: %s", path, e)
+            continue
+        sections.extend(split_sections(filename, files[filename]))
+
+    doc_freq = Counter()
+    for section in sections:
+        terms = tokenize(section["title"] + "\n" + section["content"])
+        section["tf"] = Counter(terms)
+        section["length"] = len(terms)
+        doc_freq.update(section["tf"].keys())
+
+    avg_length = sum(s["length"] for s in sections) / len(sections) if sections else 0.0
+
+    # Sustitución atómica: las búsquedas en curso siguen viendo el índice anterior
+    _index = {
+        "sections": sections,
+        "doc_freq": dict(doc_freq),
+        "avg_length": avg_length,
+        "files": files,
+        "mtimes": mtimes,
+    }
+    _last_mtime_check = monotonic()
+    logger.info("📚 Índice de documentación construido: %s secciones de %s archivos.", len(sections), len(files))
+
+
+def ensure_fresh():
+    """Reconstruye el índice si algún archivo ha cambiado desde la última vez."""
+    global _last_mtime_check
+    if not _index["mtimes"] and not _index["sections"]:
+        metrics.CACHE_REQUESTS.inc("docs_index", "miss")
+        build_index()
+        return
+
+    now = monotonic()
+    if now - _last_mtime_check < MTIME_CHECK_INTERVAL_SECONDS:
+        metrics.CACHE_REQUESTS.inc("docs_index", "hit")
+        return
+    _last_mtime_check = now
+
+    if _current_mtimes() != _index["mtimes"]:
+        metrics.CACHE_REQUESTS.inc("docs_index", "miss")
+        logger.info("🔄 La documentación ha cambiado. Reconstruyendo índice...")
+        build_index()
+    else:
+        metrics.CACHE_REQUESTS.inc("docs_index", "hit")
+
+
+def search(query: str, top_k: int = 3) -> list[dict]:
+    """Devuelve las `top_k` secciones más relevantes para la consulta."""
+    ensure_fresh()
+    index = _index
+    query_terms = set(tokenize(query))
+    if not query_terms or not index["sections"]:
+        return []
+
+    total = len(index["sections"])
+    avg_length = index["avg_length"] or 1.0
+    scored = []
+
+    for section in index["sections"]:
+        score = 0.0
+        for term in query_terms:
+            freq = section["tf"].get(term)
+            if not freq:
+                continue
+            df = index["doc_freq"][term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * section["length"] / avg_length)
+            score += idf * freq * (BM25_K1 + 1) / (freq + norm)
+        if score > 0:
+            scored.append((score, section))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [
+        {
+            "archivo": section["file"],
+            "seccion": section["title"],
+            "contenido": section["content"],
+            "puntuacion": round(score, 3),
+        }
+        for score, section in scored[:top_k]
+    ]
+
+
+def get_file_content(filename: str) -> str | None:
+    """Devuelve el contenido completo de un archivo indexado (desde memoria)."""
+    ensure_fresh()
+    return _index["files"].get(filename)
@@ -1,7 +1,11 @@
 # src/managers/group_manager.py
-from telegram import Update
+import logging
+from telegram import Bot, Update
+from telegram.constants import ChatMemberStatus
 from telegram.ext import ContextTypes
 
+logger = logging.getLogger(__name__)
+
 def get_group_id(update: Update) -> int | None:
     """
     Obtiene el ID del grupo desde donde se envía el mensaje.
@@ -10,3 +14,15 @@ def get_group_id(update: Update) -> int | None:
     if chat and chat.type in ['group', 'supergroup']:
         return chat.id
     return None
+
+async def is_group_admin(bot: Bot, chat_id: int, user_id: int) -> bool:
+    """
+    Comprueba si un usuario es administrador (o creador) de un grupo.
+    Si no se puede consultar, se asume que no lo es.
+    """
+    try:
+        chat_member = await bot.get_chat_member(chat_id, user_id)
+    except Exception as e:
+        logger.warning("Error al verificar el estado del miembro del chat: %s", e)
+        return False
+    return chat_member.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
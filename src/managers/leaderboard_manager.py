@@ -0,0 +1,310 @@
+# src/managers/leaderboard_manager.py
+"""
+Clasificaciones de XP y puntos sin ordenar la base de datos en cada consulta.
+
+Cada clasificación es una skip list indexable: insertar, borrar, consultar la
+posición de un usuario o sacar el top-K cuestan O(log n). Se actualizan de
+forma incremental desde `user_manager` cada vez que alguien gana XP o puntos.
+
+Para las ventanas semanal y mensual se guardan contadores por día
+(`buckets`). Cuando un día sale de la ventana, solo se restan los usuarios
+que tuvieron actividad ese día; nunca se recalcula todo.
+"""
+import json
+import logging
+import random
+from datetime import date
+
+from src import tracing
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("xp", "points")
+# Nombre de la ventana -> días que abarca (None = histórico)
+WINDOWS = {"total": None, "semana": 7, "mes": 30}
+MAX_WINDOW_DAYS = max(days for days in WINDOWS.values() if days)
+
+_MAX_LEVEL = 24
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """Lista ordenada con inserción, borrado, posición y acceso por índice en O(log n)."""
+
+    def __init__(self, seed: int | None = None):
+        self._rng = random.Random(seed)
+        self.head = _Node(None, _MAX_LEVEL)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < _MAX_LEVEL and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        update = [None] * _MAX_LEVEL
+        steps_at = [0] * _MAX_LEVEL
+        node, pos = self.head, 0
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                pos += node.width[i]
+                node = node.next[i]
+            update[i], steps_at[i] = node, pos
+
+        level = self._random_level()
+        new = _Node(key, level)
+        for i in range(_MAX_LEVEL):
+            prev = update[i]
+            if i < level:
+                new.next[i] = prev.next[i]
+                prev.next[i] = new
+                new.width[i] = prev.width[i] - (pos - steps_at[i])
+                prev.width[i] = pos - steps_at[i] + 1
+            else:
+                prev.width[i] += 1
+        self.size += 1
+
+    def remove(self, key):
+        update = [None] * _MAX_LEVEL
+        node = self.head
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            update[i] = node
+
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for i in range(_MAX_LEVEL):
+            prev = update[i]
+            if prev.next[i] is target:
+                prev.width[i] += target.width[i] - 1
+                prev.next[i] = target.next[i]
+            else:
+                prev.width[i] -= 1
+        self.size -= 1
+
+    def index(self, key) -> int:
+        """Posición (desde 0) de una clave presente en la lista."""
+        node, pos = self.head, 0
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                pos += node.width[i]
+                node = node.next[i]
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        return pos
+
+    def iter_from(self, index: int, count: int):
+        """Devuelve hasta `count` claves a partir de la posición `index`."""
+        if index >= self.size or count <= 0:
+            return []
+        node, pos = self.head, 0
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and pos + node.width[i] <= index + 1:
+                pos += node.width[i]
+                node = node.next[i]
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """Clasificación de usuarios por puntuación (mayor primero; empate por id)."""
+
+    def __init__(self):
+        self.scores: dict[str, int] = {}
+        self._order = IndexableSkipList()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def set_score(self, user_id: str, score: int):
+        old = self.scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            self._order.remove((-old, user_id))
+        if score:
+            self.scores[user_id] = score
+            self._order.insert((-score, user_id))
+        else:
+            self.scores.pop(user_id, None)
+
+    def add(self, user_id: str, delta: int):
+        self.set_score(user_id, self.scores.get(user_id, 0) + delta)
+
+    def remove(self, user_id: str):
+        self.set_score(user_id, 0)
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        return [(uid, -neg) for neg, uid in self._order.iter_from(0, k)]
+
+    def rank(self, user_id: str) -> tuple[int, int] | None:
+        """(posición desde 1, puntuación) del usuario, o None si no puntúa."""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self._order.index((-score, user_id)) + 1, score
+
+
+# --- Estado del módulo ---
+
+boards: dict[tuple[str, str], Leaderboard] = {}
+# métrica -> {"YYYY-MM-DD": {user_id: cantidad}}
+buckets: dict[str, dict[str, dict[str, int]]] = {}
+_current_day: date | None = None
+_dirty = False
+
+
+def _today() -> date:
+    return date.today()
+
+
+def _reset():
+    global _current_day
+    boards.clear()
+    buckets.clear()
+    for metric in METRICS:
+        buckets[metric] = {}
+        for window in WINDOWS:
+            boards[(metric, window)] = Leaderboard()
+    _current_day = _today()
+
+
+def _in_window(day: date, today: date, days: int) -> bool:
+    return (today - day).days < days
+
+
+def load(users_db: dict):
+    """Construye las clasificaciones: el histórico desde users_db y las ventanas desde disco."""
+    global _dirty
+    _reset()
+    for user_id, data in users_db.items():
+        for metric in METRICS:
+            boards[(metric, "total")].set_score(user_id, data.get(metric, 0))
+
+    try:
+        with open(settings.LEADERBOARD_FILE, "r", encoding="utf-8") as f:
+            stored = json.load(f).get("buckets", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        stored = {}
+
+    today = _current_day
+    for metric in METRICS:
+        for day_str, counts in stored.get(metric, {}).items():
+            day = date.fromisoformat(day_str)
+            if not _in_window(day, today, MAX_WINDOW_DAYS):
+                continue
+            buckets[metric][day_str] = dict(counts)
+            for window, days in WINDOWS.items():
+                if days and _in_window(day, today, days):
+                    board = boards[(metric, window)]
+                    for user_id, amount in counts.items():
+                        board.add(user_id, amount)
+    _dirty = False
+    logger.info("🏆 Clasificaciones cargadas (%s usuarios con XP).", len(boards[('xp', 'total')]))
+
+
+def save():
+    """Guarda los contadores diarios (solo si han cambiado)."""
+    global _dirty
+    if not _dirty:
+        return
+    with tracing.store_flush("leaderboard"), open(settings.LEADERBOARD_FILE, "w", encoding="utf-8") as f:
+        json.dump({"buckets": buckets}, f, indent=2, ensure_ascii=False)
+    _dirty = False
+
+
+async def save_job(context):
+    """Job periódico que persiste los contadores de las ventanas."""
+    save()
+
+
+def _roll_days():
+    """Si ha cambiado el día, resta de cada ventana los días que han quedado fuera."""
+    global _current_day, _dirty
+    today = _today()
+    if today == _current_day:
+        return
+    previous, _current_day = _current_day, today
+    for metric in METRICS:
+        for day_str in list(buckets[metric]):
+            day = date.fromisoformat(day_str)
+            counts = buckets[metric][day_str]
+            for window, days in WINDOWS.items():
+                # Estaba dentro de la ventana ayer y ya no lo está hoy
+                if days and _in_window(day, previous, days) and not _in_window(day, today, days):
+                    board = boards[(metric, window)]
+                    for user_id, amount in counts.items():
+                        board.add(user_id, -amount)
+            if not _in_window(day, today, MAX_WINDOW_DAYS):
+                del buckets[metric][day_str]
+                _dirty = True
+
+
+def record(metric: str, user_id: int | str, amount: int, total: int | None = None):
+    """
+    Suma `amount` a la métrica del usuario en todas las clasificaciones.
+    Si se conoce el `total` acumulado, el histórico se fija a ese valor.
+    """
+    global _dirty
+    _roll_days()
+    user_id = str(user_id)
+    total_board = boards[(metric, "total")]
+    if total is None:
+        total_board.add(user_id, amount)
+    else:
+        total_board.set_score(user_id, total)
+
+    day_counts = buckets[metric].setdefault(_current_day.isoformat(), {})
+    day_counts[user_id] = day_counts.get(user_id, 0) + amount
+    for window, days in WINDOWS.items():
+        if days:
+            boards[(metric, window)].add(user_id, amount)
+    _dirty = True
+
+
+def remove_user(user_id: int | str):
+    """Saca a un usuario de todas las clasificaciones (p. ej., al ser expulsado)."""
+    global _dirty
+    user_id = str(user_id)
+    for board in boards.values():
+        board.remove(user_id)
+    for per_day in buckets.values():
+        for counts in per_day.values():
+            if counts.pop(user_id, None) is not None:
+                _dirty = True
+
+
+def top(metric: str, window: str = "total", k: int = 10) -> list[tuple[str, int]]:
+    _roll_days()
+    return boards[(metric, window)].top(k)
+
+
+def rank(metric: str, user_id: int | str, window: str = "total") -> tuple[int, int] | None:
+    _roll_days()
+    return boards[(metric, window)].rank(str(user_id))
+
+
+def size(metric: str, window: str = "total") -> int:
+    return len(boards[(metric, window)])
+
+
+_reset()
@@ -0,0 +1,312 @@
+# src/managers/outbound_dispatcher.py
+"""
+Despachador central de llamadas salientes a la API de Telegram.
+
+Se instala como `rate_limiter` de la aplicación de PTB, así que TODAS las
+llamadas del bot (respuestas, anuncios, DMs, expulsiones...) pasan por aquí:
+
+- Cubos de tokens para los límites de Telegram: global, por grupo y por chat privado.
+- Cola con prioridad: las respuestas interactivas salen antes que los envíos
+  masivos en segundo plano (anuncios, incitaciones, avisos de inactividad...).
+- Si Telegram responde con `RetryAfter`, se pausa ese chat y se reintenta.
+- Expone la profundidad de la cola y la latencia de envío en `get_stats()`
+  y en las métricas de Prometheus (`src/metrics.py`), por método de la API.
+- Cada llamada abre un span en la traza del update que la hizo (`src/tracing.py`).
+
+Para marcar un envío como de segundo plano se usa `background()` (bloque
+`with`) o el decorador `background_job` en los jobs.
+"""
+import asyncio
+import contextvars
+import functools
+import itertools
+import logging
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from src import log, metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+# --- Prioridades (menor = antes) ---
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# --- Límites de Telegram ---
+GLOBAL_RATE_PER_SECOND = 30
+GROUP_RATE_PER_MINUTE = 20
+PRIVATE_RATE_PER_SECOND = 1
+
+WORKERS = 4
+MAX_RETRIES = 5
+# Margen extra (segundos) que añadimos a cada reintento tras un RetryAfter
+RETRY_BACKOFF_BASE = 0.5
+
+# Solo estos métodos cuentan para los límites por chat; el resto, solo para el global
+_PER_CHAT_PREFIXES = ("send", "edit", "forward", "copy")
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("outbound_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def background():
+    """Marca como de segundo plano las llamadas hechas dentro del bloque."""
+    token = _priority.set(PRIORITY_BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def background_job(func):
+    """Decorador para jobs: todo lo que envíen se considera de segundo plano."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with background():
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+class TokenBucket:
+    """Cubo de tokens clásico: `rate` tokens por segundo, hasta `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float | None = None) -> float:
+        """Segundos que faltan para poder gastar un token (0 si ya se puede)."""
+        now = monotonic() if now is None else now
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill(monotonic())
+        self.tokens -= 1
+
+    def block_for(self, seconds: float):
+        """Pausa el cubo (p. ej., tras un RetryAfter de Telegram)."""
+        self.blocked_until = max(self.blocked_until, monotonic() + seconds)
+
+
+class OutboundDispatcher(BaseRateLimiter):
+    """Limitador con cola de prioridad para todas las llamadas salientes del bot."""
+
+    def __init__(self, workers: int = WORKERS):
+        self.workers = workers
+        self.global_bucket = TokenBucket(GLOBAL_RATE_PER_SECOND, GLOBAL_RATE_PER_SECOND)
+        self.chat_buckets: dict[int | str, TokenBucket] = {}
+        self._queue: asyncio.PriorityQueue | None = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._delayed: set[asyncio.Task] = set()
+        self._seq = itertools.count()
+        self.stats = {"sent": 0, "failed": 0, "retry_after": 0, "by_endpoint": {}}
+        self._latencies = deque(maxlen=1000)       # desde que se encola hasta que termina
+        self._send_latencies = deque(maxlen=1000)  # solo la llamada HTTP
+
+    # --- Ciclo de vida (PTB llama a estos métodos al iniciar/parar el bot) ---
+
+    async def initialize(self) -> None:
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("📮 Despachador de salida iniciado con %s workers.", self.workers)
+
+    async def shutdown(self) -> None:
+        for task in self._worker_tasks + list(self._delayed):
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, *self._delayed, return_exceptions=True)
+        self._worker_tasks = []
+        self._delayed.clear()
+        if self._queue is not None:
+            while not self._queue.empty():
+                *_, item = self._queue.get_nowait()
+                if not item["future"].done():
+                    item["future"].cancel()
+
+    # --- Buckets ---
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            is_private = isinstance(chat_id, int) and chat_id > 0
+            if is_private:
+                bucket = TokenBucket(PRIVATE_RATE_PER_SECOND, PRIVATE_RATE_PER_SECOND)
+            else:
+                bucket = TokenBucket(GROUP_RATE_PER_MINUTE / 60, GROUP_RATE_PER_MINUTE)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _buckets_for(self, item: dict) -> list[TokenBucket]:
+        buckets = [self.global_bucket]
+        chat_id = item["data"].get("chat_id")
+        if chat_id is not None and item["endpoint"].startswith(_PER_CHAT_PREFIXES):
+            buckets.append(self._chat_bucket(chat_id))
+        return buckets
+
+    # --- Cola ---
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        priority = _priority.get()
+        if isinstance(rate_limit_args, dict) and "priority" in rate_limit_args:
+            priority = rate_limit_args["priority"]
+
+        # Sin workers (p. ej., fuera del ciclo de vida de PTB): llamada directa
+        if not self._worker_tasks:
+            started = monotonic()
+            try:
+                with tracing.span(f"telegram {endpoint}"):
+                    return await callback(*args, **kwargs)
+            except Exception:
+                metrics.API_ERRORS.inc(endpoint)
+                raise
+            finally:
+                metrics.API_SECONDS.observe(monotonic() - started, endpoint)
+
+        item = {
+            "callback": callback,
+            "args": args,
+            "kwargs": kwargs,
+            "endpoint": endpoint,
+            "data": data,
+            "future": asyncio.get_running_loop().create_future(),
+            "enqueued_at": monotonic(),
+            "attempts": 0,
+            # Los workers no comparten el contexto del llamador: el span padre va con la petición
+            "span": tracing.current(),
+        }
+        self._put(priority, item)
+        return await item["future"]
+
+    def _put(self, priority: int, item: dict):
+        item["priority"] = priority
+        self._queue.put_nowait((priority, next(self._seq), item))
+
+    def _put_later(self, delay: float, item: dict):
+        """Devuelve un elemento a la cola pasado un rato, sin bloquear a ningún worker."""
+        async def requeue():
+            await asyncio.sleep(delay)
+            self._put(item["priority"], item)
+
+        task = asyncio.create_task(requeue())
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+
+    async def _worker(self):
+        while True:
+            _, _, item = await self._queue.get()
+            try:
+                await self._handle(item)
+            finally:
+                self._queue.task_done()
+
+    async def _handle(self, item: dict):
+        future = item["future"]
+        if future.done():  # El llamador se cansó de esperar
+            return
+
+        buckets = self._buckets_for(item)
+        wait = max(bucket.wait_time() for bucket in buckets)
+        if wait > 0:
+            if wait < 0.05:
+                await asyncio.sleep(wait)
+            else:
+                self._put_later(wait, item)
+                return
+        for bucket in buckets:
+            bucket.consume()
+
+        endpoint = item["endpoint"]
+        started = monotonic()
+        try:
+            with tracing.span(f"telegram {endpoint}", parent=item["span"], attempt=item["attempts"] + 1,
+                              queued_ms=round((started - item["enqueued_at"]) * 1000, 1)):
+                result = await item["callback"](*item["args"], **item["kwargs"])
+        except RetryAfter as e:
+            item["attempts"] += 1
+            self.stats["retry_after"] += 1
+            metrics.API_RETRY_AFTER.inc(endpoint)
+            retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else float(e.retry_after)
+            buckets[-1].block_for(retry_after)
+            if item["attempts"] > MAX_RETRIES:
+                self._finish(item, started, error=e)
+                return
+            delay = retry_after + RETRY_BACKOFF_BASE * (2 ** (item["attempts"] - 1))
+            logger.warning(
+                "⏳ Telegram pide esperar %.0fs en %s. Reintento %s/%s en %.1fs.",
+                retry_after, endpoint, item['attempts'], MAX_RETRIES, delay, extra=log.every(10),
+            )
+            self._put_later(delay, item)
+            return
+        except Exception as e:
+            self._finish(item, started, error=e)
+            return
+        self._finish(item, started, result=result)
+
+    def _finish(self, item: dict, started: float, result=None, error: Exception | None = None):
+        now = monotonic()
+        endpoint = item["endpoint"]
+        self._send_latencies.append(now - started)
+        self._latencies.append(now - item["enqueued_at"])
+        by_endpoint = self.stats["by_endpoint"]
+        by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + 1
+        metrics.API_SECONDS.observe(now - started, endpoint)
+        if error is not None:
+            metrics.API_ERRORS.inc(endpoint)
+
+        future = item["future"]
+        if future.done():
+            return
+        if error is not None:
+            self.stats["failed"] += 1
+            future.set_exception(error)
+        else:
+            self.stats["sent"] += 1
+            future.set_result(result)
+
+    # --- Métricas ---
+
+    def queue_depth(self) -> int:
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return pending + len(self._delayed)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "queue_depth": self.queue_depth(),
+            "latency": _percentiles(self._latencies),
+            "send_latency": _percentiles(self._send_latencies),
+        }
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        "p50": ordered[int(last * 0.50)],
+        "p95": ordered[int(last * 0.95)],
+        "max": ordered[-1],
+    }
+
+
+# Instancia única compartida por toda la aplicación
+dispatcher = OutboundDispatcher()
+metrics.OUTBOUND_QUEUE_DEPTH.set_function(dispatcher.queue_depth)
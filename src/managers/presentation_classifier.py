@@ -0,0 +1,209 @@
+# src/managers/presentation_classifier.py
+"""
+Clasificador local de presentaciones.
+
+Se coloca delante de Gemini: un léxico de saludos y un modelo lineal pequeño
+(regresión logística sobre palabras) deciden los casos claros al momento y
+solo los textos ambiguos se escalan a la IA.
+
+El modelo se entrena con `data/presentation_samples.json` y sus pesos se
+guardan en `data/presentation_model.json`. Para reentrenarlo:
+
+    python -m src.managers.presentation_classifier
+"""
+import json
+import logging
+import math
+import random
+import re
+import unicodedata
+
+from src import metrics
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+ACCEPT = "accept"
+REJECT = "reject"
+
+# Umbrales de probabilidad por defecto (el archivo del modelo puede cambiarlos)
+DEFAULT_ACCEPT_THRESHOLD = 0.9
+DEFAULT_REJECT_THRESHOLD = 0.1
+
+# Cada cuántas evaluaciones imprimimos el resumen de estadísticas
+STATS_LOG_EVERY = 50
+
+# Saludos inequívocos: si aparecen, aceptamos sin preguntar a nadie
+GREETING_RE = re.compile(
+    r"\b(hola|holi|holis|ola|buenas|buenos dias|aupa|kaixo|saludos|wenas|hello|hey|"
+    r"que tal|me llamo|soy nuev[oa]|encantad[oa]|un saludo)\b"
+)
+# Enlaces, menciones o comandos: nunca son una presentación
+NOISE_RE = re.compile(r"(https?://|www\.|t\.me/|^/|^@\w+$)")
+# Risas y onomatopeyas ('jajaja', 'jejeje', 'xd'): tampoco. La risa tiene que
+# repetirse: 'hi', 'he' o 'ha' sueltos pueden ser un saludo
+LAUGH_RE = re.compile(r"^(?:(?:j[aeiou]){2,}|(?:h[aeiou]){2,}|xd|lol|[mp]f*)+$")
+LETTER_RE = re.compile(r"[a-zñ]")
+WORD_RE = re.compile(r"[a-zñ0-9]+")
+REPEAT_RE = re.compile(r"(.)\1{2,}")
+
+_model = None
+stats = {
+    "local_accept": 0,
+    "local_reject": 0,
+    "escalated": 0,
+    "llm_agree": 0,
+    "llm_disagree": 0,
+}
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin tildes (conservando la ñ) y sin letras repetidas ('holaaa' -> 'hola')."""
+    text = text.strip().lower().replace("ñ", "\0")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).replace("\0", "ñ")
+    return REPEAT_RE.sub(r"\1", text)
+
+
+def extract_features(text: str) -> list[str]:
+    """Convierte un texto en la lista de rasgos que usa el modelo lineal."""
+    norm = normalize(text)
+    words = WORD_RE.findall(norm)
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    features.append(f"n:{min(len(words), 4)}")
+    if "?" in norm:
+        features.append("q")
+    if not LETTER_RE.search(norm):
+        features.append("sin_letras")
+    return features
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1 / (1 + math.exp(-z))
+
+
+def train(samples: dict, epochs: int = 200, learning_rate: float = 0.3, l2: float = 0.001, seed: int = 7) -> dict:
+    """Entrena una regresión logística con descenso de gradiente estocástico."""
+    data = [(extract_features(t), 1) for t in samples.get("positivos", [])]
+    data += [(extract_features(t), 0) for t in samples.get("negativos", [])]
+    rng = random.Random(seed)
+    weights = {}
+    bias = 0.0
+
+    for _ in range(epochs):
+        rng.shuffle(data)
+        for features, label in data:
+            z = bias + sum(weights.get(f, 0.0) for f in features)
+            error = _sigmoid(z) - label
+            bias -= learning_rate * error
+            for f in features:
+                w = weights.get(f, 0.0)
+                weights[f] = w - learning_rate * (error + l2 * w)
+
+    return {
+        "bias": round(bias, 4),
+        "weights": {f: round(w, 4) for f, w in sorted(weights.items()) if abs(w) >= 0.01},
+        "accept_threshold": DEFAULT_ACCEPT_THRESHOLD,
+        "reject_threshold": DEFAULT_REJECT_THRESHOLD,
+    }
+
+
+def load_model():
+    """Carga los pesos del modelo desde el archivo JSON."""
+    global _model
+    try:
+        with open(settings.PRESENTATION_MODEL_FILE, "r", encoding="utf-8") as f:
+            _model = json.load(f)
+        logger.info("✅ Modelo de presentaciones cargado desde %s", settings.PRESENTATION_MODEL_FILE)
+    except (FileNotFoundError, json.JSONDecodeError):
+        logger.warning("⚠️ No se encontró %s. Solo se usará el léxico de saludos.", settings.PRESENTATION_MODEL_FILE)
+        _model = {"bias": 0.0, "weights": {}}
+
+
+def predict_proba(text: str) -> float:
+    """Probabilidad (según el modelo lineal) de que el texto sea una presentación."""
+    if _model is None:
+        load_model()
+    weights = _model["weights"]
+    z = _model["bias"] + sum(weights.get(f, 0.0) for f in extract_features(text))
+    return _sigmoid(z)
+
+
+def classify(text: str) -> tuple[str | None, float]:
+    """
+    Decide localmente si un texto es una presentación.
+    Devuelve (ACCEPT | REJECT | None, probabilidad). None significa que hay que preguntar a la IA.
+    """
+    norm = normalize(text)
+    if NOISE_RE.search(norm) or LAUGH_RE.match("".join(WORD_RE.findall(norm))):
+        return REJECT, 0.0
+    # Sin letras (solo emojis, como '👋'): el modelo no tiene nada que mirar, que decida la IA
+    if not LETTER_RE.search(norm):
+        return None, predict_proba(text)
+    if GREETING_RE.search(norm):
+        return ACCEPT, 1.0
+
+    proba = predict_proba(text)
+    if proba >= _model.get("accept_threshold", DEFAULT_ACCEPT_THRESHOLD):
+        return ACCEPT, proba
+    if proba <= _model.get("reject_threshold", DEFAULT_REJECT_THRESHOLD):
+        return REJECT, proba
+    return None, proba
+
+
+def record_local_decision(decision: str | None):
+    """Contabiliza una decisión del clasificador (None = escalada a la IA)."""
+    metrics.CACHE_REQUESTS.inc("presentation_local", "miss" if decision is None else "hit")
+    if decision == ACCEPT:
+        stats["local_accept"] += 1
+    elif decision == REJECT:
+        stats["local_reject"] += 1
+    else:
+        stats["escalated"] += 1
+    _maybe_log_stats()
+
+
+def record_llm_outcome(local_proba: float, llm_result: bool):
+    """Compara la inclinación del modelo local con la respuesta de la IA."""
+    if (local_proba >= 0.5) == llm_result:
+        stats["llm_agree"] += 1
+    else:
+        stats["llm_disagree"] += 1
+
+
+def get_stats() -> dict:
+    """Devuelve los contadores junto con la tasa de decisión local y el acuerdo con la IA."""
+    local = stats["local_accept"] + stats["local_reject"]
+    total = local + stats["escalated"]
+    compared = stats["llm_agree"] + stats["llm_disagree"]
+    return {
+        **stats,
+        "total": total,
+        "local_rate": local / total if total else 0.0,
+        "llm_agreement": stats["llm_agree"] / compared if compared else None,
+    }
+
+
+def _maybe_log_stats():
+    summary = get_stats()
+    if summary["total"] % STATS_LOG_EVERY:
+        return
+    agreement = summary["llm_agreement"]
+    agreement_txt = f"{agreement:.0%}" if agreement is not None else "n/d"
+    logger.info(
+        "📊 Presentaciones: %s evaluadas, %.0f%% decididas en local, acuerdo con la IA en escaladas: %s",
+        summary["total"], summary["local_rate"] * 100, agreement_txt,
+    )
+
+
+if __name__ == "__main__":
+    with open(settings.PRESENTATION_SAMPLES_FILE, "r", encoding="utf-8") as f:
+        trained = train(json.load(f))
+    with open(settings.PRESENTATION_MODEL_FILE, "w", encoding="utf-8") as f:
+        json.dump(trained, f, indent=2, ensure_ascii=False)
+    print(f"💾 Modelo entrenado con {len(trained['weights'])} pesos guardado en {settings.PRESENTATION_MODEL_FILE}")
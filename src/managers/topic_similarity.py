@@ -0,0 +1,129 @@
+# src/managers/topic_similarity.py
+"""
+Detección barata de temas casi duplicados.
+
+Cada tema se convierte en un conjunto de shingles (trozos de 4 caracteres
+del texto normalizado) y se resume con una firma MinHash. Las firmas se
+reparten en bandas (LSH) para encontrar candidatos sin comparar contra
+todo el histórico; solo los candidatos se comparan de verdad.
+"""
+import re
+import unicodedata
+import zlib
+
+NUM_HASHES = 64
+BANDS = 32
+ROWS_PER_BAND = NUM_HASHES // BANDS
+SHINGLE_SIZE = 4
+DEFAULT_THRESHOLD = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Coeficientes fijos para que las firmas sean estables entre reinicios
+_COEFFICIENTS = [
+    ((i * 0x9E3779B1 + 0x7F4A7C15) % _MERSENNE_PRIME | 1, (i * 0x85EBCA77 + 0xC2B2AE3D) % _MERSENNE_PRIME)
+    for i in range(1, NUM_HASHES + 1)
+]
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9ñ ]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin tildes ni signos, con los espacios colapsados."""
+    text = text.lower().replace("ñ", "\0")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).replace("\0", "ñ")
+    text = _NON_WORD_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def shingles(text: str) -> set[int]:
+    """Conjunto de shingles (como enteros de 32 bits) de un texto."""
+    norm = normalize(text)
+    if len(norm) <= SHINGLE_SIZE:
+        return {zlib.crc32(norm.encode("utf-8"))} if norm else set()
+    return {
+        zlib.crc32(norm[i:i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(norm) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(text: str) -> tuple[int, ...]:
+    """Firma MinHash de `NUM_HASHES` valores."""
+    values = shingles(text)
+    if not values:
+        return tuple([_MAX_HASH] * NUM_HASHES)
+    return tuple(
+        min(((a * v + b) % _MERSENNE_PRIME) & _MAX_HASH for v in values)
+        for a, b in _COEFFICIENTS
+    )
+
+
+def estimate_similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimación de la similitud de Jaccard a partir de dos firmas."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_HASHES
+
+
+class TopicIndex:
+    """Índice LSH de firmas MinHash para consultar si un tema ya se ha usado."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: dict[str, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[str]] = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _bands(self, signature: tuple[int, ...]):
+        for band in range(BANDS):
+            start = band * ROWS_PER_BAND
+            yield band, signature[start:start + ROWS_PER_BAND]
+
+    def add(self, text: str):
+        """Añade un tema al índice."""
+        key = normalize(text)
+        if not key or key in self._signatures:
+            return
+        signature = minhash(text)
+        self._signatures[key] = signature
+        for bucket in self._bands(signature):
+            self._buckets.setdefault(bucket, set()).add(key)
+
+    def remove(self, text: str):
+        """Quita un tema del índice (si estaba)."""
+        key = normalize(text)
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for bucket in self._bands(signature):
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def find_similar(self, text: str) -> tuple[str | None, float]:
+        """Devuelve el tema indexado más parecido (y su similitud) si supera el umbral."""
+        key = normalize(text)
+        if key in self._signatures:
+            return key, 1.0
+
+        signature = minhash(text)
+        candidates = set()
+        for bucket in self._bands(signature):
+            candidates |= self._buckets.get(bucket, set())
+
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            score = estimate_similarity(signature, self._signatures[candidate])
+            if score > best_score:
+                best, best_score = candidate, score
+        if best_score >= self.threshold:
+            return best, best_score
+        return None, best_score
+
+    def is_near_duplicate(self, text: str) -> bool:
+        return self.find_similar(text)[0] is not None
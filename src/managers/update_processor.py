@@ -0,0 +1,123 @@
+# src/managers/update_processor.py
+"""
+Procesado concurrente de updates con serialización por clave.
+
+Por defecto PTB procesa los updates de uno en uno, así que una llamada lenta
+a Gemini (una mención o una presentación) frena a todo el grupo. Aquí se
+procesan en paralelo, pero los updates de un mismo usuario (o del mismo chat,
+si el update no trae usuario) van siempre en fila y en orden de llegada: así
+`context.user_data`, la XP y el estado de verificación de cada uno nunca se
+tocan desde dos sitios a la vez.
+
+Hay dos límites:
+
+- `max_concurrent_updates`: cuántos updates se ejecutan a la vez.
+- `max_pending_updates`: cuántos se admiten en total, contando los que esperan
+  su turno detrás de otro update de la misma persona. La espera por la clave
+  va ANTES de ocupar hueco de ejecución, así que alguien que manda veinte
+  mensajes seguidos no bloquea al resto.
+
+`record_locks` es el mismo mecanismo para los jobs y handlers que leen un
+registro, esperan a Telegram o a la IA y después lo modifican (p. ej. la
+expulsión por no presentarse frente a la aceptación de la presentación).
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Any, Awaitable, Hashable
+
+from telegram.ext import BaseUpdateProcessor
+
+from src import metrics, tracing
+
+
+class KeyedLocks:
+    """Un `asyncio.Lock` por clave, creado al pedirlo y borrado cuando nadie lo usa."""
+
+    def __init__(self):
+        # clave -> [lock, tareas que lo tienen o lo esperan]
+        self._locks: dict[Hashable, list] = {}
+        self.contended = 0  # Veces que alguien ha tenido que esperar su turno
+
+    def __len__(self):
+        return len(self._locks)
+
+    def locked(self, key: Hashable) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        elif entry[0].locked():
+            self.contended += 1
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+def update_key(update: object) -> Hashable | None:
+    """Clave de serialización de un update: su usuario o, si no tiene, su chat."""
+    user = getattr(update, "effective_user", None)
+    if user is not None:
+        return ("user", user.id)
+    chat = getattr(update, "effective_chat", None)
+    if chat is not None:
+        return ("chat", chat.id)
+    return None
+
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    """Procesa updates en paralelo salvo los que comparten clave, que van en orden."""
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int | None = None):
+        max_pending_updates = max_pending_updates or max_concurrent_updates * 8
+        if max_pending_updates < max_concurrent_updates:
+            raise ValueError("`max_pending_updates` no puede ser menor que `max_concurrent_updates`")
+        # El semáforo de la clase base limita los admitidos; el nuestro, los que se ejecutan
+        super().__init__(max_pending_updates)
+        self.max_running = max_concurrent_updates
+        self._running = asyncio.Semaphore(max_concurrent_updates)
+        self.locks = KeyedLocks()
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        admitted = perf_counter()
+        key = update_key(update)
+        if key is None:
+            async with self._running:
+                await self._run(update, coroutine, admitted)
+            return
+        async with self.locks.hold(key):
+            async with self._running:
+                await self._run(update, coroutine, admitted)
+
+    @staticmethod
+    async def _run(update: object, coroutine: Awaitable[Any], admitted: float):
+        """Ejecuta el update dentro de su traza, midiendo la espera y la duración."""
+        start = perf_counter()
+        if metrics.enabled:
+            metrics.UPDATE_WAIT_SECONDS.observe(start - admitted)
+        try:
+            with tracing.trace("update", update_id=getattr(update, "update_id", None),
+                               wait_ms=round((start - admitted) * 1000, 1)):
+                await coroutine
+        finally:
+            if metrics.enabled:
+                metrics.UPDATE_SECONDS.observe(perf_counter() - start)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
+# Cerrojos de registros compartidos (usuarios, juego...) para jobs y handlers
+record_locks = KeyedLocks()
@@ -0,0 +1,135 @@
+# src/managers/user_columns.py
+"""
+Copia en columnas (arrays de NumPy) de la tabla de usuarios.
+
+`user_manager.users_db` sigue siendo la fuente de verdad; esta copia se
+mantiene al día fila a fila cada vez que cambia un usuario y se reconstruye
+entera al cargar. Sirve para responder preguntas sobre todos los usuarios a
+la vez (quién está inactivo, cuántos hay por nivel, XP media...) con
+operaciones vectorizadas en lugar de recorrer el diccionario.
+"""
+from datetime import datetime
+
+import numpy as np
+
+# Código numérico de cada estado de verificación
+STATUS_CODES = {"verified": 0, "pending_presentation": 1, "warned": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+UNKNOWN_STATUS = 255
+
+_COLUMNS = {
+    "ids": np.int64,
+    "xp": np.int64,
+    "points": np.int64,
+    "level": np.int32,
+    "lives": np.int32,
+    "last_seen": np.float64,
+    "status": np.uint8,
+}
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class UserColumns:
+    """Tabla columnar con altas, cambios y bajas en O(1) (las bajas mueven la última fila al hueco)."""
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.rows: dict[str, int] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        old = {name: getattr(self, name, None) for name in _COLUMNS}
+        for name, dtype in _COLUMNS.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if old[name] is not None:
+                column[:self.size] = old[name][:self.size]
+            setattr(self, name, column)
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        """Vista de solo las filas ocupadas de una columna."""
+        return getattr(self, name)[:self.size]
+
+    # --- Mantenimiento ---
+
+    def upsert(self, user_id: str, data: dict):
+        """Escribe (o crea) la fila de un usuario a partir de su registro en users_db."""
+        row = self.rows.get(user_id)
+        if row is None:
+            if self.size == len(self.ids):
+                self._allocate(max(1024, len(self.ids) * 2))
+            row = self.size
+            self.rows[user_id] = row
+            self.size += 1
+        self.ids[row] = int(user_id)
+        self.xp[row] = data.get("xp", 0)
+        self.points[row] = data.get("points", 0)
+        self.level[row] = data.get("level", 1)
+        self.lives[row] = data.get("lives", 3)
+        self.last_seen[row] = _timestamp(data.get("last_seen") or data.get("join_date"))
+        self.status[row] = STATUS_CODES.get(data.get("status", "verified"), UNKNOWN_STATUS)
+
+    def remove(self, user_id: str):
+        row = self.rows.pop(user_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            for name in _COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            self.rows[str(int(self.ids[row]))] = row
+        self.size -= 1
+
+    def rebuild(self, users_db: dict):
+        """Reconstruye la tabla completa desde una instantánea de users_db."""
+        self.size = 0
+        self.rows = {}
+        self._allocate(max(1024, len(users_db)))
+        for user_id, data in users_db.items():
+            self.upsert(user_id, data)
+
+    # --- Consultas vectorizadas ---
+
+    def inactive_ids(self, cutoff_timestamp: float) -> list[str]:
+        """Ids de los usuarios cuya última actividad es anterior a `cutoff_timestamp`."""
+        mask = self.column("last_seen") < cutoff_timestamp
+        return self.column("ids")[mask].astype(str).tolist()
+
+    def count_inactive(self, cutoff_timestamp: float) -> int:
+        return int((self.column("last_seen") < cutoff_timestamp).sum())
+
+    def count_by_level(self) -> dict[int, int]:
+        levels, counts = np.unique(self.column("level"), return_counts=True)
+        return {int(level): int(count) for level, count in zip(levels, counts)}
+
+    def count_by_status(self) -> dict[str, int]:
+        codes, counts = np.unique(self.column("status"), return_counts=True)
+        return {STATUS_NAMES.get(int(code), "desconocido"): int(count) for code, count in zip(codes, counts)}
+
+    def mean_xp(self, active_since: float | None = None) -> float:
+        """XP media (de los activos desde `active_since`, si se indica)."""
+        xp = self.column("xp")
+        if active_since is not None:
+            xp = xp[self.column("last_seen") >= active_since]
+        return float(xp.mean()) if len(xp) else 0.0
+
+    def top_ids(self, column: str, k: int) -> list[tuple[str, int]]:
+        """Los `k` usuarios con más valor en una columna (sin ordenar la tabla entera)."""
+        values = self.column(column)
+        k = min(k, len(values))
+        if k == 0:
+            return []
+        candidates = np.argpartition(-values, k - 1)[:k]
+        ordered = candidates[np.lexsort((self.column("ids")[candidates], -values[candidates]))]
+        return [(str(int(self.ids[row])), int(values[row])) for row in ordered]
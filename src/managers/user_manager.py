@@ -1,39 +1,128 @@
 # src/managers/user_manager.py
+import asyncio
 import json
+import logging
 import os
 import random
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from time import time
+
+import numpy as np
+from telegram.error import Forbidden
 from telegram.ext import ContextTypes
 
+from src import tracing
 from src.config import settings, levels
+from src.managers import outbound_dispatcher, leaderboard_manager
+from src.managers.user_columns import UserColumns
+
+logger = logging.getLogger(__name__)
 
 users_db = {}
 
+# Índice user_id -> timestamp de last_seen, ordenado del más antiguo al más reciente.
+# Permite que la comprobación de inactividad recorra solo a los caducados.
+last_seen_index: OrderedDict[str, float] = OrderedDict()
+
+# Copia en columnas de users_db para consultas masivas (se actualiza fila a fila)
+columns = UserColumns()
+
+# Muestreo ponderado: tras una mención, el usuario tarda este tiempo en recuperar su peso completo
+MENTION_COOLDOWN_SECONDS = 3 * 24 * 3600
+MIN_MENTION_WEIGHT = 0.05
+
+
+class SampleSet:
+    """Conjunto con altas, bajas y elección aleatoria en O(1) (array + posiciones, borrado por intercambio)."""
+
+    def __init__(self):
+        self.items: list[str] = []
+        self.positions: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def add(self, item: str):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item: str):
+        index = self.positions.pop(item, None)
+        if index is None:
+            return
+        last = self.items.pop()
+        if index < len(self.items):
+            self.items[index] = last
+            self.positions[last] = index
+
+    def choice(self) -> str:
+        return self.items[random.randrange(len(self.items))]
+
+
+# Miembros de cada estado de verificación, para muestrear sin recorrer users_db
+status_index: dict[str, SampleSet] = {}
+
+def _index_status(user_id: str, status: str | None):
+    """Mueve a un usuario al conjunto de su estado (None = sacarlo de todos)."""
+    for members in status_index.values():
+        members.discard(user_id)
+    if status is not None:
+        status_index.setdefault(status, SampleSet()).add(user_id)
+
+def _rebuild_status_index():
+    status_index.clear()
+    for user_id, data in users_db.items():
+        status_index.setdefault(data.get("status", "verified"), SampleSet()).add(user_id)
+
+def _parse_last_seen(data: dict) -> float:
+    """Timestamp de la última actividad guardada (o de la fecha de alta si no hay)."""
+    raw = data.get("last_seen") or data.get("join_date")
+    try:
+        return datetime.fromisoformat(raw).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+def _rebuild_last_seen_index():
+    """Reconstruye el índice de actividad a partir de users_db (solo al cargar)."""
+    global last_seen_index
+    ordered = sorted(((uid, _parse_last_seen(data)) for uid, data in users_db.items()), key=lambda item: item[1])
+    last_seen_index = OrderedDict(ordered)
+
+def _touch_last_seen(user_id: str, moment: datetime):
+    """Guarda la última actividad en el usuario y lo mueve al final del índice."""
+    users_db[user_id]["last_seen"] = moment.isoformat()
+    last_seen_index[user_id] = moment.timestamp()
+    last_seen_index.move_to_end(user_id)
+
 def load_users():
     """Carga la base de datos de usuarios desde el archivo JSON."""
     global users_db
     try:
         with open(settings.USERS_FILE, "r", encoding="utf-8") as f:
             users_db = json.load(f)
-        print(f"✅ Base de datos de usuarios cargada desde {settings.USERS_FILE}")
+        logger.info("✅ Base de datos de usuarios cargada desde %s", settings.USERS_FILE)
     except (FileNotFoundError, json.JSONDecodeError):
-        print(f"❌ No se encontró {settings.USERS_FILE}. Se creará una nueva.")
+        logger.warning("❌ No se encontró %s. Se creará una nueva.", settings.USERS_FILE)
         users_db = {}
+    _rebuild_last_seen_index()
+    _rebuild_status_index()
+    columns.rebuild(users_db)
+    leaderboard_manager.load(users_db)
 
 def save_users():
     """Guarda la base de datos de usuarios en el archivo JSON."""
-    with open(settings.USERS_FILE, "w", encoding="utf-8") as f:
+    with tracing.store_flush("users"), open(settings.USERS_FILE, "w", encoding="utf-8") as f:
         json.dump(users_db, f, indent=2, ensure_ascii=False)
-    print("💾 Base de datos de usuarios guardada.")
+    logger.debug("💾 Base de datos de usuarios guardada.")
 
-def update_user_activity(user):
-    """
-    Registra o actualiza la última actividad de un usuario y sus datos de nivel.
-    """
+def _ensure_user(user, moment: datetime) -> dict:
+    """Crea el registro del usuario si no existe y completa los campos de nivel de los antiguos."""
     user_id = str(user.id)
-    now_iso = datetime.now().isoformat()
-
     if user_id not in users_db:
         # Intentamos obtener el nombre de varias formas para evitar errores
         first_name = getattr(user, 'first_name', None) or getattr(user, 'nombre', None) or "Majo/a"
@@ -42,7 +131,7 @@ def update_user_activity(user):
         users_db[user_id] = {
             "first_name": first_name,
             "username": username,
-            "join_date": now_iso,
+            "join_date": moment.isoformat(),
             "lives": 3,
             "level": 1,
             "xp": 0,
@@ -50,9 +139,9 @@ def update_user_activity(user):
             "last_xp_timestamp": 0,
             "status": "pending_presentation" # Por defecto, nuevos usuarios deben presentarse
         }
+        _index_status(user_id, "pending_presentation")
     
     user_data = users_db[user_id]
-    user_data["last_seen"] = now_iso
     
     # Asegurar compatibilidad con usuarios antiguos
     if "level" not in user_data:
@@ -61,9 +150,62 @@ def update_user_activity(user):
         user_data["last_xp_timestamp"] = 0
     if "points" not in user_data:
         user_data["points"] = 0
+    return user_data
+
+def update_user_activity(user):
+    """
+    Registra o actualiza la última actividad de un usuario y sus datos de nivel.
+    """
+    user_id = str(user.id)
+    now = datetime.now()
+
+    user_data = _ensure_user(user, now)
+    _touch_last_seen(user_id, now)
 
+    columns.upsert(user_id, user_data)
     save_users()
 
+def apply_activity_batch(batch: dict[str, dict]) -> dict:
+    """
+    Aplica de golpe la actividad acumulada de muchos mensajes (p. ej., los recibidos
+    con el bot apagado). `batch` es {user_id: {"user": User, "timestamps": [epoch, ...]}}.
+    Respeta el cooldown de XP, sube niveles sin anunciarlos y guarda una sola vez.
+    """
+    summary = {"users": 0, "messages": 0, "xp": 0, "level_ups": 0}
+    # Del más antiguo al más reciente, para que el índice por last_seen siga ordenado
+    ordered = sorted(batch.items(), key=lambda item: max(item[1]["timestamps"]))
+    for user_id, entry in ordered:
+        timestamps = sorted(entry["timestamps"])
+        last_moment = datetime.fromtimestamp(timestamps[-1])
+        user_data = _ensure_user(entry["user"], datetime.fromtimestamp(timestamps[0]))
+        if _parse_last_seen(user_data) < timestamps[-1] or user_id not in last_seen_index:
+            _touch_last_seen(user_id, last_moment)
+
+        # Misma regla que en grant_xp_on_message, pero mensaje a mensaje sobre sus fechas reales
+        gained = 0
+        last_xp = user_data.get("last_xp_timestamp", 0)
+        for timestamp in timestamps:
+            if timestamp - last_xp > levels.XP_COOLDOWN_SECONDS:
+                gained += levels.XP_PER_MESSAGE
+                last_xp = timestamp
+        if gained:
+            user_data["xp"] += gained
+            user_data["last_xp_timestamp"] = last_xp
+            leaderboard_manager.record("xp", user_id, gained, total=user_data["xp"])
+            new_level, _ = levels.get_level_for_xp(user_data["xp"])
+            if new_level > user_data.get("level", 1):
+                user_data["level"] = new_level
+                summary["level_ups"] += 1
+
+        columns.upsert(user_id, user_data)
+        summary["users"] += 1
+        summary["messages"] += len(timestamps)
+        summary["xp"] += gained
+
+    if batch:
+        save_users()
+    return summary
+
 def add_points(user_id: int, points: int) -> int:
     """
     Suma puntos a un usuario y devuelve el total.
@@ -73,9 +215,46 @@ def add_points(user_id: int, points: int) -> int:
         return 0
 
     users_db[user_id_str]["points"] = users_db[user_id_str].get("points", 0) + points
+    leaderboard_manager.record("points", user_id_str, points, total=users_db[user_id_str]["points"])
+    columns.upsert(user_id_str, users_db[user_id_str])
     save_users()
     return users_db[user_id_str]["points"]
 
+def _apply_message_xp(user_id_str: str, user_data: dict) -> tuple[bool, dict | None]:
+    """
+    Suma la XP de un mensaje si ha pasado el cooldown (sin guardar).
+    Devuelve (si ha cambiado algo, detalles de la subida de nivel o None).
+    """
+    # 1. Comprobar Cooldown
+    if time() - user_data.get("last_xp_timestamp", 0) <= levels.XP_COOLDOWN_SECONDS:
+        return False, None
+
+    # 2. Otorgar XP
+    user_data["xp"] += levels.XP_PER_MESSAGE
+    user_data["last_xp_timestamp"] = time()
+    leaderboard_manager.record("xp", user_id_str, levels.XP_PER_MESSAGE, total=user_data["xp"])
+    logger.debug("✨ Usuario %s ha ganado %s XP. Total: %s", user_id_str, levels.XP_PER_MESSAGE, user_data['xp'])
+
+    # 3. Comprobar si sube de nivel
+    level_up_info = None
+    current_level = user_data.get("level", 1)
+    next_level_xp = levels.get_next_level_xp(current_level)
+
+    if next_level_xp is not None and user_data["xp"] >= next_level_xp:
+        new_level, new_level_name = levels.get_level_for_xp(user_data["xp"])
+        
+        if new_level > current_level:
+            user_data["level"] = new_level
+            logger.info("🎉 ¡LEVEL UP! Usuario %s ha subido al nivel %s: %s", user_id_str, new_level, new_level_name)
+            level_up_info = {
+                "user_name": user_data["first_name"],
+                "level_num": new_level,
+                "level_name": new_level_name
+            }
+
+    columns.upsert(user_id_str, user_data)
+    return True, level_up_info
+
 def grant_xp_on_message(user_id: int) -> dict | None:
     """
     Otorga XP a un usuario por enviar un mensaje si ha pasado el cooldown.
@@ -85,35 +264,58 @@ def grant_xp_on_message(user_id: int) -> dict | None:
     if user_id_str not in users_db:
         return None
 
-    user_data = users_db[user_id_str]
-    
-    # 1. Comprobar Cooldown
-    if time() - user_data.get("last_xp_timestamp", 0) > levels.XP_COOLDOWN_SECONDS:
-        # 2. Otorgar XP
-        user_data["xp"] += levels.XP_PER_MESSAGE
-        user_data["last_xp_timestamp"] = time()
-        print(f"✨ Usuario {user_id_str} ha ganado {levels.XP_PER_MESSAGE} XP. Total: {user_data['xp']}")
-
-        # 3. Comprobar si sube de nivel
-        current_level = user_data.get("level", 1)
-        next_level_xp = levels.get_next_level_xp(current_level)
-
-        if next_level_xp is not None and user_data["xp"] >= next_level_xp:
-            new_level, new_level_name = levels.get_level_for_xp(user_data["xp"])
-            
-            if new_level > current_level:
-                user_data["level"] = new_level
-                save_users()
-                print(f"🎉 ¡LEVEL UP! Usuario {user_id_str} ha subido al nivel {new_level}: {new_level_name}")
-                return {
-                    "user_name": user_data["first_name"],
-                    "level_num": new_level,
-                    "level_name": new_level_name
-                }
-        
+    changed, level_up_info = _apply_message_xp(user_id_str, users_db[user_id_str])
+    if changed:
         save_users()
-    
-    return None
+    return level_up_info
+
+def record_message(user) -> dict | None:
+    """
+    Camino rápido por mensaje: actualiza la última actividad y la XP del usuario
+    con una sola búsqueda en users_db y un solo guardado.
+    Devuelve los detalles del nuevo nivel si el usuario sube de nivel.
+    """
+    user_id = str(user.id)
+    now = datetime.now()
+    user_data = users_db.get(user_id)
+    if user_data is None or "points" not in user_data:
+        user_data = _ensure_user(user, now)
+    _touch_last_seen(user_id, now)
+
+    _, level_up_info = _apply_message_xp(user_id, user_data)
+    columns.upsert(user_id, user_data)
+    save_users()
+    return level_up_info
+
+def recompute_all_levels() -> dict:
+    """
+    Recalcula el nivel de todos los usuarios con la curva actual en una sola pasada vectorizada.
+    Devuelve quién ha subido y quién ha bajado: {"up": [(id, antes, después)], "down": [...]}.
+    """
+    user_ids = list(users_db)
+    if not user_ids:
+        return {"up": [], "down": []}
+
+    xp = np.fromiter((users_db[uid].get("xp", 0) for uid in user_ids), dtype=np.int64, count=len(user_ids))
+    old_levels = np.fromiter((users_db[uid].get("level", 1) for uid in user_ids), dtype=np.int64, count=len(user_ids))
+    new_levels = levels.get_levels_for_xp_array(xp)
+
+    changes = {"up": [], "down": []}
+    for index in np.flatnonzero(new_levels != old_levels):
+        uid, before, after = user_ids[index], int(old_levels[index]), int(new_levels[index])
+        users_db[uid]["level"] = after
+        columns.upsert(uid, users_db[uid])
+        changes["up" if after > before else "down"].append((uid, before, after))
+
+    if changes["up"] or changes["down"]:
+        save_users()
+    logger.info("📐 Niveles recalculados para %s usuarios: %s suben, %s bajan.", len(user_ids), len(changes['up']), len(changes['down']))
+    return changes
+
+def apply_xp_curve(base_xp: int, exponent: float) -> dict:
+    """Cambia la curva de XP y recoloca a todos los usuarios de inmediato."""
+    levels.set_xp_curve(base_xp, exponent)
+    return recompute_all_levels()
 
 def get_user_level_info(user_id: int) -> dict | None:
     """
@@ -141,24 +343,92 @@ def get_user_level_info(user_id: int) -> dict | None:
         "xp_next_level": xp_for_next_level
     }
 
-def get_random_verified_users(count: int = 3) -> list[dict]:
+def get_population_stats(active_days: int | None = None) -> dict:
+    """
+    Resumen de toda la comunidad calculado sobre la copia en columnas:
+    usuarios por nivel y por estado, inactivos y XP media de los activos.
+    """
+    active_days = settings.INACTIVITY_DAYS if active_days is None else active_days
+    cutoff = (datetime.now() - timedelta(days=active_days)).timestamp()
+    return {
+        "total": len(columns),
+        "by_level": columns.count_by_level(),
+        "by_status": columns.count_by_status(),
+        "inactive": columns.count_inactive(cutoff),
+        "mean_xp_active": columns.mean_xp(active_since=cutoff),
+    }
+
+def _mention_weight(data: dict, now: float) -> float:
+    """Peso entre MIN_MENTION_WEIGHT y 1: cuanto más tiempo sin ser mencionado, más probable."""
+    elapsed = now - data.get("last_mentioned", 0)
+    return max(MIN_MENTION_WEIGHT, min(1.0, elapsed / MENTION_COOLDOWN_SECONDS))
+
+def sample_users_by_status(status: str, count: int, weighted: bool = False) -> list[str]:
+    """
+    Elige hasta `count` usuarios distintos con el estado indicado sin recorrer la base de datos.
+    Con `weighted=True` se prefiere a quienes llevan más tiempo sin ser mencionados
+    (muestreo por rechazo: se elige uno al azar y se acepta con probabilidad igual a su peso).
+    """
+    members = status_index.get(status)
+    if not members:
+        return []
+
+    chosen: list[str] = []
+    now = time()
+    attempts = 0
+    max_attempts = count * 50
+    while len(chosen) < min(count, len(members)) and attempts < max_attempts:
+        attempts += 1
+        user_id = members.choice()
+        data = users_db.get(user_id)
+        if data is None or data.get("status", "verified") != status:
+            # Índice desfasado (usuario borrado por otra vía): lo corregimos y seguimos
+            members.discard(user_id)
+            if not members:
+                break
+            continue
+        if user_id in chosen:
+            continue
+        if weighted and random.random() > _mention_weight(data, now):
+            continue
+        chosen.append(user_id)
+    return chosen
+
+def get_random_verified_users(count: int = 3, prefer_not_mentioned: bool = True) -> list[dict]:
     """
     Devuelve una lista aleatoria de usuarios verificados.
     Cada elemento es un dict con 'id' y 'name' (o username).
     """
     verified_users = []
-    for uid, data in users_db.items():
-        if data.get("status") == "verified":
-            # Preferimos first_name, si no username, si no "Usuario"
-            name = data.get("first_name") or data.get("username") or "Usuario"
-            verified_users.append({"id": uid, "name": name})
-    
-    if not verified_users:
-        return []
-    
-    # Seleccionamos aleatoriamente hasta 'count' usuarios
-    sample_size = min(len(verified_users), count)
-    return random.sample(verified_users, sample_size)
+    for uid in sample_users_by_status("verified", count, weighted=prefer_not_mentioned):
+        data = users_db[uid]
+        # Preferimos first_name, si no username, si no "Usuario"
+        name = data.get("first_name") or data.get("username") or "Usuario"
+        verified_users.append({"id": uid, "name": name})
+    return verified_users
+
+def mark_mentioned(user_ids: list[str]):
+    """Apunta cuándo se mencionó a estos usuarios para no repetirlos enseguida."""
+    now = time()
+    for uid in user_ids:
+        if str(uid) in users_db:
+            users_db[str(uid)]["last_mentioned"] = now
+    save_users()
+
+def remove_user(user_id: int | str):
+    """Elimina a un usuario de la base de datos y del índice de actividad (no guarda)."""
+    user_id_str = str(user_id)
+    users_db.pop(user_id_str, None)
+    last_seen_index.pop(user_id_str, None)
+    _index_status(user_id_str, None)
+    leaderboard_manager.remove_user(user_id_str)
+    columns.remove(user_id_str)
+
+def mark_dm_reachable(user_id: int):
+    """El usuario nos ha escrito por privado: vuelve a ser posible enviarle DMs."""
+    user_id_str = str(user_id)
+    if users_db.get(user_id_str, {}).pop("dm_unreachable", None):
+        save_users()
 
 # --- Funciones de Estado (Verificación) ---
 
@@ -170,6 +440,8 @@ def set_user_status(user_id: int, status: str):
     user_id_str = str(user_id)
     if user_id_str in users_db:
         users_db[user_id_str]["status"] = status
+        _index_status(user_id_str, status)
+        columns.upsert(user_id_str, users_db[user_id_str])
         save_users()
 
 def get_user_status(user_id: int) -> str:
@@ -187,58 +459,111 @@ def is_verified(user_id: int) -> bool:
     return get_user_status(user_id) == "verified"
 
 
+def get_expired_user_ids(now: datetime) -> list[str]:
+    """Usuarios cuya última actividad es anterior al umbral de inactividad (los más antiguos primero)."""
+    cutoff = (now - timedelta(days=settings.INACTIVITY_DAYS)).timestamp()
+    expired, stale = [], []
+    for user_id, last_seen in last_seen_index.items():
+        if last_seen >= cutoff:
+            break
+        # Usuarios borrados de users_db por otra vía: los quitamos del índice de paso
+        (expired if user_id in users_db else stale).append(user_id)
+    for user_id in stale:
+        del last_seen_index[user_id]
+    return expired
+
+async def _notify_life_lost(bot, user_id: str, lives: int) -> str:
+    """Avisa por DM de la vida perdida. Devuelve 'sent', 'unreachable' o 'error'."""
+    try:
+        await bot.send_message(
+            chat_id=int(user_id),
+            text=f"Hola 👋, solo para que lo sepas, has perdido una vida en el grupo por inactividad. Te quedan {lives}."
+                 "\n¡Participa en el chat o apúntate a un evento para mantenerte activo!"
+        )
+        return "sent"
+    except Forbidden:
+        # Ha bloqueado al bot o nunca le ha abierto un privado: no lo volveremos a intentar
+        # (durante el envío ha podido salir del grupo, de ahí el get)
+        if user_id in users_db:
+            users_db[user_id]["dm_unreachable"] = True
+        return "unreachable"
+    except Exception:
+        return "error"
+
+async def _kick_user(bot, chat_id: int, user_id: str) -> bool:
+    """Expulsa (ban + unban) a un usuario para que pueda volver más adelante."""
+    try:
+        await bot.kick_chat_member(chat_id=chat_id, user_id=int(user_id))
+        await bot.unban_chat_member(chat_id=chat_id, user_id=int(user_id))
+        return True
+    except Exception as e:
+        logger.error("🚨 Error al expulsar al usuario %s: %s", user_id, e)
+        return False
+
+@outbound_dispatcher.background_job
 async def check_inactivity_job(context: ContextTypes.DEFAULT_TYPE):
     """
     Se ejecuta diariamente. Comprueba la inactividad, resta vidas y expulsa si llegan a cero.
+    Solo recorre a los usuarios caducados (gracias al índice por last_seen) y lanza
+    los avisos y expulsiones en paralelo; el despachador de salida se encarga de los límites.
     """
-    print(f"🏃 Ejecutando tarea diaria de comprobación de vidas por inactividad...")
+    logger.info("🏃 Ejecutando tarea diaria de comprobación de vidas por inactividad...")
     
     chat_id = settings.GROUP_CHAT_ID
     if not chat_id:
-        print("❌ No se ha configurado un GROUP_CHAT_ID. La tarea no se ejecutará.")
+        logger.error("❌ No se ha configurado un GROUP_CHAT_ID. La tarea no se ejecutará.")
         return
 
     now = datetime.now()
-    threshold = timedelta(days=settings.INACTIVITY_DAYS)
+    expired = get_expired_user_ids(now)
     users_to_kick = []
-    
-    for user_id in list(users_db.keys()):
+    notifications = []
+    skipped_dm = 0
+
+    for user_id in expired:
         data = users_db[user_id]
-        
-        lives = data.get("lives", 3)
-        last_seen = datetime.fromisoformat(data["last_seen"])
-
-        if (now - last_seen) > threshold:
-            lives -= 1
-            print(f"💔 Usuario {user_id} ha perdido una vida por inactividad. Vidas restantes: {lives}")
-            
-            data["lives"] = lives
-            data["last_seen"] = now.isoformat() 
-
-            try:
-                await context.bot.send_message(
-                    chat_id=int(user_id),
-                    text=f"Hola 👋, solo para que lo sepas, has perdido una vida en el grupo por inactividad. Te quedan {lives}."
-                         "\n¡Participa en el chat o apúntate a un evento para mantenerte activo!"
-                )
-            except Exception:
-                print(f"No se pudo notificar al usuario {user_id} (probablemente ha bloqueado al bot).")
-
-            if lives <= 0:
-                print(f"☠️ Usuario {user_id} se ha quedado sin vidas. Programado para expulsión.")
-                users_to_kick.append(user_id)
-
-    if users_to_kick:
-        print(f"👢 Expulsando a {len(users_to_kick)} usuarios...")
-        for user_id in users_to_kick:
-            try:
-                await context.bot.kick_chat_member(chat_id=chat_id, user_id=int(user_id))
-                await context.bot.unban_chat_member(chat_id=chat_id, user_id=int(user_id))
-                print(f"✅ Usuario {user_id} expulsado.")
-                del users_db[user_id]
-            except Exception as e:
-                print(f"🚨 Error al expulsar al usuario {user_id}: {e}")
-    else:
-        print("👍 Ningún usuario ha llegado a cero vidas hoy.")
+        lives = data.get("lives", 3) - 1
+        data["lives"] = lives
+        # Reiniciamos su contador: la próxima vida se pierde tras otro periodo completo
+        _touch_last_seen(user_id, now)
+        columns.upsert(user_id, data)
 
-    save_users()
+        if data.get("dm_unreachable"):
+            skipped_dm += 1
+        else:
+            notifications.append(_notify_life_lost(context.bot, user_id, lives))
+
+        if lives <= 0:
+            users_to_kick.append(user_id)
+
+    notify_results = await asyncio.gather(*notifications)
+
+    # Los avisos tardan y los mensajes se procesan en paralelo: quien haya escrito
+    # mientras tanto ya no está inactivo, así que no se le expulsa y recupera la vida
+    pass_started = now.timestamp()
+    revived = [uid for uid in users_to_kick if last_seen_index.get(uid, pass_started) > pass_started]
+    for user_id in revived:
+        users_db[user_id]["lives"] = 1
+        columns.upsert(user_id, users_db[user_id])
+    users_to_kick = [uid for uid in users_to_kick if uid in users_db and uid not in revived]
+
+    kick_results = await asyncio.gather(*(_kick_user(context.bot, chat_id, uid) for uid in users_to_kick))
+
+    kicked = 0
+    for user_id, ok in zip(users_to_kick, kick_results):
+        if ok and user_id in users_db:
+            remove_user(user_id)
+            kicked += 1
+
+    if expired:
+        save_users()
+
+    logger.info(
+        "📋 Inactividad: %s usuarios caducados de %s, %s avisados, %s sin DM posible, "
+        "%s avisos fallidos, %s/%s expulsados.",
+        len(expired), len(users_db) + kicked,
+        notify_results.count('sent'),
+        notify_results.count('unreachable') + skipped_dm,
+        notify_results.count('error'),
+        kicked, len(users_to_kick),
+    )
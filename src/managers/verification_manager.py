@@ -1,7 +1,11 @@
+import logging
 from telegram.ext import ContextTypes
-from src.managers import user_manager
+from src.managers import user_manager, outbound_dispatcher
+from src.managers.update_processor import record_locks
 from src.config import settings
 
+logger = logging.getLogger(__name__)
+
 async def schedule_verification_start(context: ContextTypes.DEFAULT_TYPE, user_id: int, chat_id: int):
     """
     Inicia el proceso de verificación para un nuevo usuario.
@@ -10,7 +14,7 @@ async def schedule_verification_start(context: ContextTypes.DEFAULT_TYPE, user_i
     # Establecer estado inicial
     user_manager.set_user_status(user_id, "pending_presentation")
     
-    print(f"⏳ Iniciando verificación para usuario {user_id}. Timeout: {settings.PRESENTATION_TIMEOUT_MINUTES} min.")
+    logger.info("⏳ Iniciando verificación para usuario %s. Timeout: %s min.", user_id, settings.PRESENTATION_TIMEOUT_MINUTES)
 
     # Programar Job de Advertencia
     delay_sec = settings.PRESENTATION_TIMEOUT_MINUTES * 60
@@ -23,6 +27,7 @@ async def schedule_verification_start(context: ContextTypes.DEFAULT_TYPE, user_i
         data={"user_id": user_id, "chat_id": chat_id}
     )
 
+@outbound_dispatcher.background_job
 async def warning_job(context: ContextTypes.DEFAULT_TYPE):
     """
     Se ejecuta cuando expira el tiempo inicial. Advierte al usuario.
@@ -39,7 +44,7 @@ async def warning_job(context: ContextTypes.DEFAULT_TYPE):
     # Cambiamos estado a 'warned'
     user_manager.set_user_status(user_id, "warned")
     
-    print(f"⚠️ Advertencia de presentación enviada a {user_id}")
+    logger.info("⚠️ Advertencia de presentación enviada a %s", user_id)
 
     try:
         # Intentamos mencionar al usuario
@@ -54,7 +59,7 @@ async def warning_job(context: ContextTypes.DEFAULT_TYPE):
             parse_mode="Markdown"
         )
     except Exception as e:
-        print(f"🚨 Error enviando advertencia a {user_id}: {e}")
+        logger.error("🚨 Error enviando advertencia a %s: %s", user_id, e)
 
     # Programar Job de Baneo
     delay_sec = settings.PRESENTATION_WARNING_GRACE_MINUTES * 60
@@ -67,6 +72,7 @@ async def warning_job(context: ContextTypes.DEFAULT_TYPE):
         data={"user_id": user_id, "chat_id": chat_id}
     )
 
+@outbound_dispatcher.background_job
 async def ban_job(context: ContextTypes.DEFAULT_TYPE):
     """
     Se ejecuta si el usuario ignora la advertencia. Lo expulsa.
@@ -75,35 +81,40 @@ async def ban_job(context: ContextTypes.DEFAULT_TYPE):
     user_id = job.data["user_id"]
     chat_id = job.data["chat_id"]
     
-    current_status = user_manager.get_user_status(user_id)
-    if current_status != "warned":
-        return
+    # Mismo cerrojo que la aceptación de la presentación: o se verifica o se expulsa, nunca ambas
+    async with record_locks.hold(("user", user_id)):
+        current_status = user_manager.get_user_status(user_id)
+        if current_status != "warned":
+            return
+
+        logger.info("👢 Expulsando usuario %s por no presentarse.", user_id)
 
-    print(f"👢 Expulsando usuario {user_id} por no presentarse.")
+        try:
+            # Expulsar (Ban y Unban para que pueda volver más tarde si quiere)
+            await context.bot.ban_chat_member(chat_id, user_id)
+            await context.bot.unban_chat_member(chat_id, user_id)
+
+            # Opcional: Limpiar del user_manager si queremos que empiece de 0 si vuelve
+            if str(user_id) in user_manager.users_db:
+                user_manager.remove_user(user_id)
+                user_manager.save_users()
+        except Exception as e:
+            logger.error("🚨 Error al expulsar usuario %s: %s", user_id, e)
+            return
 
     try:
-        # Expulsar (Ban y Unban para que pueda volver más tarde si quiere)
-        await context.bot.ban_chat_member(chat_id, user_id)
-        await context.bot.unban_chat_member(chat_id, user_id) 
-        
         await context.bot.send_message(
             chat_id=chat_id,
             text=f"👋 Se acabó el tiempo. He expulsado al usuario por no presentarse. ¡Las normas son las normas, majo!"
         )
-        
-        # Opcional: Limpiar del user_manager si queremos que empiece de 0 si vuelve
-        if str(user_id) in user_manager.users_db:
-            del user_manager.users_db[str(user_id)]
-            user_manager.save_users()
-            
     except Exception as e:
-        print(f"🚨 Error al expulsar usuario {user_id}: {e}")
+        logger.error("🚨 Error anunciando la expulsión de %s: %s", user_id, e)
 
 def cancel_verification_jobs(context: ContextTypes.DEFAULT_TYPE, user_id: int):
     """
     Cancela cualquier tarea pendiente de advertencia o baneo para el usuario.
     """
-    print(f"✅ Cancelando jobs de verificación para {user_id}")
+    logger.info("✅ Cancelando jobs de verificación para %s", user_id)
     
     jobs_warn = context.job_queue.get_jobs_by_name(f"warn_{user_id}")
     for job in jobs_warn:
@@ -1,4 +1,5 @@
 # src/managers/word_game_manager.py
+import logging
 import json
 import os
 import random
@@ -7,32 +8,14 @@ import re
 from datetime import datetime
 from telegram.ext import ContextTypes
 
-from src.config import settings
+from src import tracing
+from src.config import settings, content
+from src.managers import outbound_dispatcher, activity_manager
+from src.managers.update_processor import record_locks
 
-game_data = {}
+logger = logging.getLogger(__name__)
 
-WORDS = [
-    "rioja",
-    "vino",
-    "amigo",
-    "fiesta",
-    "pintxo",
-    "botella",
-    "musica",
-    "cuadrilla",
-    "tardeo",
-    "verano",
-    "invierno",
-    "montana",
-    "playa",
-    "chuleton",
-    "torneo",
-    "cafe",
-    "helado",
-    "parque",
-    "futbol",
-    "pelota"
-]
+game_data = {}
 
 def load_word_game_data():
     """Carga el estado del juego desde el archivo JSON."""
@@ -41,17 +24,17 @@ def load_word_game_data():
         os.makedirs(os.path.dirname(settings.WORD_GAME_FILE), exist_ok=True)
         with open(settings.WORD_GAME_FILE, "r", encoding="utf-8") as f:
             game_data = json.load(f)
-        print(f"✅ Datos del juego de palabra cargados desde {settings.WORD_GAME_FILE}")
+        logger.info("✅ Datos del juego de palabra cargados desde %s", settings.WORD_GAME_FILE)
     except (FileNotFoundError, json.JSONDecodeError):
-        print(f"❌ No se encontró {settings.WORD_GAME_FILE} o está dañado. Se usarán datos vacíos.")
+        logger.warning("❌ No se encontró %s o está dañado. Se usarán datos vacíos.", settings.WORD_GAME_FILE)
         game_data = {}
 
 def save_word_game_data():
     """Guarda el estado del juego en el archivo JSON."""
     os.makedirs(os.path.dirname(settings.WORD_GAME_FILE), exist_ok=True)
-    with open(settings.WORD_GAME_FILE, "w", encoding="utf-8") as f:
+    with tracing.store_flush("word_game"), open(settings.WORD_GAME_FILE, "w", encoding="utf-8") as f:
         json.dump(game_data, f, indent=2, ensure_ascii=False)
-    print("💾 Datos del juego de palabra guardados.")
+    logger.debug("💾 Datos del juego de palabra guardados.")
 
 def is_game_active() -> bool:
     return bool(game_data.get("active"))
@@ -80,17 +63,33 @@ def is_correct_guess(text: str) -> bool:
         return False
     return normalize_guess(text) == normalize_guess(word)
 
+def claim_win(text: str) -> str | None:
+    """
+    Comprueba el intento y, si acierta, cierra la ronda en el mismo paso.
+    Devuelve la palabra al ganador y None a todos los demás: como no hay ningún
+    `await` entre comprobar y cerrar, dos aciertos simultáneos no pueden ganar ambos.
+    """
+    if not is_correct_guess(text):
+        return None
+    word = get_current_word()
+    set_game_state(False)
+    return word
+
 async def start_new_round(context: ContextTypes.DEFAULT_TYPE):
     chat_id = settings.GROUP_CHAT_ID
     if not chat_id:
-        print("❌ No se ha configurado GROUP_CHAT_ID. El juego no se iniciará.")
+        logger.error("❌ No se ha configurado GROUP_CHAT_ID. El juego no se iniciará.")
         return
 
-    if is_game_active():
-        print("ℹ️ Ya hay un juego activo. No se inicia una nueva ronda.")
-        return
+    # Entre comprobar y activar la ronda esperamos a Telegram: que no entren dos a la vez
+    async with record_locks.hold(("word_game",)):
+        if is_game_active():
+            logger.info("ℹ️ Ya hay un juego activo. No se inicia una nueva ronda.")
+            return
+        await _send_new_round(context, chat_id)
 
-    word = random.choice(WORDS)
+async def _send_new_round(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
+    word = random.choice(content.get("word_game_words"))
     spoiler_word = f"<span class=\"tg-spoiler\">{html.escape(word)}</span>"
     text = (
         "Juego de la palabra\n"
@@ -101,9 +100,9 @@ async def start_new_round(context: ContextTypes.DEFAULT_TYPE):
     try:
         message = await context.bot.send_message(chat_id=chat_id, text=text, parse_mode="HTML")
         set_game_state(True, word, message.message_id)
-        print(f"✅ Nueva ronda iniciada. Palabra: {word}")
+        logger.info("✅ Nueva ronda iniciada. Palabra: %s", word)
     except Exception as e:
-        print(f"🚨 Error enviando la palabra del juego: {e}")
+        logger.error("🚨 Error enviando la palabra del juego: %s", e)
 
 def finish_round():
     if not is_game_active():
@@ -111,11 +110,12 @@ def finish_round():
     set_game_state(False)
 
 def schedule_next_word_game(job_queue):
-    """Programa la siguiente ronda en un intervalo aleatorio (1-3h)."""
-    delay = random.randint(3600, 10800)
-    print(f"🎲 Próxima ronda del juego programada en {delay/60:.1f} minutos.")
+    """Programa la siguiente ronda en un intervalo aleatorio (1-3h), mejor si hay gente activa."""
+    delay = activity_manager.pick_delay(3600, 10800)
+    logger.info("🎲 Próxima ronda del juego programada en %.1f minutos.", delay/60)
     job_queue.run_once(word_game_job, delay)
 
+@outbound_dispatcher.background_job
 async def word_game_job(context: ContextTypes.DEFAULT_TYPE):
     await start_new_round(context)
     schedule_next_word_game(context.job_queue)
@@ -0,0 +1,285 @@
+# src/metrics.py
+"""
+Métricas al estilo Prometheus, sin dependencias nuevas.
+
+Hasta ahora lo único que teníamos eran los `print`. Aquí hay contadores,
+medidores e histogramas con etiquetas, y `render()` los devuelve en el formato
+de texto de Prometheus; `MetricsServer` los sirve en `GET /metrics`, solo en
+local (METRICS_HOST).
+
+Qué se mide:
+
+- Cada handler registrado en `main.py` y cada job (también los que se
+  programan sobre la marcha: incitación, juego, verificación): latencia y errores.
+- Cada update de principio a fin, y lo que espera su turno.
+- Las llamadas a la IA por tarea y las llamadas a Telegram por método.
+- Lo que tarda en escribirse cada almacén.
+- Los aciertos de las cachés (contenido, índice de documentos, reserva de temas
+  y clasificador local de presentaciones) y el tamaño de las colas.
+- El retraso del bucle de eventos y sus bloqueos (`src/loop_monitor.py`).
+
+Está pensado para el camino caliente: las etiquetas se pasan como argumentos
+posicionales y observar un valor es una búsqueda en un dict y un `bisect`.
+`benchmarks/bench_metrics.py` mide lo que cuesta por update.
+"""
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable
+
+from telegram.ext import ApplicationHandlerStop, JobQueue
+
+from src.config import settings
+
+# Si se desactiva (METRICS_ENABLED=false), no se envuelve nada y el procesador no mide
+enabled = settings.METRICS_ENABLED
+
+# Segundos: de 1 ms a 30 s, que cubre desde un mensaje normal hasta una respuesta lenta de la IA
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRY: list["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 registry: list | None = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        if registry is not None:
+            registry.append(self)
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 registry: list | None = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels) -> float:
+        return self.values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{self._labels(labels)} {_format_value(value)}" for labels, value in self.values.items()]
+
+
+class Gauge(_Metric):
+    """Valor que sube y baja. Con `set_function` se calcula al pedir las métricas."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 registry: list | None = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.values: dict[tuple, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, *labels):
+        self.values[labels] = value
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def samples(self) -> list[str]:
+        values = dict(self.values)
+        if self._function is not None:
+            try:
+                values[()] = self._function()
+            except Exception:
+                pass  # Una métrica que falla no debe tumbar el resto
+        return [f"{self.name}{self._labels(labels)} {_format_value(value)}" for labels, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS, registry: list | None = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+        # etiquetas -> [cuenta de cada cubo (sin acumular)..., cuenta por encima del último, suma]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, *labels)
+
+    def count(self, *labels) -> int:
+        series = self.series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+def render(registry: list | None = None) -> str:
+    """Todas las métricas en el formato de texto de Prometheus."""
+    return "\n".join(metric.render() for metric in (REGISTRY if registry is None else registry)) + "\n"
+
+
+# --- Métricas del bot ---
+
+UPDATE_SECONDS = Histogram("nimex_update_duration_seconds", "Tiempo de proceso de cada update (todos sus handlers).")
+UPDATE_WAIT_SECONDS = Histogram("nimex_update_wait_seconds", "Espera de cada update por su turno (misma clave o sin hueco).")
+UPDATES_IN_FLIGHT = Gauge("nimex_updates_in_flight", "Updates admitidos que aún no han terminado.")
+
+HANDLER_SECONDS = Histogram("nimex_handler_duration_seconds", "Latencia de cada handler.", ("handler",))
+HANDLER_ERRORS = Counter("nimex_handler_errors_total", "Excepciones que escapan de cada handler.", ("handler",))
+
+JOB_SECONDS = Histogram("nimex_job_duration_seconds", "Duración de cada ejecución de un job.", ("job",))
+JOB_ERRORS = Counter("nimex_job_errors_total", "Excepciones que escapan de cada job.", ("job",))
+JOB_QUEUE_SIZE = Gauge("nimex_job_queue_jobs", "Jobs programados en la JobQueue.")
+
+AI_SECONDS = Histogram("nimex_ai_request_duration_seconds", "Latencia de cada llamada a la IA.", ("task",))
+AI_ERRORS = Counter("nimex_ai_errors_total", "Llamadas a la IA que han fallado.", ("task",))
+
+API_SECONDS = Histogram("nimex_telegram_api_duration_seconds", "Latencia de cada llamada a la Bot API.", ("method",))
+API_ERRORS = Counter("nimex_telegram_api_errors_total", "Llamadas a la Bot API que han fallado.", ("method",))
+API_RETRY_AFTER = Counter("nimex_telegram_api_retry_after_total", "Respuestas 429 (RetryAfter) de Telegram.", ("method",))
+OUTBOUND_QUEUE_DEPTH = Gauge("nimex_outbound_queue_depth", "Llamadas salientes esperando en el despachador.")
+
+STORE_FLUSH_SECONDS = Histogram("nimex_store_flush_duration_seconds", "Tiempo de escritura de cada almacén.", ("store",))
+
+LOOP_LAG_SECONDS = Histogram("nimex_event_loop_lag_seconds", "Retraso de cada latido del bucle de eventos.",
+                             buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_STALLS = Counter("nimex_event_loop_stalls_total", "Bloqueos del bucle por encima del umbral, por línea culpable.", ("site",))
+
+CACHE_REQUESTS = Counter("nimex_cache_requests_total", "Consultas a cada caché (result=hit|miss).", ("cache", "result"))
+
+
+# --- Instrumentación de handlers y jobs ---
+
+def callback_name(callback) -> str:
+    """`modulo.funcion` (sin el paquete): corto pero sin ambigüedades (hay dos `save_job`)."""
+    module = getattr(callback, "__module__", "") or ""
+    return f"{module.rsplit('.', 1)[-1]}.{getattr(callback, '__name__', type(callback).__name__)}"
+
+
+def instrument_handler(callback):
+    """Envuelve el callback de un handler para medir su latencia y contar sus errores."""
+    if getattr(callback, "_instrumented", False):
+        return callback
+    name = callback_name(callback)
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        start = perf_counter()
+        try:
+            return await callback(update, context)
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            HANDLER_ERRORS.inc(name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(perf_counter() - start, name)
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def instrument_job(callback):
+    """Igual que `instrument_handler`, para jobs. Conserva `__name__` (es el nombre del job por defecto)."""
+    if getattr(callback, "_instrumented", False):
+        return callback
+    name = callback_name(callback)
+
+    @functools.wraps(callback)
+    async def wrapper(context):
+        start = perf_counter()
+        try:
+            return await callback(context)
+        except Exception:
+            JOB_ERRORS.inc(name)
+            raise
+        finally:
+            JOB_SECONDS.observe(perf_counter() - start, name)
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def instrument_handlers(app):
+    """Envuelve todos los handlers ya registrados en la aplicación."""
+    for handlers in app.handlers.values():
+        for handler in handlers:
+            handler.callback = instrument_handler(handler.callback)
+
+
+class InstrumentedJobQueue(JobQueue):
+    """JobQueue que envuelve cada callback al programarlo, así se miden también los jobs dinámicos."""
+    __slots__ = ()
+
+    def run_once(self, callback, *args, **kwargs):
+        return super().run_once(instrument_job(callback), *args, **kwargs)
+
+    def run_repeating(self, callback, *args, **kwargs):
+        return super().run_repeating(instrument_job(callback), *args, **kwargs)
+
+    def run_daily(self, callback, *args, **kwargs):
+        return super().run_daily(instrument_job(callback), *args, **kwargs)
+
+    def run_monthly(self, callback, *args, **kwargs):
+        return super().run_monthly(instrument_job(callback), *args, **kwargs)
+
+    def run_custom(self, callback, *args, **kwargs):
+        return super().run_custom(instrument_job(callback), *args, **kwargs)
+
+
+def make_job_queue() -> JobQueue | None:
+    """La JobQueue de la aplicación (None si falta APScheduler, igual que hace PTB)."""
+    try:
+        return InstrumentedJobQueue() if enabled else JobQueue()
+    except RuntimeError:
+        return None
@@ -0,0 +1,200 @@
+# src/profiler.py
+"""
+Perfilado bajo demanda del proceso en marcha (comando /profile), sin reiniciar.
+
+Tres modos, todos durante una ventana de N segundos:
+
+- `cpu`: cProfile. Todo el bot corre en el hilo del bucle de eventos, así que
+  activarlo desde ahí recoge cada update y cada job de la ventana. Es exacto
+  pero frena el bot mientras dura.
+- `sample`: un hilo aparte toma la pila del bucle cada
+  PROFILE_SAMPLE_INTERVAL_MS. Apenas molesta, así que sirve con el bot a plena
+  carga. Guarda las pilas colapsadas (formato de flamegraph.pl y speedscope).
+- `mem`: diferencia entre dos instantáneas de tracemalloc, al principio y al
+  final. Dice qué líneas han reservado memoria en la ventana.
+
+Los artefactos (.pstats, pilas y resúmenes de texto con los N primeros) van a
+PROFILE_DIR. `run()` devuelve además un resumen corto para mandar por privado.
+Solo puede haber un perfilado a la vez.
+"""
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import traceback
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from src.config import settings
+from src.loop_monitor import PROJECT_ROOT, is_project_frame, short_frame
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cpu", "sample", "mem")
+# Líneas del resumen corto (el de texto completo lleva PROFILE_TOP_N)
+SUMMARY_LINES = 5
+
+# Modo del perfilado en curso (None si no hay ninguno)
+active: str | None = None
+
+
+def claim(mode: str) -> bool:
+    """Reserva el perfilador. Devuelve False si ya hay otro perfilado en marcha."""
+    global active
+    if active is not None:
+        return False
+    active = mode
+    return True
+
+
+def _where(filename: str, lineno: int, name: str = "") -> str:
+    if filename.startswith(PROJECT_ROOT) and "site-packages" not in filename:
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    elif filename != "~":
+        filename = os.path.basename(filename)
+    return f"{filename}:{lineno} ({name})" if name else f"{filename}:{lineno}"
+
+
+def _write(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+# --- cProfile ---
+
+async def _profile_cpu(seconds: float, top: int, base: str) -> tuple[list[str], list[str]]:
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile.disable()
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats("cumulative").print_stats(top)
+    stats.sort_stats("tottime").print_stats(top)
+    paths = [f"{base}.pstats", f"{base}.txt"]
+    await asyncio.to_thread(stats.dump_stats, paths[0])
+    await asyncio.to_thread(_write, paths[1], stream.getvalue())
+
+    # Lo que más tiempo propio ha gastado (sin contar el bucle esperando en select)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    summary = [
+        f"{_where(*func)}: {tt * 1000:.0f} ms propios, {ct * 1000:.0f} ms en total ({nc} llamadas)"
+        for func, (cc, nc, tt, ct, callers) in rows
+        if "select" not in func[2]
+    ][:SUMMARY_LINES]
+    return summary, paths
+
+
+# --- Muestreo ---
+
+def _is_idle(frame) -> bool:
+    """El bucle está esperando eventos (nada que hacer), no trabajando."""
+    return frame.f_code.co_name in ("select", "poll", "epoll") and "selectors" in frame.f_code.co_filename
+
+
+def _sample_loop(thread_id: int, stop: threading.Event, interval: float, stacks: Counter, counts: dict):
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            continue
+        counts["total"] += 1
+        if _is_idle(frame):
+            counts["idle"] += 1
+            continue
+        frames = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)
+        frames.reverse()
+        stacks[";".join(short_frame(f) for f in frames)] += 1
+        for f in reversed(frames):
+            if is_project_frame(f.filename):
+                counts["sites"][short_frame(f)] += 1
+                break
+
+
+async def _profile_sample(seconds: float, top: int, base: str) -> tuple[list[str], list[str]]:
+    stacks: Counter = Counter()
+    counts = {"total": 0, "idle": 0, "sites": Counter()}
+    stop = threading.Event()
+    sampler = threading.Thread(
+        target=_sample_loop,
+        args=(threading.get_ident(), stop, settings.PROFILE_SAMPLE_INTERVAL_MS / 1000, stacks, counts),
+        name="profiler-sampler",
+        daemon=True,
+    )
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        await asyncio.to_thread(sampler.join)
+
+    total = counts["total"] or 1
+    busy = total - counts["idle"]
+    sites = counts["sites"].most_common(top)
+    lines = [f"Muestras: {counts['total']} (ocupado {busy / total:.0%})", "", "Líneas propias con más muestras:"]
+    lines += [f"{count:>7} {count / total:>6.1%}  {site}" for site, count in sites]
+    paths = [f"{base}.collapsed", f"{base}.txt"]
+    await asyncio.to_thread(_write, paths[0], "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+    await asyncio.to_thread(_write, paths[1], "\n".join(lines) + "\n")
+
+    summary = [f"Bucle ocupado el {busy / total:.0%} del tiempo ({counts['total']} muestras)"]
+    summary += [f"{site}: {count / total:.1%}" for site, count in sites[:SUMMARY_LINES]]
+    return summary, paths
+
+
+# --- Memoria ---
+
+async def _profile_memory(seconds: float, top: int, base: str) -> tuple[list[str], list[str]]:
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    path = f"{base}.txt"
+    await asyncio.to_thread(_write, path, "\n".join(str(stat) for stat in diff[:top]) + "\n")
+
+    summary = []
+    for stat in diff[:SUMMARY_LINES]:
+        frame = stat.traceback[0]
+        summary.append(f"{_where(frame.filename, frame.lineno)}: "
+                       f"{stat.size_diff / 1024:+.0f} KB ({stat.count_diff:+} bloques)")
+    return summary, [path]
+
+
+_PROFILERS = {"cpu": _profile_cpu, "sample": _profile_sample, "mem": _profile_memory}
+
+
+async def run(mode: str, seconds: float, top: int | None = None) -> dict:
+    """
+    Perfila durante `seconds` y guarda los artefactos en PROFILE_DIR.
+    Devuelve {"mode", "seconds", "summary": [líneas], "files": [rutas]}.
+    Si no se ha reservado antes con `claim`, lo reserva ahora.
+    """
+    global active
+    if mode not in _PROFILERS:
+        raise ValueError(f"Modo de perfilado desconocido: {mode}")
+    if active != mode and not claim(mode):
+        raise RuntimeError(f"Ya hay un perfilado en marcha ({active})")
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(settings.PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{mode}")
+        summary, files = await _PROFILERS[mode](seconds, top or settings.PROFILE_TOP_N, base)
+    finally:
+        active = None
+    logger.info("🔬 Perfilado '%s' de %g s guardado en %s.*", mode, seconds, base)
+    return {"mode": mode, "seconds": seconds, "summary": summary, "files": files}
@@ -0,0 +1,288 @@
+# src/tracing.py
+"""
+Trazas ligeras: en qué se ha ido el tiempo de cada update.
+
+Cada update abre un span raíz (en `KeyedUpdateProcessor`) y dentro cuelgan
+spans hijos:
+
+- uno por cada handler que se ejecuta (uno por grupo como mucho);
+- cada ida y vuelta a Gemini y cada herramienta en `process_user_prompt`;
+- cada escritura de un almacén;
+- cada llamada a la Bot API, también las que salen por los workers del
+  despachador.
+
+El span actual viaja en una `ContextVar`, así que no hay que pasarlo de mano en
+mano. Fuera de un update (jobs, arranque) no hay traza y `span()` no hace nada.
+
+Muestreo: crear los spans es barato y se hace siempre. Lo caro (serializar y
+escribir) solo ocurre para una fracción TRACING_SAMPLE_RATE de las trazas y
+para todas las que tardan más de TRACING_SLOW_MS, que son las que interesan.
+La exportación va en un hilo aparte:
+
+- `jsonl` (por defecto): un span por línea en TRACING_FILE, que hace de
+  colector local;
+- `otlp`: lotes en OTLP/HTTP JSON a TRACING_OTLP_ENDPOINT (un colector de
+  OpenTelemetry, Jaeger, Tempo...).
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import urllib.request
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import time_ns
+
+from telegram.ext import ApplicationHandlerStop
+
+from src.config import settings
+from src import log, metrics
+from src.metrics import callback_name
+
+logger = logging.getLogger(__name__)
+
+enabled = settings.TRACING_ENABLED
+
+_current: ContextVar["Span | None"] = ContextVar("nimex_current_span", default=None)
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans", "sampled")
+
+    def __init__(self, sampled: bool):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: list[Span] = []
+        self.sampled = sampled
+
+
+class Span:
+    """Un tramo con nombre y atributos. Se usa como bloque `with` (lo hace el span actual)."""
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end", "attributes", "error", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent_id: str | None, attributes: dict):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.error: str | None = None
+        self.end = 0
+        self.start = time_ns()
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # ApplicationHandlerStop es control de flujo de PTB, no un error
+        if exc_type is not None and not issubclass(exc_type, ApplicationHandlerStop):
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.finish()
+        _current.reset(self._token)
+        return False
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        self.end = time_ns()
+        self.trace.spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class RootSpan(Span):
+    """Span raíz de una traza: al cerrarse decide si la traza se exporta."""
+    __slots__ = ()
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        slow = settings.TRACING_SLOW_MS and self.duration_ms >= settings.TRACING_SLOW_MS
+        if self.trace.sampled or slow:
+            exporter.export(self.trace.spans)
+        return False
+
+
+# Lo que devuelven `trace` y `span` cuando no hay nada que medir
+_NO_SPAN = nullcontext()
+
+
+def current() -> Span | None:
+    """El span activo en este contexto (None si no hay traza)."""
+    return _current.get()
+
+
+def trace(name: str, **attributes):
+    """Abre una traza nueva con su span raíz (bloque `with`). Al cerrarla, se exporta si toca."""
+    if not enabled:
+        return _NO_SPAN
+    return RootSpan(Trace(random.random() < settings.TRACING_SAMPLE_RATE), name, None, attributes)
+
+
+def span(name: str, parent: Span | None = None, **attributes):
+    """Span hijo del actual (o de `parent`), como bloque `with`. Sin traza activa no hace nada."""
+    parent = parent or _current.get()
+    if parent is None:
+        return _NO_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+@contextmanager
+def store_flush(store: str):
+    """Mide (métricas) y traza la escritura de un almacén."""
+    with metrics.STORE_FLUSH_SECONDS.time(store), span("store.flush", store=store):
+        yield
+
+
+# --- Instrumentación de handlers ---
+
+def trace_handler(callback, group: int):
+    """Envuelve el callback de un handler para abrir un span por cada ejecución."""
+    name = f"handler {callback_name(callback)}"
+
+    async def wrapper(update, context):
+        with span(name, group=group):
+            return await callback(update, context)
+
+    wrapper.__name__ = getattr(callback, "__name__", "handler")
+    wrapper.__module__ = getattr(callback, "__module__", None)
+    wrapper.__wrapped__ = callback
+    return wrapper
+
+
+def trace_handlers(app):
+    """Envuelve todos los handlers ya registrados en la aplicación."""
+    for group, handlers in app.handlers.items():
+        for handler in handlers:
+            handler.callback = trace_handler(handler.callback, group)
+
+
+# --- Exportación ---
+
+class _BackgroundExporter:
+    """Recibe trazas terminadas y las escribe desde un hilo, sin bloquear el bucle."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def export(self, spans: list[Span]):
+        self._queue.put(spans)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            # Se agrupa todo lo que haya en la cola en una sola escritura
+            batches = [self._queue.get()]
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [s for spans in batches for s in spans]
+            try:
+                self.write(batch)
+            except Exception as e:
+                logger.warning("⚠️ No se pudieron exportar %s spans: %s", len(batch), e, extra=log.every(60))
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Espera a que se haya escrito todo lo pendiente (al apagar y en las pruebas)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def write(self, batch: list[Span]):
+        raise NotImplementedError
+
+
+class JsonlExporter(_BackgroundExporter):
+    def __init__(self, path: str, max_bytes: int):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def write(self, batch: list[Span]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Rotación sencilla: al pasar del tamaño máximo, el archivo pasa a .1
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in batch)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(batch: list[Span]) -> dict:
+    """Lote de spans en el formato JSON de OTLP/HTTP (`/v1/traces`)."""
+    spans = []
+    for s in batch:
+        otlp = {
+            "traceId": s.trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start),
+            "endTimeUnixNano": str(s.end),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            otlp["parentSpanId"] = s.parent_id
+        spans.append(otlp)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "nimex-chatbot"}}]},
+        "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": spans}],
+    }]}
+
+
+class OtlpExporter(_BackgroundExporter):
+    def __init__(self, endpoint: str):
+        super().__init__()
+        self.endpoint = endpoint
+
+    def write(self, batch: list[Span]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(to_otlp(batch), default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+
+def _make_exporter() -> _BackgroundExporter:
+    if settings.TRACING_EXPORTER == "otlp":
+        return OtlpExporter(settings.TRACING_OTLP_ENDPOINT)
+    return JsonlExporter(settings.TRACING_FILE, settings.TRACING_FILE_MAX_MB * 1024 * 1024)
+
+
+exporter = _make_exporter()
@@ -0,0 +1,256 @@
+# src/webhook_server.py
+"""
+Servidor HTTP mínimo (asyncio puro) para recibir los updates por webhook.
+
+PTB trae su propio servidor de webhooks, pero depende de tornado; este cubre
+justo lo que necesitamos sin dependencias nuevas:
+
+- `POST <WEBHOOK_PATH>`: comprueba la cabecera `X-Telegram-Bot-Api-Secret-Token`
+  (obligatoria: sin WEBHOOK_SECRET el servidor no arranca en modo webhook),
+  descarta los updates repetidos (Telegram reenvía si tardamos en contestar) y
+  los deja en la `update_queue` de la aplicación sin esperar a procesarlos.
+  Telegram recibe el 200 en cuanto el update está en la cola.
+- `GET /health`: estado del bot para el healthcheck de docker-compose. Funciona
+  también en modo polling (entonces el POST responde 404).
+
+`MetricsServer` sirve aparte `GET /metrics` (las métricas de `src/metrics.py` en
+formato Prometheus), en METRICS_HOST:METRICS_PORT, que por defecto solo escucha
+en local: nombres de handlers, errores y colas no deben quedar a la vista de
+internet junto al webhook.
+
+`WebhookTestClient` permite mandar updates sintéticos por HTTP desde tests y
+benchmarks, sin pasar por Telegram.
+"""
+import asyncio
+import hmac
+import json
+import logging
+from collections import OrderedDict
+from time import monotonic
+
+from telegram import Update
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+MAX_BODY_BYTES = 1024 * 1024
+DEDUPE_SIZE = 10_000
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+class JSONHTTPServer:
+    """
+    Servidor HTTP/1.1 con keep-alive (lo que usan Telegram y httpx) que contesta
+    JSON (o texto plano si `route()` devuelve un str). Las subclases implementan `route()`.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080):
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Con port=0 el sistema elige uno libre (tests y benchmarks)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def route(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict | str]:
+        raise NotImplementedError
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"ok": False}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.route(method, target.split("?", 1)[0], headers, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass  # Petición mal formada o cliente que se va: cerramos sin más
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: dict | str, keep_alive: bool):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+
+class WebhookServer(JSONHTTPServer):
+    def __init__(self, update_queue: asyncio.Queue, bot=None, secret_token: str = "",
+                 host: str = "0.0.0.0", port: int = 8080, path: str | None = "/telegram",
+                 dedupe_size: int = DEDUPE_SIZE):
+        if path and not secret_token:
+            # Sin secreto, cualquiera que conozca la URL podría colar updates falsos
+            raise ValueError("🚨 El modo webhook necesita WEBHOOK_SECRET.")
+        super().__init__(host, port)
+        self.update_queue = update_queue
+        self.bot = bot
+        self.secret_token = secret_token
+        self.path = path  # None: solo /health (modo polling)
+        self.dedupe_size = dedupe_size
+        self.ready = False  # Lo activa main.py cuando la aplicación ya está en marcha
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._started_at = monotonic()
+        self.stats = {"received": 0, "duplicates": 0, "rejected": 0, "invalid": 0}
+
+    async def start(self):
+        await super().start()
+        logger.info("🌐 Servidor HTTP escuchando en %s:%s (webhook: %s).", self.host, self.port, self.path or 'desactivado')
+
+    # --- Lógica de cada petición ---
+
+    def _is_duplicate(self, update_id: int) -> bool:
+        """LRU de los últimos `dedupe_size` update_id vistos."""
+        if update_id in self._seen:
+            self._seen.move_to_end(update_id)
+            return True
+        return False
+
+    def _remember(self, update_id: int):
+        self._seen[update_id] = None
+        if len(self._seen) > self.dedupe_size:
+            self._seen.popitem(last=False)
+
+    def health(self) -> tuple[int, dict]:
+        body = {
+            "status": "ok" if self.ready else "starting",
+            "uptime_seconds": round(monotonic() - self._started_at),
+            "queue_size": self.update_queue.qsize(),
+            **self.stats,
+        }
+        return (200 if self.ready else 503), body
+
+    def handle_update(self, headers: dict, body: bytes) -> tuple[int, dict]:
+        if not hmac.compare_digest(
+            headers.get(SECRET_HEADER, "").encode(), self.secret_token.encode()
+        ):
+            self.stats["rejected"] += 1
+            return 403, {"ok": False}
+        try:
+            data = json.loads(body)
+            update_id = int(data["update_id"])
+            if self._is_duplicate(update_id):
+                self.stats["duplicates"] += 1
+                return 200, {"ok": True, "duplicate": True}
+            update = Update.de_json(data, self.bot)
+        except Exception:
+            # Cualquier fallo al interpretarlo es un 400, y el update_id no cuenta como visto
+            self.stats["invalid"] += 1
+            return 400, {"ok": False}
+
+        self.update_queue.put_nowait(update)
+        # Solo ahora: si algo falla antes, el reenvío de Telegram no se toma por repetido
+        self._remember(update_id)
+        self.stats["received"] += 1
+        return 200, {"ok": True}
+
+    async def route(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict | str]:
+        if path == "/health":
+            return self.health() if method == "GET" else (405, {"ok": False})
+        if self.path and path == self.path:
+            return self.handle_update(headers, body) if method == "POST" else (405, {"ok": False})
+        return 404, {"ok": False}
+
+
+class MetricsServer(JSONHTTPServer):
+    """Solo `GET /metrics`, en un puerto aparte del webhook."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9090):
+        super().__init__(host, port)
+
+    async def start(self):
+        await super().start()
+        logger.info("📊 Métricas en http://%s:%s/metrics", self.host, self.port)
+
+    async def route(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict | str]:
+        if path != "/metrics":
+            return 404, {"ok": False}
+        return (200, metrics.render()) if method == "GET" else (405, {"ok": False})
+
+
+class WebhookTestClient:
+    """Cliente HTTP/1.1 de una sola conexión persistente para mandar updates sintéticos."""
+
+    def __init__(self, host: str, port: int, path: str = "/telegram", secret_token: str = ""):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token
+        self._reader = self._writer = None
+
+    async def __aenter__(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._writer.close()
+
+    async def request(self, method: str, path: str, payload: dict | None = None,
+                      headers: dict | None = None) -> tuple[int, dict | str]:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        length, content_type = 0, ""
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "content-type":
+                content_type = value.strip()
+        body = await self._reader.readexactly(length) if length else b""
+        if content_type.startswith("text/"):
+            return status, body.decode()
+        return status, json.loads(body) if body else {}
+
+    async def post_update(self, update: dict) -> tuple[int, dict]:
+        headers = {"Content-Type": "application/json"}
+        if self.secret_token:
+            headers["X-Telegram-Bot-Api-Secret-Token"] = self.secret_token
+        return await self.request("POST", self.path, update, headers)
+
+    async def health(self) -> tuple[int, dict]:
+        return await self.request("GET", "/health")
+
+    async def metrics(self) -> tuple[int, str]:
+        return await self.request("GET", "/metrics")
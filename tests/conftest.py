@@ -15,10 +15,18 @@ def setup_and_teardown_test_data(monkeypatch):
 
     test_agenda_file = os.path.join(test_data_dir, "agenda.json")
     test_users_file = os.path.join(test_data_dir, "users.json")
+    test_debate_pool_file = os.path.join(test_data_dir, "debate_pool.json")
+    test_leaderboard_file = os.path.join(test_data_dir, "leaderboard.json")
+    test_activity_file = os.path.join(test_data_dir, "activity.npz")
 
     # 2. Usar monkeypatch para que los managers usen las rutas de prueba
     monkeypatch.setattr("src.config.settings.AGENDA_FILE", test_agenda_file)
     monkeypatch.setattr("src.config.settings.USERS_FILE", test_users_file)
+    monkeypatch.setattr("src.config.settings.DEBATE_POOL_FILE", test_debate_pool_file)
+    monkeypatch.setattr("src.config.settings.LEADERBOARD_FILE", test_leaderboard_file)
+    monkeypatch.setattr("src.config.settings.ACTIVITY_FILE", test_activity_file)
+    # Las trazas no se exportan salvo en las pruebas que lo piden (no ensucian data/)
+    monkeypatch.setattr("src.config.settings.TRACING_SAMPLE_RATE", 0.0)
 
     # 3. El código de la prueba se ejecuta aquí (gracias a 'yield')
     yield
@@ -28,3 +36,9 @@ def setup_and_teardown_test_data(monkeypatch):
         os.remove(test_agenda_file)
     if os.path.exists(test_users_file):
         os.remove(test_users_file)
+    if os.path.exists(test_debate_pool_file):
+        os.remove(test_debate_pool_file)
+    if os.path.exists(test_leaderboard_file):
+        os.remove(test_leaderboard_file)
+    if os.path.exists(test_activity_file):
+        os.remove(test_activity_file)
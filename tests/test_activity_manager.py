@@ -0,0 +1,89 @@
+# tests/test_activity_manager.py
+import numpy as np
+import pytest
+from time import time
+from unittest.mock import AsyncMock, MagicMock
+
+from src.managers import activity_manager
+from src.managers.activity_manager import HOUR, RingSeries, UserHourlyMatrix
+from src.handlers import stats_handlers
+
+@pytest.fixture(autouse=True)
+def fresh_activity():
+    activity_manager.reset()
+    yield
+    activity_manager.reset()
+
+def test_ring_series_olvida_lo_antiguo():
+    """Al avanzar el tiempo, las casillas que dan la vuelta se vacían."""
+    series = RingSeries(slots=4, slot_seconds=10)
+    series.last_slot = 0
+    series.add(5)
+    series.add(25, amount=2)
+    assert series.values(now=39).tolist() == [1, 0, 2, 0]
+    # Cuatro casillas después, el primer mensaje ya no está
+    assert series.values(now=45).tolist() == [0, 2, 0, 0]
+    assert series.values(now=1000).sum() == 0
+
+def test_matriz_de_usuarios_crece_y_se_limpia_por_horas():
+    matrix = UserHourlyMatrix(hours=3)
+    matrix.last_hour = 100
+    for i in range(70):  # Más filas de las reservadas al principio
+        matrix.add(str(i), 100 * HOUR)
+    matrix.add("5", 101 * HOUR, amount=3)
+
+    current = matrix.matrix(now=101 * HOUR)
+    assert current.shape == (70, 3)
+    assert current[5].tolist() == [0, 1, 3]
+    assert matrix.matrix(now=103 * HOUR)[5].tolist() == [3, 0, 0]
+
+def test_consultas_y_persistencia():
+    """Los más activos, los que se alejan y el guardado compacto en .npz."""
+    now = time()
+    two_weeks_ago = now - 10 * 24 * HOUR
+    for _ in range(5):
+        activity_manager.record_message(1, two_weeks_ago)  # Antes activo...
+    activity_manager.record_message(2, now)
+    activity_manager.record_message(2, now)
+
+    assert activity_manager.messages_in_last(24) == 2
+    assert activity_manager.top_active_users(5) == [("2", 2)]
+    assert activity_manager.drifting_users(5) == [("1", 5, 0)]
+
+    activity_manager.save()
+    activity_manager.reset()
+    activity_manager.load()
+    assert activity_manager.messages_in_last(24) == 2
+    assert activity_manager.drifting_users(5) == [("1", 5, 0)]
+
+def test_pick_delay_favorece_las_horas_activas(monkeypatch):
+    """Si el grupo solo habla a una hora, los retrasos caen en esa hora."""
+    profile = np.zeros(24)
+    monkeypatch.setattr(activity_manager, "hourly_profile", lambda days=14: profile)
+    assert 3600 <= activity_manager.pick_delay(3600, 10800) <= 10800  # Sin histórico: uniforme
+
+    from datetime import datetime
+    target_hour = (datetime.now().hour + 2) % 24
+    profile[target_hour] = 50
+    delays = [activity_manager.pick_delay(3600, 10800) for _ in range(50)]
+    now = datetime.now()
+    hours = [(now.hour + (now.minute * 60 + d) // HOUR) % 24 for d in delays]
+    assert hours.count(target_hour) > 40
+
+@pytest.mark.asyncio
+async def test_stats_solo_para_admins(monkeypatch):
+    update = MagicMock()
+    update.effective_user.id = 7
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    monkeypatch.setattr("src.managers.group_manager.is_group_admin", AsyncMock(return_value=False))
+
+    await stats_handlers.stats_command(update, context)
+    update.message.reply_text.assert_awaited_once_with("⚠️ Solo los administradores pueden usar este comando.")
+
+    monkeypatch.setattr("src.managers.group_manager.is_group_admin", AsyncMock(return_value=True))
+    activity_manager.record_message(7)
+    update.message.reply_text.reset_mock()
+    await stats_handlers.stats_command(update, context)
+    text = update.message.reply_text.await_args.args[0]
+    assert "Estadísticas del grupo" in text and "últimas 24 h: 1" in text
@@ -0,0 +1,70 @@
+# tests/test_catchup_manager.py
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.config import levels
+from src.managers import activity_manager, catchup_manager, user_manager
+
+class BacklogBot:
+    """Simula la cola de getUpdates de Telegram: `offset` confirma lo anterior."""
+    def __init__(self, updates, fail_after_calls=None):
+        self.queue = list(updates)
+        self.calls = []
+        self.fail_after_calls = fail_after_calls
+
+    async def get_updates(self, offset=None, limit=100, timeout=0):
+        self.calls.append(offset)
+        if self.fail_after_calls is not None and len(self.calls) > self.fail_after_calls:
+            raise RuntimeError("red caída")
+        if offset is not None:
+            self.queue = [u for u in self.queue if u.update_id >= offset]
+        return self.queue[:limit]
+
+def _message_update(update_id, user_id, when, text="hola", chat_type="supergroup"):
+    user = SimpleNamespace(id=user_id, first_name=f"U{user_id}", username=None, is_bot=False)
+    message = SimpleNamespace(text=text, from_user=user, date=when, chat=SimpleNamespace(type=chat_type))
+    return SimpleNamespace(update_id=update_id, message=message)
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    activity_manager.reset()
+    yield
+    activity_manager.reset()
+
+@pytest.mark.asyncio
+async def test_catch_up_agrega_xp_con_cooldown_y_confirma_la_cola():
+    start = datetime.now(timezone.utc) - timedelta(hours=2)
+    # 250 mensajes del mismo usuario, uno cada 10 s, más uno de otra persona y un update sin texto
+    updates = [_message_update(i, 3001, start + timedelta(seconds=10 * i)) for i in range(250)]
+    updates.append(_message_update(250, 3002, start))
+    updates.append(SimpleNamespace(update_id=251, message=None))
+    bot = BacklogBot(updates)
+
+    with patch("src.managers.user_manager.save_users") as mock_save:
+        summary = await catchup_manager.catch_up(bot)
+        mock_save.assert_called_once()
+
+    assert summary["updates"] == 252
+    assert summary["used"] == 251
+    assert bot.queue == []  # Todo confirmado: el polling no lo volverá a recibir
+
+    # 2500 s de mensajes con cooldown de 60 s -> un premio cada 70 s (múltiplo de 10 > 60)
+    expected_awards = len(range(0, 2500, 70))
+    assert user_manager.users_db["3001"]["xp"] == expected_awards * levels.XP_PER_MESSAGE
+    assert user_manager.users_db["3002"]["xp"] == levels.XP_PER_MESSAGE
+    assert activity_manager.messages_in_last(24) == 251
+
+@pytest.mark.asyncio
+async def test_catch_up_no_cuenta_paginas_sin_confirmar():
+    """Si la red falla a medias, la página no confirmada se deja para el polling normal."""
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    updates = [_message_update(i, 3100 + i, start) for i in range(150)]
+    bot = BacklogBot(updates, fail_after_calls=2)
+
+    with patch("src.managers.user_manager.save_users"):
+        summary = await catchup_manager.catch_up(bot)
+
+    assert summary["used"] == 100
+    assert len(bot.queue) == 50
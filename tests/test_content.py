@@ -0,0 +1,68 @@
+# tests/test_content.py
+import json
+import os
+import pytest
+
+from src.config import content, levels
+
+@pytest.fixture
+def words_file(tmp_path, monkeypatch):
+    """Apunta la lista de palabras del juego a un archivo temporal."""
+    path = tmp_path / "words.json"
+    path.write_text(json.dumps(["vino", "rioja"]), encoding="utf-8")
+    monkeypatch.setattr("src.config.settings.WORD_GAME_WORDS_FILE", str(path))
+    content.reload_all()
+    yield path
+    monkeypatch.undo()
+    content.reload_all()
+
+def _touch_later(path, seconds=10):
+    """Adelanta el mtime para que el cambio se note aunque ocurra en el mismo segundo."""
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + seconds))
+
+def test_compiled_template_equivale_a_format():
+    template = content.CompiledTemplate("¡Hola {mentions}! Tema: *{topic}* ({n:03d})", {"mentions", "topic", "n"})
+    values = {"mentions": "@ana", "topic": "¿Playa?", "n": 7}
+    assert template.render(**values) == template.source.format(**values)
+    assert template.fields == {"mentions", "topic", "n"}
+
+def test_template_parser_descarta_huecos_desconocidos():
+    """Las plantillas con huecos desconocidos o incompletos se descartan al cargar."""
+    parse = content.template_parser({"mentions", "topic"}, {"mentions", "topic"})
+    templates = parse(["{mentions}: {topic}", "{mentions}: {tema}", "Solo {topic}"])
+    assert [t.source for t in templates] == ["{mentions}: {topic}"]
+
+    with pytest.raises(ValueError):
+        parse(["{nada}"])
+
+def test_contenido_se_recarga_si_cambia_el_archivo(words_file):
+    assert content.get("word_game_words") == ["vino", "rioja"]
+
+    words_file.write_text(json.dumps(["chuleton"]), encoding="utf-8")
+    _touch_later(words_file)
+    content.check_for_changes(force=True)
+
+    assert content.get("word_game_words") == ["chuleton"]
+
+def test_contenido_invalido_mantiene_la_version_anterior(words_file):
+    words_file.write_text("[roto", encoding="utf-8")
+    _touch_later(words_file)
+    content.check_for_changes(force=True)
+
+    assert content.get("word_game_words") == ["vino", "rioja"]
+
+def test_nombres_de_nivel_reconstruyen_las_tablas(tmp_path, monkeypatch):
+    """Al cambiar los nombres de nivel, las tablas de niveles se regeneran."""
+    path = tmp_path / "levels.json"
+    path.write_text(json.dumps({"1": "Uno", "4": "Cuatro"}), encoding="utf-8")
+    monkeypatch.setattr("src.config.settings.LEVEL_NAMES_FILE", str(path))
+    try:
+        content.reload_all()
+        assert levels.LEVEL_NAMES == {1: "Uno", 4: "Cuatro"}
+        assert levels.get_next_level_xp(1) == levels.calculate_xp_for_level(4)
+        assert levels.get_level_for_xp(10**6) == (4, "Cuatro")
+    finally:
+        monkeypatch.undo()
+        content.reload_all()
+    assert levels.LEVEL_NAMES[2] == "Probando un 'Roto'"
@@ -95,3 +95,82 @@ def test_get_and_set_last_debate_message_id():
         # Probamos a borrarlo
         debate_manager.set_last_debate_message_id(None)
         assert debate_manager.get_last_debate_message_id() is None
+
+# --- Reserva de temas ---
+
+@pytest.fixture
+def empty_pool():
+    """Deja la reserva de temas vacía y sin histórico."""
+    debate_manager.debate_data = {}
+    debate_manager.load_topic_pool()
+    yield
+
+def test_topic_similarity_detecta_casi_duplicados():
+    """Las variaciones mínimas de un tema se detectan como duplicadas."""
+    from src.managers.topic_similarity import TopicIndex
+    index = TopicIndex()
+    index.add("¿La tortilla de patata: con o sin cebolla?")
+    assert index.is_near_duplicate("¿Tortilla de patata con o sin cebolla?")
+    assert not index.is_near_duplicate("¿Nesquik o Cola Cao?")
+
+def test_add_topic_to_pool_rechaza_temas_repetidos(empty_pool):
+    """Un tema parecido a uno ya usado no entra en la reserva."""
+    debate_manager._mark_topic_used("¿Pizza con piña: sí o no?")
+    assert debate_manager.add_topic_to_pool("- ¿Pizza con piña, sí o no?") is False
+    assert debate_manager.add_topic_to_pool("1. ¿Café solo o cortado?") is True
+    assert debate_manager.topic_pool["pool"] == ["¿Café solo o cortado?"]
+
+def test_temas_fuera_del_historico_se_pueden_repetir(empty_pool, monkeypatch):
+    """Al recortar el histórico, los temas que salen dejan de estar bloqueados."""
+    monkeypatch.setattr(debate_manager, "TOPIC_HISTORY_LIMIT", 2)
+    debate_manager._mark_topic_used("¿Pizza con piña: sí o no?")
+    debate_manager._mark_topic_used("¿Playa o montaña?")
+    debate_manager._mark_topic_used("¿Gatos o perros?")
+
+    assert debate_manager.topic_pool["history"] == ["¿Playa o montaña?", "¿Gatos o perros?"]
+    assert len(debate_manager._topic_index) == 2
+    assert debate_manager.add_topic_to_pool("¿Pizza con piña, sí o no?") is True
+    assert debate_manager.add_topic_to_pool("¿Playa o montaña?") is False
+
+@pytest.mark.asyncio
+async def test_refill_topic_pool_descarta_duplicados(empty_pool):
+    """El relleno añade temas nuevos y descarta los parecidos entre sí."""
+    response = "¿Cine o teatro?\n¿Cine o teatro?\n¿Madrugar los domingos: sí o no?"
+    with patch('src.managers.debate_manager.generate_text', new_callable=AsyncMock) as mock_generate_text:
+        mock_generate_text.return_value = response
+        added = await debate_manager.refill_topic_pool(target_size=2)
+
+    assert added == 2
+    assert debate_manager.topic_pool["pool"] == ["¿Cine o teatro?", "¿Madrugar los domingos: sí o no?"]
+
+@pytest.mark.asyncio
+async def test_take_debate_topic_usa_la_reserva(empty_pool):
+    """El debate sale de la reserva sin llamar a la IA y queda en el histórico."""
+    debate_manager.add_topic_to_pool("¿Cine o teatro?")
+    with patch('src.managers.debate_manager.generate_text', new_callable=AsyncMock) as mock_generate_text:
+        topic = await debate_manager.take_debate_topic()
+        mock_generate_text.assert_not_called()
+
+    assert topic == "¿Cine o teatro?"
+    assert debate_manager.topic_pool["pool"] == []
+    assert "¿Cine o teatro?" in debate_manager.topic_pool["history"]
+
+@pytest.mark.asyncio
+async def test_take_debate_topic_sin_reserva_genera_en_vivo(empty_pool):
+    """Con la reserva vacía se genera en vivo, evitando repetir temas de respaldo."""
+    backup_topics = debate_manager.get_backup_topics()
+    debate_manager._mark_topic_used(backup_topics[0])
+    with patch('src.managers.debate_manager.generate_text', new_callable=AsyncMock) as mock_generate_text:
+        mock_generate_text.return_value = backup_topics[0]
+        topic = await debate_manager.take_debate_topic()
+
+    assert topic != backup_topics[0]
+    assert topic in backup_topics
+
+def test_is_idle_hour(monkeypatch):
+    monkeypatch.setattr("src.config.settings.DEBATE_POOL_IDLE_HOURS", (2, 7))
+    assert debate_manager.is_idle_hour(3)
+    assert not debate_manager.is_idle_hour(12)
+    monkeypatch.setattr("src.config.settings.DEBATE_POOL_IDLE_HOURS", (23, 5))
+    assert debate_manager.is_idle_hour(0)
+    assert not debate_manager.is_idle_hour(6)
@@ -0,0 +1,60 @@
+# tests/test_docs_manager.py
+import json
+import os
+import pytest
+
+from src.managers import docs_manager
+from src import ai_tools
+
+@pytest.fixture
+def docs_dir(tmp_path, monkeypatch):
+    """Crea una documentación de prueba en un directorio temporal."""
+    (tmp_path / "manual.md").write_text(
+        "# Manual\n\nIntro del bot.\n\n"
+        "## Sistema de vidas\n\nCada miembro empieza con 3 vidas por inactividad.\n\n"
+        "## Agenda\n\nUsa /agenda para crear un evento.\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "normas.md").write_text(
+        "*¡Normas!* 📜\n\nIntro.\n\n*1\\. Respeto* 😎\n\n*   *Cero spam:* nada de publicidad\\.\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr("src.config.settings.DOCS_DIR", str(tmp_path))
+    monkeypatch.setattr("src.config.settings.DOCS_FILES", ["manual.md", "normas.md"])
+    docs_manager.build_index()
+    return tmp_path
+
+def test_split_sections_por_encabezados():
+    """Verifica que se separa por encabezados markdown y por líneas en negrita."""
+    sections = docs_manager.split_sections("normas.md", "*Título* 📜\nA\n\n*2\\. Otro*\nB\n*   *punto:* C\n")
+    assert [s["title"] for s in sections] == ["Título", "2. Otro"]
+    assert "punto" in sections[1]["content"]
+
+def test_search_devuelve_la_seccion_relevante(docs_dir):
+    """Verifica que la búsqueda prioriza la sección que habla del tema."""
+    results = docs_manager.search("¿cómo funcionan las vidas?", top_k=1)
+    assert len(results) == 1
+    assert results[0]["seccion"] == "Sistema de vidas"
+    assert results[0]["archivo"] == "manual.md"
+
+def test_search_sin_coincidencias(docs_dir):
+    assert docs_manager.search("zzzz") == []
+
+def test_indice_se_reconstruye_si_cambia_el_mtime(docs_dir, monkeypatch):
+    """Verifica que un cambio en disco se refleja tras la comprobación de mtime."""
+    path = docs_dir / "manual.md"
+    path.write_text("## Juego de la palabra\n\nAdivina la palabra y gana puntos.\n", encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    monkeypatch.setattr(docs_manager, "_last_mtime_check", 0.0)
+
+    results = docs_manager.search("palabra puntos")
+    assert results and results[0]["seccion"] == "Juego de la palabra"
+
+def test_tools_usan_el_indice(docs_dir):
+    """Verifica las herramientas expuestas a la IA."""
+    assert "Sistema de vidas" in ai_tools.read_documentation_file("manual.md")
+    assert "error" in json.loads(ai_tools.read_documentation_file("no_existe.md"))
+
+    results = json.loads(ai_tools.buscar_en_documentacion("spam publicidad"))
+    assert results[0]["archivo"] == "normas.md"
@@ -0,0 +1,93 @@
+# tests/test_fake_bot_api.py
+import asyncio
+import pytest
+import pytest_asyncio
+from telegram import Bot
+from telegram.error import BadRequest, RetryAfter
+
+import main
+from src.config import settings
+from benchmarks.fake_bot_api import FakeBotAPI
+
+TOKEN = "123456:TEST"
+
+
+@pytest_asyncio.fixture
+async def api():
+    api = FakeBotAPI()
+    await api.start()
+    yield api
+    await api.stop()
+
+
+@pytest_asyncio.fixture
+async def bot(api):
+    bot = Bot(TOKEN, base_url=f"{api.base_url}/bot")
+    async with bot:
+        yield bot
+
+
+@pytest.mark.asyncio
+async def test_envia_y_registra_las_llamadas(api, bot):
+    message = await bot.send_message(chat_id=-100, text="¡Aúpa!")
+    await bot.pin_chat_message(chat_id=-100, message_id=message.message_id)
+
+    assert message.text == "¡Aúpa!"
+    sent = api.calls_to("sendMessage")
+    assert len(sent) == 1 and sent[0].params["chat_id"] == -100
+    assert api.calls_to("pinChatMessage")[0].params["message_id"] == message.message_id
+
+
+@pytest.mark.asyncio
+async def test_429_y_errores_inyectados(api, bot):
+    api.flood("sendMessage", retry_after=3, times=1)
+    with pytest.raises(RetryAfter) as excinfo:
+        await bot.send_message(chat_id=-100, text="uno")
+    assert excinfo.value.retry_after == 3
+    # Solo la primera: la siguiente ya pasa
+    await bot.send_message(chat_id=-100, text="dos")
+
+    api.fail("banChatMember", description="Bad Request: user is an administrator of the chat")
+    with pytest.raises(BadRequest):
+        await bot.ban_chat_member(chat_id=-100, user_id=5)
+
+
+@pytest.mark.asyncio
+async def test_get_updates_sigue_el_guion(api, bot):
+    api.feed(*({"message": {"message_id": i, "date": 0, "chat": {"id": 1, "type": "private"}, "text": f"m{i}"}}
+               for i in range(3)))
+
+    first = await bot.get_updates(limit=2, timeout=0)
+    assert [u.message.text for u in first] == ["m0", "m1"]
+    rest = await bot.get_updates(offset=first[-1].update_id + 1, timeout=0)
+    assert [u.message.text for u in rest] == ["m2"]
+    assert await bot.get_updates(offset=rest[-1].update_id + 1, timeout=0) == ()
+
+
+@pytest.mark.asyncio
+async def test_la_aplicacion_funciona_sin_red(api, monkeypatch):
+    """De extremo a extremo: polling contra la API falsa y respuesta del handler de /start."""
+    monkeypatch.setattr(settings, "TELEGRAM_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "TELEGRAM_BASE_URL", api.base_url)
+    app = main.build_application(with_jobs=False, rate_limiter=False)
+
+    api.feed({"message": {
+        "message_id": 1, "date": 0, "text": "/start",
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Ana"},
+        "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+    }})
+
+    async with app:
+        await app.start()
+        await app.updater.start_polling(poll_interval=0, timeout=1)
+        for _ in range(100):
+            if api.calls_to("sendMessage"):
+                break
+            await asyncio.sleep(0.05)
+        await app.updater.stop()
+        await app.stop()
+
+    reply = api.calls_to("sendMessage")
+    assert reply and reply[0].params["chat_id"] == 42
+    assert "Nimex" in reply[0].params["text"]
@@ -0,0 +1,89 @@
+# tests/test_leaderboard_manager.py
+import random
+import pytest
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from src.managers import leaderboard_manager, user_manager
+from src.managers.leaderboard_manager import IndexableSkipList, Leaderboard
+from src.handlers import ranking_handlers
+
+@pytest.fixture(autouse=True)
+def fresh_leaderboards():
+    leaderboard_manager.load({})
+    yield
+    leaderboard_manager.load({})
+
+def test_skip_list_coincide_con_una_lista_ordenada():
+    """Inserciones, borrados, posiciones y recorridos coinciden con ordenar a mano."""
+    rng = random.Random(3)
+    skip = IndexableSkipList(seed=1)
+    reference = []
+    for _ in range(500):
+        key = (rng.randint(0, 50), rng.randint(0, 10_000))
+        if key in reference:
+            continue
+        skip.insert(key)
+        reference.append(key)
+    for key in rng.sample(reference, 200):
+        skip.remove(key)
+        reference.remove(key)
+    reference.sort()
+
+    assert len(skip) == len(reference)
+    assert skip.iter_from(0, len(reference)) == reference
+    assert skip.iter_from(37, 5) == reference[37:42]
+    for i in (0, 17, len(reference) - 1):
+        assert skip.index(reference[i]) == i
+
+def test_leaderboard_top_y_posicion():
+    board = Leaderboard()
+    for uid, score in [("a", 10), ("b", 30), ("c", 20)]:
+        board.set_score(uid, score)
+    board.add("a", 25)
+
+    assert board.top(2) == [("a", 35), ("b", 30)]
+    assert board.rank("c") == (3, 20)
+    board.remove("b")
+    assert board.rank("c") == (2, 20)
+    assert board.rank("b") is None
+
+def test_ventana_semanal_resta_los_dias_caducados(monkeypatch):
+    """Lo ganado hace más de 7 días sale de la semana pero sigue en el mes y en el total."""
+    today = date(2026, 1, 10)
+    monkeypatch.setattr(leaderboard_manager, "_today", lambda: today)
+    leaderboard_manager.load({})
+
+    leaderboard_manager.record("xp", "1", 50, total=50)
+    today = date(2026, 1, 14)
+    leaderboard_manager.record("xp", "2", 20, total=20)
+    assert leaderboard_manager.top("xp", "semana") == [("1", 50), ("2", 20)]
+
+    today = date(2026, 1, 18)
+    assert leaderboard_manager.top("xp", "semana") == [("2", 20)]
+    assert leaderboard_manager.rank("xp", "1", "mes") == (1, 50)
+    assert leaderboard_manager.rank("xp", "1", "total") == (1, 50)
+
+    # Los contadores diarios sobreviven a un reinicio
+    leaderboard_manager._dirty = True
+    leaderboard_manager.save()
+    leaderboard_manager.load({"1": {"xp": 50}, "2": {"xp": 20}})
+    assert leaderboard_manager.top("xp", "semana") == [("2", 20)]
+    assert leaderboard_manager.top("xp", "mes") == [("1", 50), ("2", 20)]
+
+def test_ranking_se_actualiza_con_user_manager():
+    """Los puntos del juego entran en el ranking y /ranking muestra al ganador."""
+    user_manager.update_user_activity(SimpleNamespace(id=901, first_name="Ganadora", username=None))
+    user_manager.add_points(901, 10)
+
+    assert leaderboard_manager.rank("points", 901) == (1, 10)
+    text = ranking_handlers.build_ranking_text("points", "semana", 901)
+    assert "Ganadora" in text and "10 puntos" in text
+
+    user_manager.remove_user(901)
+    assert leaderboard_manager.rank("points", 901) is None
+
+def test_parse_ranking_args():
+    assert ranking_handlers.parse_ranking_args(["puntos", "mes"]) == ("points", "mes")
+    assert ranking_handlers.parse_ranking_args(["semanal"]) == ("xp", "semana")
+    assert ranking_handlers.parse_ranking_args([]) == ("xp", "total")
@@ -123,3 +123,33 @@ async def test_level_command_handler(mock_user):
         assert "Nivel 1: Turista en la Laurel" in call_kwargs["text"]
         assert "░░░░░░░░░░" in call_kwargs["text"]
         assert call_kwargs["parse_mode"] == "Markdown"
+
+# --- Pruebas de las tablas de niveles ---
+
+def test_busquedas_con_bisect_coinciden_con_la_tabla():
+    """Los umbrales exactos y los valores intermedios caen en el nivel correcto."""
+    ordered = sorted(levels.LEVEL_NAMES)
+    for previous, level in zip(ordered, ordered[1:]):
+        threshold = levels.calculate_xp_for_level(level)
+        assert levels.get_level_for_xp(threshold) == (level, levels.LEVEL_NAMES[level])
+        assert levels.get_level_for_xp(threshold - 1)[0] == previous
+        assert levels.get_next_level_xp(previous) == threshold
+    assert levels.get_level_for_xp(0) == (1, levels.LEVEL_NAMES[1])
+    assert levels.get_next_level_xp(ordered[-1]) is None
+    assert levels.get_next_level_xp(-5) is None
+
+def test_apply_xp_curve_recoloca_a_todos():
+    """Al endurecer la curva, quien ya no llega a su umbral baja de nivel en una sola pasada."""
+    original = (levels.BASE_XP, levels.EXPONENT)
+    level_2_xp = levels.calculate_xp_for_level(2)
+    user_manager.users_db.update({
+        "1": {"xp": level_2_xp, "level": 2},
+        "2": {"xp": 0, "level": 1},
+    })
+    try:
+        with patch('src.managers.user_manager.save_users'):
+            changes = user_manager.apply_xp_curve(original[0] * 10, original[1])
+        assert changes == {"up": [], "down": [("1", 2, 1)]}
+        assert user_manager.users_db["1"]["level"] == 1
+    finally:
+        levels.set_xp_curve(*original)
@@ -0,0 +1,75 @@
+# tests/test_log.py
+import io
+import json
+import logging
+import pytest
+
+from src import log
+
+
+@pytest.fixture
+def output():
+    """Monta el logging sobre un buffer y deja el logger raíz como estaba."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    stream = io.StringIO()
+    yield stream
+    log.shutdown()
+    root.handlers, root.level = handlers, level
+    logging.getLogger("ruidoso").setLevel(logging.NOTSET)
+
+
+def _records(stream: io.StringIO) -> list[dict]:
+    log.shutdown()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_salida_json_con_campos_extra(output):
+    log.setup(level="INFO", fmt="json", levels="", stream=output)
+    logger = logging.getLogger("src.prueba")
+
+    logger.info("📮 Enviado a %s", 42, extra={"endpoint": "sendMessage"})
+    logger.debug("no se ve")
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("🚨 Falló")
+
+    first, second = _records(output)
+    assert first["level"] == "INFO" and first["logger"] == "src.prueba"
+    assert first["msg"] == "📮 Enviado a 42" and first["endpoint"] == "sendMessage"
+    assert second["level"] == "ERROR" and "ZeroDivisionError" in second["exc"]
+
+
+def test_every_limita_y_cuenta_los_omitidos(output, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(log, "monotonic", lambda: now[0])
+    log.setup(level="INFO", fmt="json", levels="", stream=output)
+    logger = logging.getLogger("src.prueba")
+
+    for retry in range(5):
+        logger.warning("⏳ Reintento %s", retry, extra=log.every(10))
+    now[0] += 11
+    logger.warning("⏳ Reintento %s", 5, extra=log.every(10))
+
+    records = _records(output)
+    assert [r["msg"] for r in records] == ["⏳ Reintento 0", "⏳ Reintento 5"]
+    assert records[1]["suppressed"] == 4
+    assert "rate_limit" not in records[0]
+
+
+def test_sample_y_niveles_por_modulo(output):
+    log.setup(level="INFO", fmt="json", levels="ruidoso=ERROR", stream=output)
+
+    logging.getLogger("src.prueba").info("descartado", extra=log.sample(0))
+    logging.getLogger("ruidoso").warning("tampoco")
+    logging.getLogger("ruidoso").error("este sí")
+
+    assert [r["msg"] for r in _records(output)] == ["este sí"]
+
+
+def test_parse_levels():
+    assert log.parse_levels("httpx=warning, src.managers=DEBUG,") == {
+        "httpx": logging.WARNING,
+        "src.managers": logging.DEBUG,
+    }
@@ -0,0 +1,75 @@
+# tests/test_loop_monitor.py
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src import loop_monitor
+from src.loop_monitor import LoopMonitor
+from src.handlers import diagnostics_handlers
+
+
+def guardado_bloqueante():
+    time.sleep(0.25)
+
+
+@pytest.mark.asyncio
+async def test_detecta_el_bloqueo_y_su_linea():
+    monitor = LoopMonitor(interval=0.01, threshold=0.08)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        guardado_bloqueante()
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["samples"] > 5
+    assert stats["stalls"] == 1
+    assert stats["max_ms"] >= 200
+    offender = stats["offenders"][0]
+    assert offender["site"].startswith("tests/test_loop_monitor.py:")
+    assert offender["site"].endswith("(guardado_bloqueante)")
+    assert any("test_detecta_el_bloqueo_y_su_linea" in frame for frame in offender["stack"])
+
+
+@pytest.mark.asyncio
+async def test_sin_bloqueos_no_hay_culpables():
+    monitor = LoopMonitor(interval=0.01, threshold=0.5)
+    monitor.start()
+    await asyncio.sleep(0.1)
+    monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 0 and stats["offenders"] == []
+    assert stats["p50_ms"] < 500
+    assert not monitor.running
+
+
+@pytest.mark.asyncio
+async def test_lag_solo_para_admins(monkeypatch):
+    update = MagicMock()
+    update.effective_user.id = 7
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    monkeypatch.setattr("src.managers.group_manager.is_group_admin", AsyncMock(return_value=False))
+
+    await diagnostics_handlers.lag_command(update, context)
+    update.message.reply_text.assert_awaited_once_with("⚠️ Solo los administradores pueden usar este comando.")
+
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    monkeypatch.setattr(loop_monitor, "monitor", monitor)
+    monkeypatch.setattr("src.managers.group_manager.is_group_admin", AsyncMock(return_value=True))
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        guardado_bloqueante()
+        await asyncio.sleep(0.03)
+        update.message.reply_text.reset_mock()
+        await diagnostics_handlers.lag_command(update, context)
+    finally:
+        monitor.stop()
+
+    text = update.message.reply_text.await_args.args[0]
+    assert "Bucle de eventos" in text and "guardado_bloqueante" in text
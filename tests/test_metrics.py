@@ -0,0 +1,77 @@
+# tests/test_metrics.py
+import pytest
+from telegram.ext import ApplicationBuilder, ApplicationHandlerStop
+
+import main
+from src import metrics
+
+
+def test_histograma_acumula_cubos():
+    registry = []
+    histogram = metrics.Histogram("t_seconds", "Prueba.", ("handler",), buckets=(0.1, 1.0), registry=registry)
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(3, "a")
+
+    lines = metrics.render(registry).splitlines()
+    assert 't_seconds_bucket{handler="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{handler="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{handler="a",le="+Inf"} 3' in lines
+    assert 't_seconds_sum{handler="a"} 3.55' in lines
+    assert 't_seconds_count{handler="a"} 3' in lines
+    assert histogram.count("a") == 3 and histogram.count("b") == 0
+
+
+def test_contador_y_medidor_con_etiquetas():
+    registry = []
+    counter = metrics.Counter("t_total", "Prueba.", ("cache", "result"), registry=registry)
+    gauge = metrics.Gauge("t_depth", "Prueba.", registry=registry)
+    counter.inc("con \"comillas\"", "hit")
+    counter.inc("con \"comillas\"", "hit", amount=2)
+    gauge.set_function(lambda: 1 / 0)  # Si falla, se omite sin romper el resto
+
+    text = metrics.render(registry)
+    assert 't_total{cache="con \\"comillas\\"",result="hit"} 3' in text
+    assert "# TYPE t_depth gauge" in text
+    assert counter.get("otra", "miss") == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_instrumentado_mide_y_propaga_errores():
+    async def falla(update, context):
+        raise ValueError("roto")
+
+    async def para(update, context):
+        raise ApplicationHandlerStop
+
+    wrapped = metrics.instrument_handler(falla)
+    name = metrics.callback_name(falla)
+    errors_before = metrics.HANDLER_ERRORS.get(name)
+    observed_before = metrics.HANDLER_SECONDS.count(name)
+
+    with pytest.raises(ValueError):
+        await wrapped(None, None)
+    with pytest.raises(ApplicationHandlerStop):
+        await metrics.instrument_handler(para)(None, None)
+
+    assert name == "test_metrics.falla"
+    assert metrics.HANDLER_ERRORS.get(name) == errors_before + 1
+    assert metrics.HANDLER_SECONDS.count(name) == observed_before + 1
+    # Detener la propagación no es un error
+    assert metrics.HANDLER_ERRORS.get(metrics.callback_name(para)) == 0
+    assert metrics.instrument_handler(wrapped) is wrapped
+
+
+def test_job_instrumentado_conserva_el_nombre():
+    async def send_daily_debate(context):
+        pass
+
+    assert metrics.instrument_job(send_daily_debate).__name__ == "send_daily_debate"
+
+
+def test_build_application_instrumenta_todos_los_handlers():
+    app = main.build_application(ApplicationBuilder().token("123:TEST"), with_jobs=False, rate_limiter=False)
+
+    handlers = [handler for group in app.handlers.values() for handler in group]
+    assert handlers
+    assert all(getattr(handler.callback, "_instrumented", False) for handler in handlers)
@@ -0,0 +1,101 @@
+# tests/test_outbound_dispatcher.py
+import asyncio
+import pytest
+from telegram.error import RetryAfter
+
+from src.managers import outbound_dispatcher
+from src.managers.outbound_dispatcher import OutboundDispatcher, TokenBucket
+
+
+async def _send(dispatcher, calls, chat_id, label, endpoint="sendMessage"):
+    async def callback():
+        calls.append(label)
+        return label
+    return await dispatcher.process_request(callback, (), {}, endpoint, {"chat_id": chat_id}, None)
+
+
+def test_token_bucket_espera_cuando_se_agota():
+    """Un cubo sin tokens indica cuánto falta para el siguiente envío."""
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.wait_time() == 0
+    bucket.consume()
+    bucket.consume()
+    assert 0 < bucket.wait_time() <= 1
+
+@pytest.mark.asyncio
+async def test_las_interactivas_adelantan_a_las_de_fondo():
+    """Con la cola llena, una respuesta interactiva sale antes que los envíos en segundo plano."""
+    dispatcher = OutboundDispatcher(workers=1)
+    await dispatcher.initialize()
+    calls = []
+    try:
+        # Bloqueamos al único worker para que se acumule la cola
+        gate = asyncio.Event()
+        async def blocker():
+            await gate.wait()
+        blocked = asyncio.create_task(dispatcher.process_request(blocker, (), {}, "getMe", {}, None))
+        await asyncio.sleep(0)
+
+        with outbound_dispatcher.background():
+            background = [asyncio.create_task(_send(dispatcher, calls, -100 - i, f"fondo{i}")) for i in range(3)]
+        interactive = asyncio.create_task(_send(dispatcher, calls, 42, "respuesta"))
+        await asyncio.sleep(0)
+        assert dispatcher.queue_depth() == 4
+
+        gate.set()
+        await asyncio.gather(blocked, interactive, *background)
+        assert calls[0] == "respuesta"
+    finally:
+        await dispatcher.shutdown()
+
+@pytest.mark.asyncio
+async def test_respeta_retry_after(monkeypatch):
+    """Si Telegram pide esperar, se reintenta y el llamador recibe el resultado final."""
+    monkeypatch.setattr(outbound_dispatcher, "RETRY_BACKOFF_BASE", 0)
+    dispatcher = OutboundDispatcher(workers=1)
+    await dispatcher.initialize()
+    attempts = []
+    try:
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RetryAfter(0.05)
+            return "ok"
+        result = await dispatcher.process_request(flaky, (), {}, "sendMessage", {"chat_id": -100}, None)
+        assert result == "ok"
+        stats = dispatcher.get_stats()
+        assert stats["retry_after"] == 1
+        assert stats["sent"] == 1
+        assert stats["send_latency"]["p50"] is not None
+    finally:
+        await dispatcher.shutdown()
+
+@pytest.mark.asyncio
+async def test_limite_por_chat_privado():
+    """En un chat privado no sale más de un mensaje por segundo; los demás chats no esperan."""
+    dispatcher = OutboundDispatcher(workers=2)
+    await dispatcher.initialize()
+    calls = []
+    try:
+        first = await _send(dispatcher, calls, 7, "privado1")
+        second = asyncio.create_task(_send(dispatcher, calls, 7, "privado2"))
+        other = await asyncio.wait_for(_send(dispatcher, calls, 8, "otro"), timeout=0.5)
+        assert (first, other) == ("privado1", "otro")
+        assert not second.done()
+        assert await asyncio.wait_for(second, timeout=2) == "privado2"
+    finally:
+        await dispatcher.shutdown()
+
+@pytest.mark.asyncio
+async def test_los_errores_llegan_al_llamador():
+    """Cualquier otro error se propaga tal cual y se contabiliza."""
+    dispatcher = OutboundDispatcher(workers=1)
+    await dispatcher.initialize()
+    try:
+        async def broken():
+            raise ValueError("boom")
+        with pytest.raises(ValueError):
+            await dispatcher.process_request(broken, (), {}, "sendMessage", {"chat_id": 1}, None)
+        assert dispatcher.get_stats()["failed"] == 1
+    finally:
+        await dispatcher.shutdown()
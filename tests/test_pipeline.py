@@ -0,0 +1,73 @@
+# tests/test_pipeline.py
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.handlers import pipeline
+from src.managers import user_manager
+
+def _update(text, user_id=5150, chat_type="supergroup"):
+    update = MagicMock()
+    update.effective_user = SimpleNamespace(id=user_id, first_name="Pipe", username=None, is_bot=False)
+    update.effective_chat = MagicMock(id=-100, type=chat_type)
+    update.message = AsyncMock()
+    update.message.text = text
+    update.message.entities = ()
+    return update
+
+@pytest.fixture
+def context():
+    context = MagicMock()
+    context.bot = AsyncMock()
+    context.bot.username = "NimexBot"
+    context.user_data = {}
+    return context
+
+@pytest.fixture(autouse=True)
+def stages():
+    """Sustituye las etapas pesadas por mocks para ver cuáles se ejecutan."""
+    pipeline.stage_timings.clear()
+    with patch("src.handlers.general_handlers.check_presentation", new_callable=AsyncMock) as presentation, \
+         patch("src.handlers.general_handlers.handle_mention", new_callable=AsyncMock) as mention, \
+         patch("src.handlers.word_game_handlers.handle_guess", new_callable=AsyncMock) as guess, \
+         patch("src.handlers.agenda_handlers.manejar_mensajes_de_texto", new_callable=AsyncMock) as agenda, \
+         patch("src.managers.user_manager.save_users"), \
+         patch("src.managers.word_game_manager.is_game_active", return_value=False) as game_active:
+        yield SimpleNamespace(presentation=presentation, mention=mention, guess=guess, agenda=agenda, game_active=game_active)
+    for user_id in (5150, 5151, 5152):
+        user_manager.remove_user(user_id)
+
+@pytest.mark.asyncio
+async def test_mensaje_normal_de_verificado_solo_actualiza_actividad(stages, context):
+    user_manager.update_user_activity(SimpleNamespace(id=5150, first_name="Pipe", username=None))
+    user_manager.set_user_status(5150, "verified")
+
+    await pipeline.handle_message(_update("qué tal el finde"), context)
+
+    for stage in (stages.presentation, stages.mention, stages.guess, stages.agenda):
+        stage.assert_not_called()
+    assert user_manager.users_db["5150"]["xp"] > 0
+    assert set(pipeline.get_stage_timings()) == {"ingest", "activity"}
+
+@pytest.mark.asyncio
+async def test_enruta_solo_a_las_etapas_que_aplican(stages, context):
+    user_manager.update_user_activity(SimpleNamespace(id=5151, first_name="Nuevo", username=None))
+    stages.game_active.return_value = True
+    context.user_data["estado"] = "esperando_nombre_evento"
+
+    await pipeline.handle_message(_update("hola @NimexBot", user_id=5151), context)
+
+    stages.presentation.assert_awaited_once()
+    stages.mention.assert_awaited_once()
+    stages.guess.assert_awaited_once()
+    stages.agenda.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_un_fallo_en_una_etapa_no_para_las_demas(stages, context):
+    stages.mention.side_effect = RuntimeError("boom")
+    context.user_data["estado"] = "esperando_nombre_evento"
+
+    await pipeline.handle_message(_update("@NimexBot ayuda", user_id=5152), context)
+
+    stages.agenda.assert_awaited_once()
+    assert pipeline.get_stage_timings()["mention"]["calls"] == 1
@@ -0,0 +1,135 @@
+# tests/test_presentation_classifier.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.managers import ai_manager, presentation_classifier
+from src.managers.ai_batcher import MicroBatcher
+from src.handlers import general_handlers
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    for key in presentation_classifier.stats:
+        presentation_classifier.stats[key] = 0
+    yield
+
+def test_classify_casos_claros():
+    """Los saludos se aceptan y el ruido se rechaza sin pasar por la IA."""
+    assert presentation_classifier.classify("hola!!")[0] == presentation_classifier.ACCEPT
+    assert presentation_classifier.classify("Aúpa, ¿qué tal?")[0] == presentation_classifier.ACCEPT
+    assert presentation_classifier.classify("t.me/canal")[0] == presentation_classifier.REJECT
+    assert presentation_classifier.classify("jajaja")[0] == presentation_classifier.REJECT
+    assert presentation_classifier.classify("xD")[0] == presentation_classifier.REJECT
+
+def test_classify_no_rechaza_saludos_cortos_ni_emojis():
+    """'hi' no es una risa y un saludo solo con emojis lo decide la IA."""
+    for text in ("hi", "he", "ha"):
+        assert presentation_classifier.classify(text)[0] != presentation_classifier.REJECT
+    assert presentation_classifier.classify("👋")[0] is None
+
+def test_train_separa_los_ejemplos():
+    """El modelo entrenado puntúa los positivos por encima de los negativos."""
+    model = presentation_classifier.train({"positivos": ["hola gente"], "negativos": ["ok vale"]}, epochs=50)
+    with patch.object(presentation_classifier, "_model", model):
+        assert presentation_classifier.predict_proba("hola gente") > presentation_classifier.predict_proba("ok vale")
+
+@pytest.mark.asyncio
+async def test_evaluate_presentation_no_llama_a_la_ia_si_es_claro():
+    """Un saludo claro se decide en local y no consume una llamada a Gemini."""
+    with patch("src.managers.ai_manager.settings.GEMINI_API_KEY", "fake"), \
+         patch.object(ai_manager.model, "generate_content_async", new_callable=AsyncMock) as mock_llm:
+        assert await ai_manager.evaluate_presentation("hola!!") is True
+        assert await ai_manager.evaluate_presentation("ok") is False
+        mock_llm.assert_not_called()
+
+    stats = presentation_classifier.get_stats()
+    assert stats["local_rate"] == 1.0
+
+@pytest.mark.asyncio
+async def test_evaluate_presentation_escala_los_ambiguos():
+    """Un texto ambiguo se envía a la IA y se registra el acuerdo con el modelo local."""
+    with patch("src.managers.ai_manager.settings.GEMINI_API_KEY", "fake"), \
+         patch.object(ai_manager.presentation_batcher, "window_seconds", 0.01), \
+         patch.object(presentation_classifier, "classify", return_value=(None, 0.7)), \
+         patch.object(ai_manager.model, "generate_content_async", new_callable=AsyncMock) as mock_llm:
+        mock_llm.return_value = MagicMock(text="SÍ")
+        assert await ai_manager.evaluate_presentation("me mola el vino") is True
+        mock_llm.assert_called_once()
+
+    stats = presentation_classifier.get_stats()
+    assert stats["escalated"] == 1
+    assert stats["llm_agree"] == 1
+
+@pytest.mark.asyncio
+async def test_check_presentation_evalua_mensajes_seguidos():
+    """Un mensaje que llega mientras se evalúa el anterior también se evalúa."""
+    release = asyncio.Event()
+
+    async def slow_evaluation(text):
+        await release.wait()
+        return False
+
+    update = MagicMock()
+    update.effective_user = MagicMock(id=999, is_bot=False)
+    update.message = AsyncMock()
+    update.message.text = "mmm"
+    context = MagicMock()
+
+    with patch("src.handlers.general_handlers.user_manager.is_verified", return_value=False), \
+         patch("src.handlers.general_handlers.ai_manager.evaluate_presentation", side_effect=slow_evaluation) as mock_eval:
+        first = asyncio.create_task(general_handlers.check_presentation(update, context))
+        await asyncio.sleep(0)
+        await general_handlers.check_presentation(update, context)
+        release.set()
+        await first
+
+    assert mock_eval.call_count == 2
+
+# --- Micro-batcher ---
+
+@pytest.mark.asyncio
+async def test_micro_batcher_agrupa_en_una_llamada():
+    """Los elementos que llegan dentro de la ventana se resuelven con una sola llamada."""
+    process_batch = AsyncMock(side_effect=lambda items: [len(i) for i in items])
+    process_single = AsyncMock()
+    batcher = MicroBatcher(process_batch, process_single, max_items=10, window_seconds=0.01)
+
+    results = await asyncio.gather(*(batcher.submit(t) for t in ["a", "bb", "ccc"]))
+
+    assert results == [1, 2, 3]
+    process_batch.assert_called_once_with(["a", "bb", "ccc"])
+    process_single.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_micro_batcher_respeta_el_maximo():
+    """Si se alcanza el máximo de elementos, el lote sale sin esperar a la ventana."""
+    process_batch = AsyncMock(side_effect=lambda items: items)
+    batcher = MicroBatcher(process_batch, AsyncMock(), max_items=2, window_seconds=10)
+
+    results = await asyncio.wait_for(asyncio.gather(batcher.submit(1), batcher.submit(2)), timeout=1)
+
+    assert results == [1, 2]
+
+@pytest.mark.asyncio
+async def test_micro_batcher_fallback_uno_a_uno():
+    """Si el lote falla, cada elemento se resuelve con una llamada individual."""
+    process_batch = AsyncMock(side_effect=RuntimeError("boom"))
+    process_single = AsyncMock(side_effect=lambda item: item * 10)
+    batcher = MicroBatcher(process_batch, process_single, max_items=10, window_seconds=0.01)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    assert results == [10, 20]
+    assert process_single.call_count == 2
+    assert batcher.stats["fallbacks"] == 1
+
+@pytest.mark.asyncio
+async def test_evaluate_presentations_batch_interpreta_la_respuesta():
+    """El prompt por lotes devuelve un resultado por texto, en orden."""
+    with patch.object(ai_manager.model, "generate_content_async", new_callable=AsyncMock) as mock_llm:
+        mock_llm.return_value = MagicMock(text='```json\n["SÍ", "NO"]\n```')
+        assert await ai_manager._evaluate_presentations_batch(["soy pepe", "mmm ok"]) == [True, False]
+
+        mock_llm.return_value = MagicMock(text='["SÍ"]')
+        with pytest.raises(ValueError):
+            await ai_manager._evaluate_presentations_batch(["soy pepe", "mmm ok"])
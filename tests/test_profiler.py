@@ -0,0 +1,109 @@
+# tests/test_profiler.py
+import asyncio
+import os
+import pytest
+from time import perf_counter
+from unittest.mock import AsyncMock, MagicMock
+
+from src import profiler
+from src.config import settings
+from src.handlers import diagnostics_handlers
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 1)
+    monkeypatch.setattr(profiler, "active", None)
+    return tmp_path
+
+
+def calculo_pesado(seconds: float):
+    end = perf_counter() + seconds
+    total = 0
+    while perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+async def _busy_while_profiling(mode: str) -> dict:
+    async def work():
+        await asyncio.sleep(0.02)
+        calculo_pesado(0.15)
+
+    task = asyncio.create_task(work())
+    result = await profiler.run(mode, 0.3)
+    await task
+    return result
+
+
+@pytest.mark.asyncio
+async def test_perfil_cpu(profile_dir):
+    result = await _busy_while_profiling("cpu")
+
+    assert [os.path.basename(path).split("-")[-1] for path in result["files"]] == ["cpu.pstats", "cpu.txt"]
+    assert all(os.path.exists(path) for path in result["files"])
+    assert any("calculo_pesado" in line for line in result["summary"])
+    assert profiler.active is None
+
+
+@pytest.mark.asyncio
+async def test_perfil_por_muestreo(profile_dir):
+    result = await _busy_while_profiling("sample")
+
+    assert result["summary"][0].startswith("Bucle ocupado")
+    assert "tests/test_profiler.py" in result["summary"][1] and "calculo_pesado" in result["summary"][1]
+    with open(result["files"][0], encoding="utf-8") as f:
+        assert "calculo_pesado" in f.read()
+
+
+@pytest.mark.asyncio
+async def test_diferencia_de_memoria(profile_dir):
+    kept = []
+
+    async def allocate():
+        await asyncio.sleep(0.01)
+        kept.append([bytearray(1024) for _ in range(2000)])
+
+    task = asyncio.create_task(allocate())
+    result = await profiler.run("mem", 0.1)
+    await task
+
+    assert "tests/test_profiler.py" in result["summary"][0]
+    assert os.path.exists(result["files"][0])
+
+
+@pytest.mark.asyncio
+async def test_solo_un_perfilado_a_la_vez():
+    assert profiler.claim("sample")
+    with pytest.raises(RuntimeError):
+        await profiler.run("cpu", 0.01)
+    result = await profiler.run("sample", 0.01)
+    assert result["mode"] == "sample" and profiler.active is None
+
+
+@pytest.mark.asyncio
+async def test_profile_solo_para_admins_y_resumen_por_privado(monkeypatch):
+    update = MagicMock()
+    update.effective_user.id = 7
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.bot.send_message = AsyncMock()
+    context.args = []
+    monkeypatch.setattr("src.managers.group_manager.is_group_admin", AsyncMock(return_value=False))
+
+    await diagnostics_handlers.profile_command(update, context)
+    update.message.reply_text.assert_awaited_once_with("⚠️ Solo los administradores pueden usar este comando.")
+
+    monkeypatch.setattr("src.managers.group_manager.is_group_admin", AsyncMock(return_value=True))
+    context.args = ["cpu", "9999"]
+    await diagnostics_handlers.profile_command(update, context)
+    assert "Uso:" in update.message.reply_text.await_args.args[0]
+
+    context.args = ["sample", "0.05"]
+    await diagnostics_handlers.profile_command(update, context)
+    report = context.application.create_task.call_args.args[0]
+    await report
+
+    message = context.bot.send_message.await_args.kwargs
+    assert message["chat_id"] == 7 and "Perfilado sample" in message["text"]
@@ -0,0 +1,54 @@
+# tests/test_simulator.py
+from datetime import datetime
+
+import pytest
+
+from src.managers import activity_manager, user_manager, word_game_manager
+from benchmarks.simulator import Simulator
+
+
+@pytest.fixture(autouse=True)
+def restore_stores():
+    """El simulador deja su población en memoria: se recargan los almacenes de prueba."""
+    yield
+    user_manager.load_users()
+    word_game_manager.load_word_game_data()
+    activity_manager.reset()
+
+
+def _without_timing(report: dict) -> dict:
+    report = dict(report)
+    report.pop("wall_seconds")
+    report["meta"] = {k: v for k, v in report["meta"].items() if k not in ("date", "commit")}
+    return report
+
+
+def test_simulacion_determinista():
+    first = Simulator(days=3, users=40, joins_per_day=4, seed=7).run()
+    second = Simulator(days=3, users=40, joins_per_day=4, seed=7).run()
+
+    assert _without_timing(first) == _without_timing(second)
+    assert first["messages"]["inbound"] > 0
+
+
+def test_tareas_diarias_y_verificacion():
+    report = Simulator(days=5, users=30, joins_per_day=6, seed=3).run()
+    runs = report["job_queue"]["runs"]
+
+    # Un debate al día (más el de arranque) y su desanclado cada noche
+    assert runs["main.send_daily_debate"] == 5
+    assert runs["main.unpin_daily_debate"] == 5
+    assert runs["user_manager.check_inactivity_job"] == 5
+    assert report["api_calls"]["pin_chat_message"] == 6
+    # Las altas que saludan sin presentarse acaban avisadas y expulsadas
+    assert runs.get("verification_manager.ban_job", 0) == report["population"]["banned_no_presentation"]
+    assert report["job_queue"]["peak_size"] > 0
+    assert not report["job_queue"]["errors"]
+
+
+def test_restaura_el_reloj_y_los_guardados():
+    save_users = user_manager.save_users
+    Simulator(days=1, users=10, joins_per_day=0).run()
+
+    assert user_manager.datetime is datetime
+    assert user_manager.save_users is save_users
@@ -0,0 +1,120 @@
+# tests/test_tracing.py
+import asyncio
+import json
+import time
+import pytest
+from types import SimpleNamespace
+
+from src import tracing
+from src.config import settings
+from src.managers.update_processor import KeyedUpdateProcessor
+from src.managers.outbound_dispatcher import OutboundDispatcher
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    """Exporta a un JSONL temporal y devuelve una función que lee los spans escritos."""
+    exporter = tracing.JsonlExporter(str(tmp_path / "traces.jsonl"), max_bytes=0)
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+
+    def read() -> list[dict]:
+        exporter.flush()
+        if not (tmp_path / "traces.jsonl").exists():
+            return []
+        return [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    return read
+
+
+def test_spans_anidados_y_errores(exported):
+    with tracing.trace("update", update_id=1) as root:
+        with tracing.span("handler", group=1):
+            with pytest.raises(ValueError):
+                with tracing.span("tool get_weather"):
+                    raise ValueError("sin red")
+        with tracing.span("store.flush", store="users"):
+            pass
+    with tracing.span("fuera de un update") as orphan:
+        assert orphan is None
+
+    spans = {s["name"]: s for s in exported()}
+    assert set(spans) == {"update", "handler", "tool get_weather", "store.flush"}
+    assert len({s["trace_id"] for s in spans.values()}) == 1
+    assert spans["update"]["parent_id"] is None and spans["update"]["span_id"] == root.span_id
+    assert spans["handler"]["parent_id"] == root.span_id
+    assert spans["tool get_weather"]["parent_id"] == spans["handler"]["span_id"]
+    assert spans["tool get_weather"]["error"] == "ValueError: sin red"
+    assert spans["handler"]["attributes"] == {"group": 1} and spans["handler"]["error"] is None
+
+
+def test_muestreo_guarda_las_lentas(exported, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "TRACING_SLOW_MS", 20)
+
+    with tracing.trace("rapida"):
+        pass
+    with tracing.trace("lenta"):
+        with tracing.span("ai.gemini"):
+            time.sleep(0.03)
+
+    assert [s["name"] for s in exported()] == ["ai.gemini", "lenta"]
+
+
+@pytest.mark.asyncio
+async def test_update_completo_con_handler_almacen_y_telegram(exported):
+    dispatcher = OutboundDispatcher()  # Sin workers: llamada directa
+
+    async def send_message(**kwargs):
+        return True
+
+    async def handler(update, context):
+        with tracing.store_flush("users"):
+            pass
+        await dispatcher.process_request(send_message, (), {}, "sendMessage", {"chat_id": 1}, None)
+
+    processor = KeyedUpdateProcessor(4)
+    update = SimpleNamespace(update_id=42, effective_user=SimpleNamespace(id=7), effective_chat=None)
+    await processor.do_process_update(update, tracing.trace_handler(handler, group=1)(update, None))
+
+    spans = {s["name"]: s for s in exported()}
+    root = spans["update"]
+    handler_span = spans["handler test_tracing.handler"]
+    assert root["attributes"]["update_id"] == 42
+    assert handler_span["parent_id"] == root["span_id"] and handler_span["attributes"]["group"] == 1
+    assert spans["store.flush"]["parent_id"] == handler_span["span_id"]
+    assert spans["telegram sendMessage"]["parent_id"] == handler_span["span_id"]
+
+
+@pytest.mark.asyncio
+async def test_span_de_telegram_desde_los_workers(exported):
+    dispatcher = OutboundDispatcher()
+    await dispatcher.initialize()
+
+    async def send_message(**kwargs):
+        return True
+
+    try:
+        with tracing.trace("update") as root:
+            await dispatcher.process_request(send_message, (), {}, "sendMessage", {"chat_id": 1}, None)
+    finally:
+        await dispatcher.shutdown()
+
+    telegram = next(s for s in exported() if s["name"] == "telegram sendMessage")
+    assert telegram["parent_id"] == root.span_id and telegram["attributes"]["attempt"] == 1
+
+
+def test_formato_otlp():
+    trace = tracing.Trace(sampled=True)
+    root = tracing.Span(trace, "update", None, {"update_id": 3})
+    child = tracing.Span(trace, "ai.gemini", root.span_id, {"round": 1, "ok": True})
+    child.error = "TimeoutError: "
+    child.finish()
+    root.finish()
+
+    spans = tracing.to_otlp(trace.spans)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["ai.gemini", "update"]
+    assert len(spans[1]["traceId"]) == 32 and len(spans[1]["spanId"]) == 16
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"] and "parentSpanId" not in spans[1]
+    assert spans[0]["status"]["code"] == 2
+    assert {"key": "round", "value": {"intValue": "1"}} in spans[0]["attributes"]
+    assert {"key": "ok", "value": {"boolValue": True}} in spans[0]["attributes"]
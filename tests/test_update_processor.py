@@ -0,0 +1,100 @@
+# tests/test_update_processor.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.managers import word_game_manager
+from src.managers.update_processor import KeyedLocks, KeyedUpdateProcessor, update_key
+
+
+def _update(user_id=None, chat_id=None):
+    user = SimpleNamespace(id=user_id) if user_id is not None else None
+    chat = SimpleNamespace(id=chat_id) if chat_id is not None else None
+    return SimpleNamespace(effective_user=user, effective_chat=chat)
+
+
+def test_clave_del_update():
+    """Se serializa por usuario y, si el update no trae usuario, por chat."""
+    assert update_key(_update(1, -100)) == ("user", 1)
+    assert update_key(_update(None, -100)) == ("chat", -100)
+    assert update_key(object()) is None
+
+
+@pytest.mark.asyncio
+async def test_mismo_usuario_en_orden_y_distintos_en_paralelo():
+    """Los updates de un usuario van de uno en uno y en orden; los de otros no esperan."""
+    processor = KeyedUpdateProcessor(max_concurrent_updates=8)
+    log = []
+    running = {"now": 0, "max": 0}
+
+    async def handler(user_id, n):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        log.append(("start", user_id, n))
+        await asyncio.sleep(0.01)
+        log.append(("end", user_id, n))
+        running["now"] -= 1
+
+    updates = [(uid, n) for n in range(3) for uid in (1, 2, 3)]
+    await asyncio.gather(*(processor.process_update(_update(uid, -100), handler(uid, n)) for uid, n in updates))
+
+    # Tres usuarios a la vez, nunca más (cada uno en fila)
+    assert running["max"] == 3
+    for uid in (1, 2, 3):
+        own = [event for event in log if event[1] == uid]
+        assert own == [(kind, uid, n) for n in range(3) for kind in ("start", "end")]
+    # Los cerrojos de usuario se liberan al terminar
+    assert len(processor.locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_un_usuario_pesado_no_bloquea_al_resto():
+    """Los mensajes en espera de un usuario no ocupan hueco de ejecución."""
+    processor = KeyedUpdateProcessor(max_concurrent_updates=2, max_pending_updates=32)
+    gate = asyncio.Event()
+    done = []
+
+    async def slow(n):
+        await gate.wait()
+        done.append(("pesado", n))
+
+    async def fast():
+        done.append("otro")
+
+    spam = [asyncio.create_task(processor.process_update(_update(1), slow(n))) for n in range(10)]
+    await asyncio.sleep(0)
+    await asyncio.wait_for(processor.process_update(_update(2), fast()), timeout=1)
+    assert done == ["otro"]
+
+    gate.set()
+    await asyncio.gather(*spam)
+    assert done[1:] == [("pesado", n) for n in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_keyed_locks_cuenta_esperas_y_limpia():
+    locks = KeyedLocks()
+    async with locks.hold("a"):
+        waiter = asyncio.create_task(_hold(locks, "a"))
+        await asyncio.sleep(0)
+        assert locks.locked("a")
+        assert locks.contended == 1
+    await waiter
+    assert len(locks) == 0
+
+
+async def _hold(locks, key):
+    async with locks.hold(key):
+        pass
+
+
+def test_solo_un_ganador_del_juego(monkeypatch):
+    """Comprobar y cerrar la ronda es un solo paso: el segundo acierto ya no gana."""
+    monkeypatch.setattr(word_game_manager, "save_word_game_data", lambda: None)
+    monkeypatch.setattr(word_game_manager, "game_data", {})
+    word_game_manager.set_game_state(True, "Rioja", 1)
+
+    assert word_game_manager.claim_win("¡rioja!") == "Rioja"
+    assert word_game_manager.claim_win("rioja") is None
+    assert not word_game_manager.is_game_active()
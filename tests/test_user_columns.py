@@ -0,0 +1,49 @@
+# tests/test_user_columns.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from src.managers import user_manager
+from src.managers.user_columns import UserColumns
+
+def _users():
+    now = datetime.now()
+    return {
+        "1": {"xp": 100, "points": 5, "level": 2, "lives": 3, "status": "verified", "last_seen": now.isoformat()},
+        "2": {"xp": 300, "points": 0, "level": 3, "lives": 1, "status": "warned", "last_seen": (now - timedelta(days=20)).isoformat()},
+        "3": {"xp": 50, "points": 9, "level": 2, "lives": 2, "status": "verified", "last_seen": now.isoformat()},
+    }
+
+def test_consultas_vectorizadas_coinciden_con_el_diccionario():
+    table = UserColumns(capacity=2)  # Fuerza a crecer
+    table.rebuild(_users())
+    cutoff = (datetime.now() - timedelta(days=7)).timestamp()
+
+    assert table.inactive_ids(cutoff) == ["2"]
+    assert table.count_inactive(cutoff) == 1
+    assert table.count_by_level() == {2: 2, 3: 1}
+    assert table.count_by_status() == {"verified": 2, "warned": 1}
+    assert table.mean_xp(active_since=cutoff) == 75
+    assert table.top_ids("xp", 2) == [("2", 300), ("1", 100)]
+
+def test_bajas_mueven_la_ultima_fila():
+    table = UserColumns()
+    table.rebuild(_users())
+    table.remove("1")
+    table.upsert("3", {**_users()["3"], "xp": 999})
+
+    assert len(table) == 2
+    assert table.top_ids("xp", 5) == [("3", 999), ("2", 300)]
+
+def test_user_manager_mantiene_la_copia_al_dia():
+    """Los cambios hechos por user_manager se reflejan en las columnas sin reconstruir."""
+    user_manager.update_user_activity(SimpleNamespace(id=4242, first_name="Col", username=None))
+    user_manager.add_points(4242, 7)
+    user_manager.set_user_status(4242, "verified")
+
+    row = user_manager.columns.rows["4242"]
+    assert user_manager.columns.points[row] == 7
+    assert user_manager.columns.status[row] == 0
+    assert user_manager.get_population_stats()["total"] >= 1
+
+    user_manager.remove_user(4242)
+    assert "4242" not in user_manager.columns.rows
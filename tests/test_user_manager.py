@@ -108,3 +108,60 @@ async def test_check_inactivity_job_expulsa_usuario(mock_context, monkeypatch):
     assert user_manager.users_db[user_id_str]["lives"] == 0
     assert int(user_id_str) in mock_context.bot.kicked_users
     assert int(user_id_str) in mock_context.bot.unbanned_users
+
+@pytest.mark.asyncio
+async def test_check_inactivity_job_solo_recorre_caducados_y_recuerda_dm_bloqueado(mock_context, monkeypatch):
+    """Solo se procesan los usuarios caducados y, si alguno bloquea el DM, no se le vuelve a escribir."""
+    from telegram.error import Forbidden
+
+    monkeypatch.setattr("src.config.settings.GROUP_CHAT_ID", -100)
+    for uid in (601, 602, 603):
+        user_manager.update_user_activity(SimpleNamespace(id=uid, first_name=f"U{uid}", username=None))
+    # 601 y 602 llevan tiempo sin aparecer; 603 está activo
+    old = datetime.now() - timedelta(days=user_manager.settings.INACTIVITY_DAYS + 1)
+    for uid in ("601", "602"):
+        user_manager.users_db[uid]["last_seen"] = old.isoformat()
+    user_manager._rebuild_last_seen_index()
+
+    async def send_message(chat_id, text):
+        if chat_id == 602:
+            raise Forbidden("bot was blocked by the user")
+        mock_context.bot.sent_messages.setdefault(chat_id, []).append(text)
+    monkeypatch.setattr(mock_context.bot, "send_message", send_message)
+
+    assert user_manager.get_expired_user_ids(datetime.now()) == ["601", "602"]
+    await user_manager.check_inactivity_job(mock_context)
+
+    assert user_manager.users_db["601"]["lives"] == 2
+    assert user_manager.users_db["602"]["dm_unreachable"] is True
+    assert user_manager.users_db["603"]["lives"] == 3
+    assert list(mock_context.bot.sent_messages) == [601]
+    # Tras la pasada, su contador se reinicia y ya no figuran como caducados
+    assert user_manager.get_expired_user_ids(datetime.now()) == []
+
+    user_manager.mark_dm_reachable(602)
+    assert "dm_unreachable" not in user_manager.users_db["602"]
+
+def test_muestreo_de_verificados_usa_el_indice_de_estados():
+    """El muestreo sigue los cambios de estado y las bajas sin recorrer la base de datos."""
+    for uid in (701, 702, 703):
+        user_manager.update_user_activity(SimpleNamespace(id=uid, first_name=f"U{uid}", username=None))
+    assert user_manager.get_random_verified_users(3) == []
+
+    user_manager.set_user_status(701, "verified")
+    user_manager.set_user_status(702, "verified")
+    elegidos = {u["id"] for u in user_manager.get_random_verified_users(3)}
+    assert elegidos == {"701", "702"}
+
+    user_manager.remove_user(701)
+    assert [u["id"] for u in user_manager.get_random_verified_users(3)] == ["702"]
+
+def test_muestreo_ponderado_prefiere_no_mencionados(monkeypatch):
+    """Quien acaba de ser mencionado apenas tiene opciones frente a quien no lo ha sido."""
+    for uid in (801, 802):
+        user_manager.update_user_activity(SimpleNamespace(id=uid, first_name=f"U{uid}", username=None))
+        user_manager.set_user_status(uid, "verified")
+    user_manager.mark_mentioned(["801"])
+
+    picks = [user_manager.sample_users_by_status("verified", 1, weighted=True)[0] for _ in range(200)]
+    assert picks.count("802") > picks.count("801") * 5
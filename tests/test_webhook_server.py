@@ -0,0 +1,120 @@
+# tests/test_webhook_server.py
+import asyncio
+import pytest
+import pytest_asyncio
+from telegram import Update
+
+from src.webhook_server import MetricsServer, WebhookServer, WebhookTestClient
+
+SECRET = "s3cr3t"
+
+
+def _message_update(update_id: int, text: str = "hola") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": -100, "type": "supergroup", "title": "Grupo"},
+            "from": {"id": 7, "is_bot": False, "first_name": "Ana"},
+            "text": text,
+        },
+    }
+
+
+@pytest_asyncio.fixture
+async def server():
+    server = WebhookServer(asyncio.Queue(), secret_token=SECRET, host="127.0.0.1", port=0)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_update_valido_llega_a_la_cola(server):
+    async with WebhookTestClient("127.0.0.1", server.port, secret_token=SECRET) as client:
+        status, body = await client.post_update(_message_update(1, "buenas"))
+
+    assert status == 200 and body["ok"]
+    update = server.update_queue.get_nowait()
+    assert isinstance(update, Update)
+    assert update.message.text == "buenas"
+
+
+@pytest.mark.asyncio
+async def test_secreto_incorrecto_se_rechaza(server):
+    async with WebhookTestClient("127.0.0.1", server.port, secret_token="otro") as client:
+        status, _ = await client.post_update(_message_update(1))
+
+    assert status == 403
+    assert server.update_queue.empty()
+    assert server.stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_los_reenvios_se_descartan_por_update_id(server):
+    """Telegram reenvía si no contestamos a tiempo: el mismo update_id solo entra una vez."""
+    async with WebhookTestClient("127.0.0.1", server.port, secret_token=SECRET) as client:
+        for _ in range(3):
+            status, _ = await client.post_update(_message_update(42))
+            assert status == 200
+        status, _ = await client.post_update(_message_update(43))
+
+    assert server.update_queue.qsize() == 2
+    assert server.stats["duplicates"] == 2
+
+
+@pytest.mark.asyncio
+async def test_update_mal_formado_no_cuenta_como_visto(server):
+    """Si no se puede interpretar se contesta 400 y el reenvío (ya correcto) sí entra."""
+    broken = {"update_id": 50, "message": {"chat": {"id": -100}}}
+    async with WebhookTestClient("127.0.0.1", server.port, secret_token=SECRET) as client:
+        status, _ = await client.post_update(broken)
+        assert status == 400
+        status, body = await client.post_update(_message_update(50))
+
+    assert status == 200 and "duplicate" not in body
+    assert server.update_queue.qsize() == 1
+    assert server.stats["invalid"] == 1
+
+
+def test_modo_webhook_sin_secreto_no_arranca():
+    with pytest.raises(ValueError):
+        WebhookServer(asyncio.Queue(), secret_token="", path="/telegram")
+    # En modo polling (sin ruta de webhook) no hace falta
+    WebhookServer(asyncio.Queue(), secret_token="", path=None)
+
+
+@pytest.mark.asyncio
+async def test_health_y_rutas_desconocidas(server):
+    async with WebhookTestClient("127.0.0.1", server.port, secret_token=SECRET) as client:
+        status, body = await client.health()
+        assert status == 503 and body["status"] == "starting"
+
+        server.ready = True
+        status, body = await client.health()
+        assert status == 200 and body["status"] == "ok"
+
+        status, _ = await client.request("GET", "/otra")
+        assert status == 404
+        status, _ = await client.request("POST", "/telegram", {"sin": "update_id"},
+                                         {"X-Telegram-Bot-Api-Secret-Token": SECRET})
+        assert status == 400
+
+
+@pytest.mark.asyncio
+async def test_metrics_en_texto_plano_y_fuera_del_webhook(server):
+    metrics_server = MetricsServer("127.0.0.1", 0)
+    await metrics_server.start()
+    try:
+        async with WebhookTestClient("127.0.0.1", metrics_server.port) as client:
+            status, body = await client.metrics()
+    finally:
+        await metrics_server.stop()
+    async with WebhookTestClient("127.0.0.1", server.port, secret_token=SECRET) as client:
+        public_status, _ = await client.metrics()
+
+    assert public_status == 404
+    assert status == 200
+    assert "# TYPE nimex_handler_duration_seconds histogram" in body
+    assert "# TYPE nimex_cache_requests_total counter" in body